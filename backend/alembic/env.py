@@ -11,7 +11,11 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from app.database import Base
-from app.models import User, Investigation, Tracker, Location, Screenshot
+from app.models import (
+    User, InvestigationUser, Investigation, Tracker, Location, Screenshot,
+    OCRJob, OCRJobItem, OCRCacheEntry, GeocodeCacheEntry, FacilityClassification,
+    FacilityRegistryVersion
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,87 @@
+"""Add geohash to locations for spatial queries
+
+Revision ID: a6d2e9f3c7b1
+Revises: f4a7b2c8e1d3
+Create Date: 2026-10-17 21:12:36.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e9f3c7b1'
+down_revision: Union[str, None] = 'f4a7b2c8e1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# The 9-character base32 geohash as of this revision, copied here so the
+# migration keeps producing it whatever happens to app.services.spatial
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+
+def encode_geohash(lat, lng, precision: int = GEOHASH_PRECISION) -> str:
+    bits = precision * 5
+    lng_bits, lat_bits = (bits + 1) // 2, bits // 2  # Longitude gets the odd bit
+    x = min(max(int((float(lng) + 180) / 360 * (1 << lng_bits)), 0), (1 << lng_bits) - 1)
+    y = min(max(int((float(lat) + 90) / 180 * (1 << lat_bits)), 0), (1 << lat_bits) - 1)
+    code = 0
+    for i in range(bits):
+        # Bits alternate longitude, latitude, ... from the most significant
+        if i % 2 == 0:
+            lng_bits -= 1
+            code = code << 1 | (x >> lng_bits) & 1
+        else:
+            lat_bits -= 1
+            code = code << 1 | (y >> lat_bits) & 1
+    return ''.join(_BASE32[(code >> (5 * i)) & 31] for i in range(precision - 1, -1, -1))
+
+
+def upgrade() -> None:
+    op.add_column('locations', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # Backfill before indexing, so the index is built once. Offline (--sql)
+    # runs can't read rows; use update_geohashes() after applying those.
+    if not context.is_offline_mode():
+        _backfill_geohashes()
+
+    op.create_index('idx_location_geohash', 'locations', ['geohash'], unique=False)
+
+
+def _backfill_geohashes() -> None:
+    locations = sa.table(
+        'locations',
+        sa.column('id', sa.Integer),
+        sa.column('latitude', sa.Numeric),
+        sa.column('longitude', sa.Numeric),
+        sa.column('geohash', sa.String),
+    )
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(locations.c.id, locations.c.latitude, locations.c.longitude).where(
+                locations.c.id > last_id,
+                locations.c.latitude.isnot(None),
+                locations.c.longitude.isnot(None),
+            ).order_by(locations.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            locations.update().where(locations.c.id == sa.bindparam('location_id')).values(
+                geohash=sa.bindparam('new_geohash')
+            ),
+            [{'location_id': id_, 'new_geohash': encode_geohash(lat, lng)} for id_, lat, lng in rows]
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index('idx_location_geohash', table_name='locations')
+    op.drop_column('locations', 'geohash')
@@ -0,0 +1,31 @@
+"""Add claimed_at to ocr_job_items
+
+Runners requeue only items whose claim has gone stale, instead of every
+processing item at startup. Items already processing are stamped now, so
+they count as stale only once the claim timeout has passed.
+
+Revision ID: a9c4e2f7b5d3
+Revises: f1c8d3b6e2a4
+Create Date: 2026-10-18 18:20:54.613027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e2f7b5d3'
+down_revision: Union[str, None] = 'f1c8d3b6e2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ocr_job_items', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE ocr_job_items SET claimed_at = CURRENT_TIMESTAMP WHERE status = 'processing'")
+
+
+def downgrade() -> None:
+    op.drop_column('ocr_job_items', 'claimed_at')
@@ -0,0 +1,46 @@
+"""Add facility_classifications registry
+
+Revision ID: b3e8f1a5d7c2
+Revises: a6d2e9f3c7b1
+Create Date: 2026-10-17 22:40:18.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8f1a5d7c2'
+down_revision: Union[str, None] = 'a6d2e9f3c7b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('facility_classifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('facility_name', sa.String(length=255), nullable=False),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('facility_type', sa.String(length=50), nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('latitude', sa.Numeric(precision=10, scale=8), nullable=False),
+    sa.Column('longitude', sa.Numeric(precision=11, scale=8), nullable=False),
+    sa.Column('radius_m', sa.Numeric(precision=8, scale=1), nullable=True),
+    sa.Column('boundary', sa.Text(), nullable=True),
+    sa.Column('verified', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('revision', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_facility_classifications_id'), 'facility_classifications', ['id'], unique=False)
+    op.create_index('idx_facility_name_address', 'facility_classifications', ['facility_name', 'address'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_facility_name_address', table_name='facility_classifications')
+    op.drop_index(op.f('ix_facility_classifications_id'), table_name='facility_classifications')
+    op.drop_table('facility_classifications')
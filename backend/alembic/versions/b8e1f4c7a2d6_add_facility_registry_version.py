@@ -0,0 +1,36 @@
+"""Add facility_registry_version
+
+A single counter bumped on every facility registry write. Processes
+compare it to decide when to rebuild their in-memory facility index,
+instead of aggregating over facility_classifications, which missed a
+delete of the highest id followed by an insert.
+
+Revision ID: b8e1f4c7a2d6
+Revises: a9c4e2f7b5d3
+Create Date: 2026-10-18 21:06:37.519842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1f4c7a2d6'
+down_revision: Union[str, None] = 'a9c4e2f7b5d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('facility_registry_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO facility_registry_version (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('facility_registry_version')
@@ -0,0 +1,64 @@
+"""Add investigation_users and uploaded_at columns
+
+Until now these only existed in databases where the app's create_all
+ran at import; the app no longer creates tables, so migrations have to.
+Databases that already have them (from create_all) are left as they are.
+
+Revision ID: c2f7e4a9b8d1
+Revises: b3e8f1a5d7c2
+Create Date: 2026-10-17 23:52:41.308164
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f7e4a9b8d1'
+down_revision: Union[str, None] = 'b3e8f1a5d7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_schema():
+    """Tables and their columns as they are now; empty in --sql mode, which emits everything."""
+    if context.is_offline_mode():
+        return {}
+    inspector = sa.inspect(op.get_bind())
+    return {
+        table: {column['name'] for column in inspector.get_columns(table)}
+        for table in inspector.get_table_names()
+    }
+
+
+def upgrade() -> None:
+    existing = _existing_schema()
+
+    if 'investigation_users' not in existing:
+        op.create_table('investigation_users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('investigation_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('assigned_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('assigned_by', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['assigned_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['investigation_id'], ['investigations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_investigation_users_id'), 'investigation_users', ['id'], unique=False)
+        op.create_index('idx_investigation_user', 'investigation_users', ['investigation_id', 'user_id'], unique=True)
+
+    for table in ('locations', 'screenshots'):
+        if 'uploaded_at' not in existing.get(table, set()):
+            op.add_column(table, sa.Column('uploaded_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    # upgrade() leaves tables and columns that create_all already made, and
+    # nothing records which ones it added itself, so dropping them here could
+    # destroy data that predates this revision. Leaving them is harmless:
+    # upgrade() skips whatever already exists.
+    pass
@@ -0,0 +1,31 @@
+"""Drop ocr_cache.perceptual_hash
+
+The dHash was computed for every cached screenshot but never looked up;
+there is no near-duplicate matching to feed.
+
+Revision ID: c4a9e7d2f1b8
+Revises: b8e1f4c7a2d6
+Create Date: 2026-10-19 10:42:18.906153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a9e7d2f1b8'
+down_revision: Union[str, None] = 'b8e1f4c7a2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index(op.f('ix_ocr_cache_perceptual_hash'), table_name='ocr_cache')
+    op.drop_column('ocr_cache', 'perceptual_hash')
+
+
+def downgrade() -> None:
+    op.add_column('ocr_cache', sa.Column('perceptual_hash', sa.String(length=16), nullable=True))
+    op.create_index(op.f('ix_ocr_cache_perceptual_hash'), 'ocr_cache', ['perceptual_hash'], unique=False)
@@ -0,0 +1,36 @@
+"""Add background geocoding status to locations
+
+Revision ID: d1a4f6b8c2e9
+Revises: c5d8a1e7b2f3
+Create Date: 2026-10-17 15:21:07.842615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1a4f6b8c2e9'
+down_revision: Union[str, None] = 'c5d8a1e7b2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('locations', sa.Column('geocode_status', sa.String(length=20), nullable=True))
+    op.add_column('locations', sa.Column('geocoded_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('idx_geocode_status', 'locations', ['geocode_status'], unique=False)
+
+    # Existing rows were geocoded inline when they were saved
+    op.execute(
+        "UPDATE locations SET geocode_status = "
+        "CASE WHEN latitude IS NULL THEN 'not_found' ELSE 'complete' END"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_geocode_status', table_name='locations')
+    op.drop_column('locations', 'geocoded_at')
+    op.drop_column('locations', 'geocode_status')
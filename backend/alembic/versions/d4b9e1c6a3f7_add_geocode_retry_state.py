@@ -0,0 +1,32 @@
+"""Add geocode retry and claim state to locations
+
+Revision ID: d4b9e1c6a3f7
+Revises: c2f7e4a9b8d1
+Create Date: 2026-10-18 10:12:36.471920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b9e1c6a3f7'
+down_revision: Union[str, None] = 'c2f7e4a9b8d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('locations', sa.Column('geocode_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('locations', sa.Column('geocode_retry_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('locations', sa.Column('geocode_claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    # Rows mid-lookup or given up on go back to the states the old worker knows
+    op.execute("UPDATE locations SET geocode_status = 'pending' WHERE geocode_status IN ('geocoding', 'error')")
+    op.drop_column('locations', 'geocode_claimed_at')
+    op.drop_column('locations', 'geocode_retry_at')
+    op.drop_column('locations', 'geocode_attempts')
@@ -0,0 +1,36 @@
+"""Replace idx_tracker_time with a keyset index on (tracker_id, screenshot_timestamp, id)
+
+Paging a tracker's locations orders by screenshot_timestamp DESC NULLS
+LAST, id DESC. Postgres can only read that order straight off an index
+declared with the same direction and null placement; SQLite has no NULLS
+LAST in CREATE INDEX but walks a plain DESC index the same way.
+
+Revision ID: e7a3c5d1f9b2
+Revises: d4b9e1c6a3f7
+Create Date: 2026-10-18 14:03:27.519406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c5d1f9b2'
+down_revision: Union[str, None] = 'd4b9e1c6a3f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    timestamp = sa.column('screenshot_timestamp').desc()
+    if op.get_context().dialect.name == 'postgresql':
+        timestamp = timestamp.nulls_last()
+    op.create_index('idx_tracker_time_id', 'locations', ['tracker_id', timestamp, sa.column('id').desc()], unique=False)
+    op.drop_index('idx_tracker_time', table_name='locations')
+
+
+def downgrade() -> None:
+    op.create_index('idx_tracker_time', 'locations', ['tracker_id', 'screenshot_timestamp'], unique=False)
+    op.drop_index('idx_tracker_time_id', table_name='locations')
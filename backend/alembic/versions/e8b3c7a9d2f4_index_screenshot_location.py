@@ -0,0 +1,26 @@
+"""Index screenshots by location
+
+Revision ID: e8b3c7a9d2f4
+Revises: d1a4f6b8c2e9
+Create Date: 2026-10-17 18:02:41.519306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3c7a9d2f4'
+down_revision: Union[str, None] = 'd1a4f6b8c2e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_screenshot_location', 'screenshots', ['location_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_screenshot_location', table_name='screenshots')
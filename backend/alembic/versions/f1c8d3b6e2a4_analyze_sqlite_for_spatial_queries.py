@@ -0,0 +1,33 @@
+"""Gather SQLite planner statistics for the spatial queries
+
+Without sqlite_stat1 SQLite assumes every index is equally selective and
+drives the spatial queries from idx_tracker_time_id, idx_uploaded_by or
+idx_location_type rather than the materialized geohash candidates.
+Postgres keeps its statistics current itself (autovacuum), so this is
+SQLite only. Re-run ANALYZE (or PRAGMA optimize) after large imports.
+
+Revision ID: f1c8d3b6e2a4
+Revises: e7a3c5d1f9b2
+Create Date: 2026-10-18 16:41:09.882315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c8d3b6e2a4'
+down_revision: Union[str, None] = 'e7a3c5d1f9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        op.execute('ANALYZE')
+
+
+def downgrade() -> None:
+    # Statistics only steer the planner; nothing to undo
+    pass
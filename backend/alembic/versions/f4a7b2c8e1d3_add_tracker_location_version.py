@@ -0,0 +1,26 @@
+"""Add location version to trackers
+
+Revision ID: f4a7b2c8e1d3
+Revises: e8b3c7a9d2f4
+Create Date: 2026-10-17 19:47:12.308551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a7b2c8e1d3'
+down_revision: Union[str, None] = 'e8b3c7a9d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trackers', sa.Column('location_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('trackers', 'location_version')
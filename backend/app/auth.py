@@ -1,13 +1,20 @@
 """Authentication utilities for JWT tokens and password hashing."""
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
+import threading
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_async_db, get_db
 from app import models
+from app.services.access import AccessScope, access_for
 
 # Security configuration
 SECRET_KEY = "your-secret-key-here-change-in-production"  # TODO: Move to environment variable
@@ -40,34 +47,174 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> models.User:
-    """Get the current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+def token_claims(user: models.User) -> dict:
+    """Claims identifying a user in an access token: subject, user id, role and name."""
+    return {"sub": user.email, "uid": user.id, "role": user.role, "name": user.full_name}
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user as endpoints see it: an immutable snapshot,
+    safe to share between requests and threads. Endpoints that need more
+    than these fields query the users table themselves.
+    """
+    id: int
+    email: str
+    role: str
+    full_name: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role, full_name=user.full_name)
+
+
+class PrincipalCache:
+    """
+    Principals by token subject for a short TTL, so a burst of requests
+    with the same token costs one users lookup. Entries are dropped with
+    invalidate() when a user's role changes; other processes pick the
+    change up when their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_size: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[Principal]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return principal
+
+    def set(self, subject: str, principal: Principal):
+        with self._lock:
+            self._entries[subject] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_principal_cache: Optional[PrincipalCache] = None
+_principal_cache_lock = threading.Lock()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the process-wide principal cache, created from settings on first use."""
+    global _principal_cache
+    with _principal_cache_lock:
+        if _principal_cache is None:
+            settings = get_settings()
+            _principal_cache = PrincipalCache(settings.principal_cache_ttl_seconds, settings.principal_cache_size)
+        return _principal_cache
+
+
+def invalidate_principal(email: str):
+    """Forget the cached principal for a user, e.g. after their role changed."""
+    get_principal_cache().invalidate(email)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _token_payload(credentials: HTTPAuthorizationCredentials) -> dict:
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        raise credentials_exception
-
-    user = db.query(models.User).filter(models.User.email == email).first()
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _load_principal(db: Session, payload: dict) -> Principal:
+    # Cache miss: the users table is authoritative, whatever the token claims
+    email = payload["sub"]
+    user_id = payload.get("uid")
+    if isinstance(user_id, int):
+        user = db.get(models.User, user_id)
+        if user is not None and user.email != email:
+            user = None
+    else:
+        user = db.query(models.User).filter(models.User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    principal = Principal.from_user(user)
+    get_principal_cache().set(email, principal)
+    return principal
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Get the current authenticated user from JWT token.
+
+    Served from the principal cache when possible. On a miss the user is
+    loaded by the token's uid claim (by email for tokens issued before
+    the claim existed); the users table stays authoritative for the
+    role, so a demotion is not outlived by an old token's role claim.
+    """
+    payload = _token_payload(credentials)
+    principal = get_principal_cache().get(payload["sub"])
+    if principal is not None:
+        return principal
+    return _load_principal(db, payload)
+
+
+async def get_async_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """get_current_user for async def endpoints; cache hits don't touch the database."""
+    payload = _token_payload(credentials)
+    principal = get_principal_cache().get(payload["sub"])
+    if principal is not None:
+        return principal
+    return await db.run_sync(_load_principal, payload)
+
+
+def get_access(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> AccessScope:
+    """The current user's investigation and tracker access, cached per user."""
+    return access_for(db, current_user.id, current_user.role)
+
 
-    return user
+async def get_async_access(
+    current_user: Principal = Depends(get_async_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> AccessScope:
+    """get_access for async def endpoints."""
+    return await db.run_sync(access_for, current_user.id, current_user.role)
 
 
-def get_current_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+def get_current_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Require that the current user has admin role."""
     if current_user.role != "admin":
         raise HTTPException(
@@ -77,6 +224,6 @@ def get_current_admin(current_user: models.User = Depends(get_current_user)) ->
     return current_user
 
 
-def get_current_active_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Get current user (any role). Alias for clarity."""
     return current_user
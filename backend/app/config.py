@@ -6,16 +6,78 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "postgresql://ricardonigro@localhost:5432/cuptracker"
+    read_database_url: str = ""  # Replica for read-only endpoints; empty = use database_url
+    db_echo: bool = False  # Log every SQL statement
+    db_pool_size: int = 5  # Connections kept open per sync engine
+    db_max_overflow: int = 10  # Extra connections allowed under load
+    db_async_pool_size: int = 10  # Same, per async engine (serves the hot async endpoints)
+    db_async_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced
+    db_pool_pre_ping: bool = True  # Check connections before use
+    db_statement_timeout_ms: int = 30000  # Postgres statement_timeout; 0 = none
+    db_read_statement_timeout_ms: int = 120000  # For read-only sessions (exports); 0 = db_statement_timeout_ms
     
     # Security
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    principal_cache_ttl_seconds: float = 60.0  # How long an authenticated user is trusted without a lookup
+    principal_cache_size: int = 4096
+    access_cache_ttl_seconds: float = 60.0  # How long a user's investigation/tracker access is cached
+    access_cache_size: int = 4096
     
     # Application
     app_name: str = "Cup Tracker API"
     debug: bool = True
     
+    # OCR worker pool
+    ocr_workers: int = 0  # 0 = one worker per CPU core
+    ocr_max_queue: int = 32  # Jobs allowed to wait for a free worker
+    ocr_job_timeout: float = 60.0  # Seconds before a job is abandoned
+    ocr_max_jobs_per_worker: int = 50  # Recycle workers to cap memory growth
+    ocr_job_claim_timeout_seconds: float = 300.0  # Claims older than this are presumed abandoned; keep well above ocr_job_timeout
+    
+    # Batch uploads
+    upload_max_batch_files: int = 500
+    upload_batch_concurrency: int = 0  # 0 = one OCR job per pool worker
+    
+    # Geocoding: which of "local", "cache", "remote" to use, listed in the
+    # order they always run (local gazetteer, cache, then remote provider)
+    geocoder_chain: str = "cache,remote"
+    gazetteer_path: str = ""  # CSV used by the "local" stage
+    
+    # Geocoding cache
+    geocode_cache_ttl_days: int = 90
+    geocode_negative_ttl_hours: int = 24  # How long "address not found" is remembered
+    geocode_lru_size: int = 4096  # In-process entries in front of the table
+    geocode_batch_size: int = 50  # Pending locations picked up per worker pass
+    geocode_poll_seconds: float = 30.0
+    geocode_max_attempts: int = 5  # Failed lookups before a location is marked error
+    geocode_retry_seconds: float = 60.0  # Wait before the first retry; doubles with each failure
+    geocode_claim_timeout_seconds: float = 600.0  # Claimed rows not finished by then are picked up again
+    
+    # Bulk location ingest
+    bulk_ingest_batch_size: int = 1000  # Rows inserted per executemany
+    bulk_ingest_max_rows: int = 100000  # Per request
+    
+    # Facility registry
+    facility_default_radius_m: float = 250.0  # Footprint of a facility without a boundary
+    facility_index_check_seconds: float = 5.0  # How long the in-memory facility index is used before re-checking the registry version
+    
+    # Map tracks
+    track_cache_size: int = 2048  # Simplified tracks kept in memory
+    track_pixel_tolerance: float = 1.0  # Max deviation in screen pixels when ?zoom= is used
+    
+    # Map tiles
+    tile_cache_dir: str = ""  # Defaults to backend/tile_cache
+    tile_cluster_max_zoom: int = 14  # Locations are clustered up to this zoom
+    tile_cluster_pixels: int = 64  # Cluster grid cell size in screen pixels (divides 256)
+    
+    # Exports
+    export_batch_size: int = 2000  # Rows fetched from the DB cursor per chunk
+    export_record_batch_size: int = 65536  # Rows per Arrow record batch / Parquet row group
+    
     class Config:
         env_file = ".env"
 
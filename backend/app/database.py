@@ -1,18 +1,129 @@
-from sqlalchemy import create_engine
+from functools import lru_cache
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import get_settings
 
 settings = get_settings()
 
+# Async drivers by database backend
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def _engine_options(url: str, asynchronous: bool = False) -> dict:
+    """Pool and, on Postgres, per-statement timeout options for an engine."""
+    options = {
+        "echo": settings.db_echo,  # Log SQL queries when db_echo=True
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    backend = make_url(url).get_backend_name()
+    if backend != "sqlite":
+        # SQLite connections are local files; pool sizing does not apply
+        options.update(
+            pool_size=settings.db_async_pool_size if asynchronous else settings.db_pool_size,
+            max_overflow=settings.db_async_max_overflow if asynchronous else settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    if backend == "postgresql" and settings.db_statement_timeout_ms > 0:
+        if asynchronous:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
+def _create_engine(url: str):
+    return create_engine(url, **_engine_options(url))
+
+
+def _async_url(url: str):
+    """The same database, addressed through its async driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug  # Log SQL queries when debug=True
-)
+engine = _create_engine(settings.database_url)
+
+# Read-only work goes to the replica when one is configured
+if settings.read_database_url:
+    read_engine = _create_engine(settings.read_database_url)
+else:
+    read_engine = engine
+
+
+class ReadOnlySession(Session):
+    """A session for endpoints that only read; see get_read_db."""
 
-# Create session factory
+
+@event.listens_for(ReadOnlySession, "after_begin")
+def _read_only_transaction(session, transaction, connection):
+    # Makes the database itself refuse writes, also on the primary
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+        if settings.db_read_statement_timeout_ms > 0:
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.db_read_statement_timeout_ms)}")
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _refuse_flush(session, flush_context, instances):
+    raise RuntimeError("Read-only session: use get_db for endpoints that write")
+
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=ReadOnlySession)
+
+
+# Every process holds up to four pools: sync and async, each against the
+# primary and (with read_database_url) the replica. Peak connections per
+# process to each database are therefore db_pool_size + db_max_overflow
+# plus db_async_pool_size + db_async_max_overflow; multiply by the number
+# of worker processes when sizing the server's max_connections.
+_async_engines: Dict[bool, AsyncEngine] = {}
+
+
+def get_async_engine(read_only: bool = False) -> AsyncEngine:
+    """
+    The async engine (asyncpg on Postgres), created on first use so the
+    driver is only imported by processes serving async endpoints.
+    """
+    read_only = read_only and bool(settings.read_database_url)
+    engine = _async_engines.get(read_only)
+    if engine is None:
+        url = settings.read_database_url if read_only else settings.database_url
+        engine = _async_engines.setdefault(
+            read_only, create_async_engine(_async_url(url), **_engine_options(url, asynchronous=True))
+        )
+    return engine
+
+
+async def dispose_async_engines():
+    """Close the async pools (called at app shutdown); they are recreated on next use."""
+    engines = list(_async_engines.values())
+    _async_engines.clear()
+    get_async_sessionmaker.cache_clear()
+    for engine in engines:
+        await engine.dispose()
+
+
+@lru_cache()
+def get_async_sessionmaker(read_only: bool = False) -> async_sessionmaker:
+    # Objects stay usable after commit: an expired attribute can't lazy-load outside the session's greenlet
+    return async_sessionmaker(
+        get_async_engine(read_only),
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=ReadOnlySession if read_only else Session,
+    )
+
 
 # Base class for models
 Base = declarative_base()
@@ -27,3 +138,28 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    Read-only database session dependency, for endpoints that only read
+    (summaries, exports, listings). Uses the replica when
+    read_database_url is set, so results may lag the primary slightly.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Async counterpart of get_db, for async def endpoints."""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Async counterpart of get_read_db."""
+    async with get_async_sessionmaker(read_only=True)() as db:
+        yield db
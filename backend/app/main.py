@@ -1,18 +1,50 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from app.routers import trackers, locations, upload, auth, users, investigations, reports
-from app.database import engine
-from app import models
-import os
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.routers import trackers, locations, upload, auth, users, investigations, reports, tracks, tiles, spatial, facilities
+from app.database import dispose_async_engines, get_db
+from app.services.ocr_pool import start_ocr_pool, stop_ocr_pool
+from app.services.ocr_jobs import start_ocr_job_runner, stop_ocr_job_runner
+from app.services.ocr_cache import ocr_cache
+from app.services.geocode_worker import start_geocode_worker, stop_geocode_worker
+from app.services.readiness import check_database
+
+# Importing this module does no I/O: tables come from `alembic upgrade head`,
+# and directories, worker processes and threads are set up by the lifespan
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.started = False
+    upload.UPLOAD_DIR.mkdir(exist_ok=True)
+
+    # Start the OCR worker processes once, not per request, and the local
+    # runner that drains queued OCR jobs through them
+    pool = start_ocr_pool()
+    await start_ocr_job_runner(pool)
+
+    # Backfill coordinates for saved locations off the request path
+    start_geocode_worker()
+
+    app.state.started = True
+    try:
+        yield
+    finally:
+        app.state.started = False
+        stop_geocode_worker()
+        await stop_ocr_job_runner()
+        stop_ocr_pool()
+        await run_in_threadpool(ocr_cache.flush)  # Hit counts not yet written
+        await dispose_async_engines()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Cup Tracker API",
     description="API for tracking plastic cups through their lifecycle",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,12 +54,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Location-Types"],  # Location paging, track type codes
 )
 
-# Serve uploaded screenshots as static files
-UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "..", "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# Serve uploaded screenshots as static files (the directory is created at startup)
+app.mount("/uploads", StaticFiles(directory=upload.UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Include routers
 app.include_router(auth.router)
@@ -37,6 +68,10 @@ app.include_router(locations.router)
 app.include_router(users.router)
 app.include_router(investigations.router)
 app.include_router(reports.router)
+app.include_router(tracks.router)
+app.include_router(tiles.router)
+app.include_router(spatial.router)
+app.include_router(facilities.router)
 
 @app.get("/")
 def read_root():
@@ -45,4 +80,20 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    """Liveness: the process is up and serving. Touches nothing else."""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+def readiness_check(db: Session = Depends(get_db)):
+    """
+    Readiness: startup has finished, the database answers and is migrated
+    to this build's schema. 503 until then, so no traffic is routed here.
+    """
+    checks = {"startup": "ok" if getattr(app.state, "started", False) else "starting"}
+    checks.update(check_database(db))
+    ready = all(value == "ok" for value in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not ready", "checks": checks}
+    )
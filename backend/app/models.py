@@ -72,6 +72,7 @@ class Tracker(Base):
     tracker_type = Column(String(50), default='atuvos')  # atuvos, airtag, etc.
     platform = Column(String(20), nullable=False)  # 'apple' or 'google'
     notes = Column(Text)
+    location_version = Column(Integer, nullable=False, default=0, server_default='0')  # Bumped when its locations change
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -93,11 +94,19 @@ class Location(Base):
     address = Column(Text, nullable=False)
     latitude = Column(Numeric(10, 8))
     longitude = Column(Numeric(11, 8))
+    geohash = Column(String(12))  # Kept in step with the coordinates, for spatial queries
     city = Column(String(255))
     state = Column(String(100))
     country = Column(String(100))
     postal_code = Column(String(20))
     
+    # Background geocoding: pending, geocoding (claimed by a worker), complete, not_found, error
+    geocode_status = Column(String(20), default='complete')
+    geocoded_at = Column(DateTime(timezone=True))
+    geocode_attempts = Column(Integer, default=0, server_default='0', nullable=False)  # Failed lookups so far
+    geocode_retry_at = Column(DateTime(timezone=True))  # Not retried before this, after a failure
+    geocode_claimed_at = Column(DateTime(timezone=True))
+    
     # Location classification
     location_type = Column(String(50))  # starting_point, mrf, landfill, incinerator, etc.
     location_type_confidence = Column(String(20))  # auto, manual, verified
@@ -125,10 +134,17 @@ class Location(Base):
     
     # Indexes for performance
     __table_args__ = (
-        Index('idx_tracker_time', 'tracker_id', 'screenshot_timestamp'),
+        # Newest-first keyset paging; Postgres only walks it for ORDER BY
+        # ... DESC NULLS LAST if the index says so, SQLite can't say so
+        Index('idx_tracker_time_id', tracker_id, screenshot_timestamp.desc().nulls_last(), id.desc())
+            .ddl_if(dialect='postgresql'),
+        Index('idx_tracker_time_id', tracker_id, screenshot_timestamp.desc(), id.desc())
+            .ddl_if(callable_=lambda ddl, target, bind, **kw: kw['dialect'].name != 'postgresql'),
         Index('idx_state', 'state'),
         Index('idx_uploaded_by', 'uploaded_by'),
         Index('idx_location_type', 'location_type'),
+        Index('idx_geocode_status', 'geocode_status'),
+        Index('idx_location_geohash', 'geohash'),
     )
 
 
@@ -150,3 +166,124 @@ class Screenshot(Base):
     
     # Relationships
     location = relationship("Location", back_populates="screenshots")
+
+    __table_args__ = (
+        Index('idx_screenshot_location', 'location_id'),
+    )
+
+
+class OCRJob(Base):
+    """Background OCR job for a batch of uploaded screenshots."""
+    __tablename__ = "ocr_jobs"
+    
+    id = Column(String(36), primary_key=True)  # uuid4, returned to the client
+    status = Column(String(20), default='pending')  # pending, processing, then completed, partial (some files failed) or failed
+    total_files = Column(Integer, default=0)
+    completed_files = Column(Integer, default=0)
+    created_by = Column(Integer, ForeignKey('users.id'))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    
+    # Relationships
+    items = relationship("OCRJobItem", back_populates="job", cascade="all, delete-orphan",
+                         order_by="OCRJobItem.position")
+
+
+class OCRJobItem(Base):
+    """One screenshot within an OCR job, processed by the local job runner."""
+    __tablename__ = "ocr_job_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(36), ForeignKey('ocr_jobs.id', ondelete='CASCADE'), nullable=False)
+    position = Column(Integer, nullable=False)  # Order within the upload
+    file_path = Column(String(500), nullable=False)  # Path on disk
+    file_name = Column(String(255), nullable=False)
+    file_size = Column(Integer)
+    status = Column(String(20), default='pending')  # pending, processing, completed, error
+    ocr_result = Column(Text)  # JSON-encoded OCR result
+    error = Column(Text)
+    attempts = Column(Integer, default=0)  # Claims so far; also identifies the current claim
+    claimed_at = Column(DateTime(timezone=True))  # When a runner last took the item
+    finished_at = Column(DateTime(timezone=True))
+    
+    # Relationships
+    job = relationship("OCRJob", back_populates="items")
+    
+    __table_args__ = (
+        Index('idx_ocr_job_position', 'job_id', 'position'),
+        Index('idx_ocr_job_item_status', 'status'),
+    )
+
+
+class OCRCacheEntry(Base):
+    """OCR output cached by screenshot content hash."""
+    __tablename__ = "ocr_cache"
+    
+    sha256 = Column(String(64), primary_key=True)
+    platform = Column(String(20))
+    tracker_name = Column(String(255))
+    address = Column(Text)
+    last_seen = Column(String(100))
+    confidence = Column(Numeric(5, 2))
+    raw_text = Column(Text)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True))
+
+
+class GeocodeCacheEntry(Base):
+    """Geocoder answers keyed by normalized address, including misses."""
+    __tablename__ = "geocode_cache"
+    
+    address_key = Column(String(500), primary_key=True)  # normalize_address() output
+    query = Column(Text)  # Address as first submitted
+    found = Column(Boolean, default=True)  # False = provider had no match
+    latitude = Column(Numeric(10, 8))
+    longitude = Column(Numeric(11, 8))
+    city = Column(String(255))
+    state = Column(String(100))
+    postal_code = Column(String(20))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class FacilityClassification(Base):
+    """Known facilities; locations inside one are classified as its type automatically."""
+    __tablename__ = "facility_classifications"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    facility_name = Column(String(255), nullable=False)
+    address = Column(Text)
+    facility_type = Column(String(50), nullable=False)  # Same values as location_type
+    state = Column(String(100))
+    
+    # Footprint: the boundary polygon if known, else a circle around the point
+    latitude = Column(Numeric(10, 8), nullable=False)
+    longitude = Column(Numeric(11, 8), nullable=False)
+    radius_m = Column(Numeric(8, 1))  # Defaults to facility_default_radius_m
+    boundary = Column(Text)  # JSON-encoded [[lng, lat], ...] outer ring
+    
+    verified = Column(Boolean, default=False)
+    created_by = Column(Integer, ForeignKey('users.id'))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    revision = Column(Integer, nullable=False)  # Bumped on every update; guards against concurrent edits
+    
+    __mapper_args__ = {'version_id_col': revision}
+    
+    __table_args__ = (
+        Index('idx_facility_name_address', 'facility_name', 'address', unique=True),
+    )
+
+
+class FacilityRegistryVersion(Base):
+    """One row counting facility registry changes, so every process knows when to rebuild its index."""
+    __tablename__ = "facility_registry_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default='0')
+
+
+# Registers the flush hooks that keep Location.is_final_destination,
+# Location.geohash, auto location_type, Tracker.location_version, the
+# facility registry version and the access cache current
+from app.services import access, facilities, final_destinations, spatial, track_versions  # noqa: E402,F401
@@ -9,6 +9,9 @@ from app.auth import (
     verify_password,
     create_access_token,
     get_current_user,
+    invalidate_principal,
+    token_claims,
+    Principal,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
@@ -41,7 +44,7 @@ def register(user_data: schemas.UserRegister, db: Session = Depends(get_db)):
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": db_user.email}, expires_delta=access_token_expires
+        data=token_claims(db_user), expires_delta=access_token_expires
     )
 
     # Convert to schema
@@ -77,11 +80,13 @@ def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
     from datetime import datetime
     user.last_login = datetime.utcnow()
     db.commit()
+    # A fresh login should see the user's current role and name
+    invalidate_principal(user.email)
 
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=token_claims(user), expires_delta=access_token_expires
     )
 
     # Convert to schema
@@ -102,19 +107,25 @@ def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=schemas.User)
-def get_me(current_user: models.User = Depends(get_current_user)):
+def get_me(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get current user information."""
+    user = db.get(models.User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return schemas.User(
-        id=current_user.id,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        role=current_user.role,
-        created_at=current_user.created_at,
-        last_login=current_user.last_login
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        created_at=user.created_at,
+        last_login=user.last_login
     )
 
 
 @router.post("/logout")
-def logout(current_user: models.User = Depends(get_current_user)):
+def logout(current_user: Principal = Depends(get_current_user)):
     """Logout endpoint (client should discard token)."""
     return {"message": "Successfully logged out"}
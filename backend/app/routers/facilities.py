@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import json
+
+from app.database import get_db
+from app import models, schemas
+from app.auth import get_current_user, Principal
+from app.services.facilities import FACILITY_TYPES
+
+router = APIRouter(prefix="/api/facilities", tags=["facilities"])
+
+
+def _require_admin(current_user: Principal):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+def _apply(facility: models.FacilityClassification, data: schemas.FacilityCreate):
+    if data.facility_type not in FACILITY_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid facility_type. Must be one of: {', '.join(FACILITY_TYPES)}"
+        )
+
+    latitude, longitude = data.latitude, data.longitude
+    if data.boundary is not None:
+        if len(data.boundary) < 3 or any(
+            len(point) != 2 or not (-180 <= point[0] <= 180 and -90 <= point[1] <= 90)
+            for point in data.boundary
+        ):
+            raise HTTPException(status_code=400, detail="boundary must be at least 3 [lng, lat] points")
+        if latitude is None or longitude is None:
+            latitude = sum(point[1] for point in data.boundary) / len(data.boundary)
+            longitude = sum(point[0] for point in data.boundary) / len(data.boundary)
+    if latitude is None or longitude is None:
+        raise HTTPException(status_code=400, detail="latitude and longitude are required without a boundary")
+
+    facility.facility_name = data.facility_name
+    facility.address = data.address
+    facility.facility_type = data.facility_type
+    facility.state = data.state
+    facility.latitude = latitude
+    facility.longitude = longitude
+    facility.radius_m = data.radius_m
+    facility.boundary = json.dumps(data.boundary) if data.boundary is not None else None
+    facility.verified = bool(data.verified)
+
+
+def _commit(db: Session):
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="A facility with this name and address already exists")
+
+
+@router.get("", response_model=List[schemas.Facility])
+def list_facilities(
+    facility_type: Optional[str] = None,
+    state: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """List known facilities, optionally by type and state."""
+    query = db.query(models.FacilityClassification)
+    if facility_type:
+        query = query.filter(models.FacilityClassification.facility_type == facility_type)
+    if state:
+        query = query.filter(models.FacilityClassification.state == state)
+    return query.order_by(models.FacilityClassification.facility_name).all()
+
+
+@router.post("", response_model=schemas.Facility)
+def create_facility(
+    facility: schemas.FacilityCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Register a facility. Admin-only.
+
+    New locations inside its boundary (or within radius_m of its point)
+    are classified as facility_type automatically; run
+    POST /api/investigations/{id}/reclassify for existing ones.
+    """
+    _require_admin(current_user)
+
+    db_facility = models.FacilityClassification(created_by=current_user.id)
+    _apply(db_facility, facility)
+    db.add(db_facility)
+    _commit(db)
+    db.refresh(db_facility)
+    return db_facility
+
+
+@router.put("/{facility_id}", response_model=schemas.Facility)
+def update_facility(
+    facility_id: int,
+    facility: schemas.FacilityCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Replace a facility's details. Admin-only."""
+    _require_admin(current_user)
+
+    db_facility = db.query(models.FacilityClassification).filter(
+        models.FacilityClassification.id == facility_id
+    ).first()
+    if not db_facility:
+        raise HTTPException(status_code=404, detail="Facility not found")
+
+    _apply(db_facility, facility)
+    _commit(db)
+    db.refresh(db_facility)
+    return db_facility
+
+
+@router.delete("/{facility_id}")
+def delete_facility(
+    facility_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Remove a facility. Admin-only. Locations already classified keep their type."""
+    _require_admin(current_user)
+
+    db_facility = db.query(models.FacilityClassification).filter(
+        models.FacilityClassification.id == facility_id
+    ).first()
+    if not db_facility:
+        raise HTTPException(status_code=404, detail="Facility not found")
+
+    db.delete(db_facility)
+    db.commit()
+    return {"status": "success", "facility_id": facility_id}
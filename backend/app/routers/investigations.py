@@ -1,77 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app import models, schemas
-from app.auth import get_current_user
+from app.auth import get_async_access, get_async_current_user, Principal
+from app.services.access import AccessScope
 
 router = APIRouter(prefix="/api/investigations", tags=["investigations"])
 
 
 @router.get("", response_model=List[schemas.Investigation])
-def list_investigations(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+async def list_investigations(
+    db: AsyncSession = Depends(get_async_read_db),
+    access: AccessScope = Depends(get_async_access)
 ):
     """
     List all investigations user has access to.
     Admins see all. Contributors see only investigations they're assigned to.
     """
-    if current_user.role == "admin":
-        investigations = db.query(models.Investigation).order_by(
-            models.Investigation.created_at.desc()
-        ).all()
-    else:
+    query = select(models.Investigation)
+    if not access.is_admin:
         # Contributors: only investigations they're explicitly assigned to
-        investigations = db.query(models.Investigation).join(
-            models.InvestigationUser,
-            models.Investigation.id == models.InvestigationUser.investigation_id
-        ).filter(
-            models.InvestigationUser.user_id == current_user.id
-        ).order_by(
-            models.Investigation.created_at.desc()
-        ).all()
-    
-    return investigations
+        if not access.investigation_ids:
+            return []
+        query = query.where(models.Investigation.id.in_(access.investigation_ids))
+    
+    return (await db.scalars(query.order_by(models.Investigation.created_at.desc()))).all()
 
 
 @router.get("/{investigation_id}", response_model=schemas.Investigation)
-def get_investigation(
+async def get_investigation(
     investigation_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    access: AccessScope = Depends(get_async_access)
 ):
     """
     Get a single investigation by ID.
     """
-    investigation = db.query(models.Investigation).filter(
-        models.Investigation.id == investigation_id
-    ).first()
+    investigation = await db.get(models.Investigation, investigation_id)
     
     if not investigation:
         raise HTTPException(status_code=404, detail="Investigation not found")
     
     # Contributors can only see investigations they're assigned to
-    if current_user.role != "admin":
-        is_assigned = db.query(models.InvestigationUser).filter(
-            models.InvestigationUser.investigation_id == investigation_id,
-            models.InvestigationUser.user_id == current_user.id
-        ).first()
-        
-        if not is_assigned:
-            raise HTTPException(status_code=403, detail="Access denied to this investigation")
+    access.require_investigation(investigation_id)
     
     return investigation
 
 
 @router.post("", response_model=schemas.Investigation)
-def create_investigation(
+async def create_investigation(
     investigation: schemas.InvestigationCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
     """
     Create a new investigation.
@@ -91,18 +75,18 @@ def create_investigation(
     )
     
     db.add(db_investigation)
-    db.commit()
-    db.refresh(db_investigation)
+    await db.commit()
+    await db.refresh(db_investigation)
     
     return db_investigation
 
 
 @router.post("/{investigation_id}/users", response_model=schemas.InvestigationUser)
-def assign_user_to_investigation(
+async def assign_user_to_investigation(
     investigation_id: int,
     assignment: schemas.InvestigationUserAssign,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
     """
     Assign a user to an investigation.
@@ -112,26 +96,22 @@ def assign_user_to_investigation(
         raise HTTPException(status_code=403, detail="Only admins can assign users")
     
     # Check investigation exists
-    investigation = db.query(models.Investigation).filter(
-        models.Investigation.id == investigation_id
-    ).first()
+    investigation = await db.get(models.Investigation, investigation_id)
     
     if not investigation:
         raise HTTPException(status_code=404, detail="Investigation not found")
     
     # Check user exists
-    user = db.query(models.User).filter(
-        models.User.id == assignment.user_id
-    ).first()
+    user = await db.get(models.User, assignment.user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if already assigned
-    existing = db.query(models.InvestigationUser).filter(
+    existing = (await db.scalars(select(models.InvestigationUser).where(
         models.InvestigationUser.investigation_id == investigation_id,
         models.InvestigationUser.user_id == assignment.user_id
-    ).first()
+    ))).first()
     
     if existing:
         raise HTTPException(status_code=400, detail="User already assigned to this investigation")
@@ -144,17 +124,17 @@ def assign_user_to_investigation(
     )
     
     db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
+    await db.commit()
+    await db.refresh(db_assignment)
     
     return db_assignment
 
 
 @router.get("/{investigation_id}/users", response_model=List[schemas.User])
-def list_investigation_users(
+async def list_investigation_users(
     investigation_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
     """
     List all users assigned to an investigation.
@@ -164,19 +144,17 @@ def list_investigation_users(
         raise HTTPException(status_code=403, detail="Only admins can view investigation users")
     
     # Check investigation exists
-    investigation = db.query(models.Investigation).filter(
-        models.Investigation.id == investigation_id
-    ).first()
+    investigation = await db.get(models.Investigation, investigation_id)
     
     if not investigation:
         raise HTTPException(status_code=404, detail="Investigation not found")
     
     # Get users
-    users = db.query(models.User).join(
+    users = (await db.scalars(select(models.User).join(
         models.InvestigationUser,
         models.User.id == models.InvestigationUser.user_id
-    ).filter(
+    ).where(
         models.InvestigationUser.investigation_id == investigation_id
-    ).all()
+    ))).all()
     
     return users
@@ -1,28 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
+from sqlalchemy import func, select, tuple_
+from typing import AsyncIterator, List, Optional
+from collections import defaultdict
 from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+import base64
+import json
 from app import models, schemas
-from app.database import get_db
-from app.services.geocoder import Geocoder
-from app.auth import get_current_user, get_current_admin
+from app.config import get_settings
+from app.database import get_async_db, get_async_read_db, get_db
+from app.services import bulk_ingest
+from app.services.access import invalidate_access
+from app.services.geocode_worker import notify_geocode_worker
+from app.auth import get_async_current_user, get_current_user, Principal
 
 router = APIRouter(prefix="/api/locations", tags=["locations"])
 
 
+async def _load_location(db: AsyncSession, location_id: int, *criteria) -> Optional[models.Location]:
+    """A location with everything schemas.Location reads, as lazy loads can't run in async endpoints."""
+    return (await db.scalars(
+        select(models.Location).options(
+            selectinload(models.Location.screenshots),
+            joinedload(models.Location.uploader)
+        ).where(models.Location.id == location_id, *criteria).execution_options(populate_existing=True)
+    )).first()
+
+
 @router.post("/from-ocr", response_model=schemas.Location)
-def save_location_from_ocr(
+async def save_location_from_ocr(
     data: schemas.SaveLocationFromOCR,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
-    """Save location from OCR data with optional screenshot"""
+    """
+    Save location from OCR data with optional screenshot.
+    
+    The location is stored right away with geocode_status='pending';
+    coordinates are backfilled by the background geocode worker.
+    """
     
     # Find or create tracker
-    tracker = db.query(models.Tracker).filter(
+    tracker = (await db.scalars(select(models.Tracker).where(
         models.Tracker.investigation_id == data.investigation_id,
         models.Tracker.name == data.tracker_name
-    ).first()
+    ))).first()
     
     if not tracker:
         tracker = models.Tracker(
@@ -31,37 +59,23 @@ def save_location_from_ocr(
             platform=data.platform
         )
         db.add(tracker)
-        db.flush()
-    
-    # Geocode the address
-    geocoder = Geocoder()
-    geocode_result = geocoder.geocode(data.address)
-    
-    latitude = None
-    longitude = None
-    geocoded_city = None
-    geocoded_state = None
-    geocoded_postal = None
-    
-    if geocode_result:
-        latitude, longitude, geocoded_city, geocoded_state, geocoded_postal = geocode_result
+        await db.flush()
     
     # Create location with explicit uploaded_at
     location = models.Location(
         tracker_id=tracker.id,
         address=data.address,
-        latitude=latitude,
-        longitude=longitude,
-        city=data.city or geocoded_city,
-        state=data.state or geocoded_state,
-        postal_code=data.postal_code or geocoded_postal,
+        city=data.city,
+        state=data.state,
+        postal_code=data.postal_code,
+        geocode_status='pending',
         last_seen_text=data.last_seen_text,
         screenshot_timestamp=data.screenshot_timestamp,
         uploaded_by=current_user.id,
         uploaded_at=datetime.utcnow()  # ADDED: Explicit timestamp
     )
     db.add(location)
-    db.flush()
+    await db.flush()
     
     # Create screenshot record if path provided
     if data.screenshot_path:
@@ -76,72 +90,363 @@ def save_location_from_ocr(
         )
         db.add(screenshot)
     
-    db.commit()
-    db.refresh(location)
+    await db.commit()
+    notify_geocode_worker()
     
     # Load screenshots relationship for response
-    location = db.query(models.Location).options(
-        joinedload(models.Location.screenshots)
-    ).filter(models.Location.id == location.id).first()
-    
-    return location
+    return await _load_location(db, location.id)
+
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+
+
+def _bulk_item(row: int, data) -> schemas.BulkLocationFromOCR:
+    try:
+        item = schemas.BulkLocationFromOCR.model_validate(data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail={"row": row, "errors": json.loads(e.json())})
+    if item.location_type is not None and item.location_type not in schemas.VALID_LOCATION_TYPES:
+        raise HTTPException(status_code=422, detail={"row": row, "errors": f"Invalid location_type {item.location_type}"})
+    return item
+
+
+async def _bulk_items(request: Request) -> AsyncIterator[schemas.BulkLocationFromOCR]:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_MEDIA_TYPES:
+        # One JSON object per line, parsed as the body streams in
+        row = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _bulk_item(row, _parse_json(row, line))
+                    row += 1
+        if buffer.strip():
+            yield _bulk_item(row, _parse_json(row, buffer))
+        return
+
+    data = _parse_json(None, await request.body())
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array or NDJSON")
+    for row, obj in enumerate(data):
+        yield _bulk_item(row, obj)
+
+
+def _parse_json(row: Optional[int], raw: bytes):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail={"row": row, "errors": "Invalid JSON"})
+
+
+def _ingest(db: Session, items: List[schemas.BulkLocationFromOCR], user_id: int,
+            batch_size: int) -> bulk_ingest.BulkIngestResult:
+    """Write validated rows in one transaction, batch by batch (blocking; run in a thread)."""
+    result = bulk_ingest.BulkIngestResult()
+    try:
+        investigation_ids = {item.investigation_id for item in items}
+        found = {i for (i,) in db.query(models.Investigation.id).filter(models.Investigation.id.in_(investigation_ids))}
+        if investigation_ids - found:
+            raise HTTPException(status_code=404, detail=f"Investigations not found: {sorted(investigation_ids - found)}")
+
+        for start in range(0, len(items), batch_size):
+            bulk_ingest.ingest_batch(db.connection(), items[start:start + batch_size], user_id, result)
+        bulk_ingest.finish(db.connection(), result)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    # Core inserts skip the session hook; the user may now see new trackers
+    invalidate_access(user_id)
+    return result
+
+
+@router.post("/bulk")
+async def bulk_save_locations_from_ocr(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Save many OCR results at once, all or nothing.
+
+    The body is a JSON array, or NDJSON (Content-Type application/x-ndjson)
+    parsed as it streams in, of objects shaped like POST /from-ocr plus
+    optional latitude/longitude/location_type. Every row is validated
+    before anything is written, so a slow client never holds a transaction
+    open; rows are then inserted in batches in one short transaction. The
+    response lists {location_id, tracker_id, screenshot_id} in input
+    order. Rows without coordinates are left for the geocoder.
+    """
+    settings = get_settings()
+    items = []
+    async for item in _bulk_items(request):
+        if len(items) >= settings.bulk_ingest_max_rows:
+            raise HTTPException(status_code=413, detail=f"At most {settings.bulk_ingest_max_rows} rows per request")
+        items.append(item)
+
+    result = await run_in_threadpool(_ingest, db, items, current_user.id, settings.bulk_ingest_batch_size)
+
+    if result.pending_geocode:
+        notify_geocode_worker()
+
+    return {
+        "status": "success",
+        "inserted": len(result.rows),
+        "trackers_created": result.trackers_created,
+        "pending_geocode": result.pending_geocode,
+        "locations": result.rows,
+    }
+
+
+# Fields that can be requested with ?fields= on the tracker listing
+LOCATION_FIELDS = {
+    'id': models.Location.id,
+    'tracker_id': models.Location.tracker_id,
+    'address': models.Location.address,
+    'latitude': models.Location.latitude,
+    'longitude': models.Location.longitude,
+    'city': models.Location.city,
+    'state': models.Location.state,
+    'postal_code': models.Location.postal_code,
+    'location_type': models.Location.location_type,
+    'screenshot_timestamp': models.Location.screenshot_timestamp,
+    'last_seen_text': models.Location.last_seen_text,
+    'is_final_destination': models.Location.is_final_destination,
+    'uploaded_at': models.Location.uploaded_at,
+    'uploaded_by': models.Location.uploaded_by,
+    'uploaded_by_name': models.User.full_name,
+    'geocode_status': models.Location.geocode_status,
+}
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+def _encode_cursor(location) -> str:
+    timestamp = location.screenshot_timestamp.isoformat() if location.screenshot_timestamp else None
+    raw = json.dumps([timestamp, location.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor: str):
+    """The (timestamp, id) of the last row of the previous page."""
+    try:
+        timestamp, location_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        timestamp = datetime.fromisoformat(timestamp) if timestamp is not None else None
+        location_id = int(location_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return timestamp, location_id
+
+
+# Newest first, undated last; idx_tracker_time_id is in this order
+NEWEST_FIRST = (models.Location.screenshot_timestamp.desc().nulls_last(), models.Location.id.desc())
+
+
+async def _newest_first_page(db: AsyncSession, query, cursor: Optional[str], count: int, rows_of):
+    """
+    Up to count rows of a tracker's newest-first query after the cursor.
+
+    Dated and undated rows are read separately so each is a plain range
+    scan of idx_tracker_time_id: a row-value comparison on
+    (screenshot_timestamp, id) for the dated ones, then id < cursor among
+    the undated ones once the dated ones run out. An OR across the two
+    would make the database sort every row of the tracker instead.
+    """
+    timestamp, location_id = _decode_cursor(cursor) if cursor is not None else (None, None)
+    screenshot_timestamp = models.Location.screenshot_timestamp
+
+    rows = []
+    if cursor is None or timestamp is not None:
+        dated = query.where(screenshot_timestamp.isnot(None))
+        if cursor is not None:
+            dated = dated.where(tuple_(screenshot_timestamp, models.Location.id) < tuple_(timestamp, location_id))
+        rows = rows_of(await db.execute(dated.order_by(*NEWEST_FIRST).limit(count)))
+
+    if len(rows) < count:
+        undated = query.where(screenshot_timestamp.is_(None))
+        if cursor is not None and timestamp is None:
+            undated = undated.where(models.Location.id < location_id)
+        rows += rows_of(await db.execute(undated.order_by(*NEWEST_FIRST).limit(count - len(rows))))
+    return rows
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
 
 
 @router.get("/tracker/{tracker_id}", response_model=List[schemas.Location])
-def get_locations_by_tracker(
+async def get_locations_by_tracker(
     tracker_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset paging"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. latitude,longitude,screenshot_timestamp"),
+    include_screenshots: Optional[bool] = Query(None, description="Attach screenshot details"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
-    """Get all locations for a specific tracker (filtered by user role)"""
-    query = db.query(models.Location).options(
-        joinedload(models.Location.screenshots)
-    ).filter(models.Location.tracker_id == tracker_id)
+    """
+    Get locations for a specific tracker (filtered by user role), newest first.
+
+    With no paging or projection parameters every location is returned with
+    its screenshots. Pass limit (then cursor) to page through the track with
+    a keyset on (screenshot_timestamp, id); the next page's cursor is sent in
+    the X-Next-Cursor header and is absent on the last page. fields= returns
+    only the named fields (id is always included, coordinates as numbers).
+    Outside the plain listing, screenshots are only attached with
+    include_screenshots=true.
+    """
+    paged = limit is not None or cursor is not None
+    if include_screenshots is None:
+        include_screenshots = not paged and fields is None
+
+    selected = None
+    if fields is not None:
+        selected = ['id'] + [f.strip() for f in fields.split(',') if f.strip() and f.strip() != 'id']
+        unknown = [f for f in selected if f not in LOCATION_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Must be among: {', '.join(LOCATION_FIELDS)}"
+            )
+        # The cursor needs the timestamp even when it isn't returned
+        query = select(
+            models.Location.screenshot_timestamp.label('_cursor_timestamp'),
+            *[LOCATION_FIELDS[f].label(f) for f in selected]
+        )
+        if 'uploaded_by_name' in selected:
+            query = query.outerjoin(models.User, models.Location.uploaded_by == models.User.id)
+    else:
+        query = select(models.Location).options(
+            selectinload(models.Location.screenshots) if include_screenshots
+            else noload(models.Location.screenshots),
+            joinedload(models.Location.uploader)
+        )
+
+    query = query.where(models.Location.tracker_id == tracker_id)
 
     # Contributors only see their own uploads
     if current_user.role == "contributor":
-        query = query.filter(models.Location.uploaded_by == current_user.id)
+        query = query.where(models.Location.uploaded_by == current_user.id)
 
     # Admins see everything (no additional filter)
 
-    locations = query.order_by(models.Location.screenshot_timestamp.desc()).all()
-    return locations
+    def rows_of(result):
+        return list(result.all() if selected else result.scalars().all())
+
+    if not paged:
+        rows = rows_of(await db.execute(query.order_by(*NEWEST_FIRST)))
+    else:
+        page_size = limit or DEFAULT_PAGE_SIZE
+        # One extra row tells us if there's a next page
+        rows = await _newest_first_page(db, query, cursor, page_size + 1, rows_of)
+
+    if paged and len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(SimpleNamespace(
+            id=last.id,
+            screenshot_timestamp=last._cursor_timestamp if selected else last.screenshot_timestamp
+        ))
+
+    if selected is None:
+        return rows
+
+    items = [{f: _json_value(getattr(row, f)) for f in selected} for row in rows]
+    if include_screenshots and items:
+        screenshots = defaultdict(list)
+        for screenshot in await db.scalars(select(models.Screenshot).where(
+            models.Screenshot.location_id.in_([item['id'] for item in items])
+        )):
+            screenshots[screenshot.location_id].append(
+                schemas.Screenshot.model_validate(screenshot).model_dump(mode='json')
+            )
+        for item in items:
+            item['screenshots'] = screenshots.get(item['id'], [])
+
+    # Bypasses response_model, so the projection isn't padded with defaults
+    projected = JSONResponse(content=items)
+    if "X-Next-Cursor" in response.headers:
+        projected.headers["X-Next-Cursor"] = response.headers["X-Next-Cursor"]
+    return projected
+
+
+@router.get("/geocode-status", response_model=schemas.GeocodeStatus)
+async def get_geocode_status(
+    investigation_id: Optional[int] = None,
+    tracker_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_async_current_user)
+):
+    """Count locations by background geocoding status (filtered by user role)"""
+    query = select(
+        models.Location.geocode_status,
+        func.count(models.Location.id)
+    )
+    
+    if investigation_id is not None:
+        query = query.join(
+            models.Tracker, models.Location.tracker_id == models.Tracker.id
+        ).where(models.Tracker.investigation_id == investigation_id)
+    if tracker_id is not None:
+        query = query.where(models.Location.tracker_id == tracker_id)
+    
+    # Contributors only see their own uploads
+    if current_user.role == "contributor":
+        query = query.where(models.Location.uploaded_by == current_user.id)
+    
+    counts = dict((await db.execute(query.group_by(models.Location.geocode_status))).all())
+    return schemas.GeocodeStatus(
+        pending=counts.get('pending', 0) + counts.get('geocoding', 0),
+        complete=counts.get('complete', 0),
+        not_found=counts.get('not_found', 0),
+        error=counts.get('error', 0)
+    )
 
 
 @router.get("/{location_id}", response_model=schemas.Location)
-def get_location(
+async def get_location(
     location_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
     """Get a specific location by ID (filtered by user role)"""
-    query = db.query(models.Location).options(
-        joinedload(models.Location.screenshots)
-    ).filter(models.Location.id == location_id)
+    criteria = []
 
     # Contributors can only see their own uploads
     if current_user.role == "contributor":
-        query = query.filter(models.Location.uploaded_by == current_user.id)
+        criteria.append(models.Location.uploaded_by == current_user.id)
 
-    location = query.first()
+    location = await _load_location(db, location_id, *criteria)
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
     return location
 
 
 @router.post("/", response_model=schemas.Location)
-def create_location(
+async def create_location(
     location: schemas.LocationCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
     """Create a new location"""
     db_location = models.Location(
         **location.dict(),
+        # Geocode in the background unless coordinates were supplied
+        geocode_status='complete' if location.latitude is not None else 'pending',
         uploaded_by=current_user.id,
         uploaded_at=datetime.utcnow()
     )
     db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
-    return db_location
+    await db.commit()
+    if db_location.geocode_status == 'pending':
+        notify_geocode_worker()
+    return await _load_location(db, db_location.id)
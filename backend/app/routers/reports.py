@@ -1,27 +1,39 @@
 # File: backend/app/routers/reports.py (NEW FILE)
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from typing import Optional
+from collections import Counter
 from datetime import datetime
-import csv
-import io
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import ReadSessionLocal, get_async_read_db, get_db, get_read_db
 from app import models, schemas
-from app.auth import get_current_user
+from app.auth import get_async_current_user, get_current_user, Principal
+from app.services import classification, export, facilities, final_destinations
 
 router = APIRouter(prefix="/api", tags=["reports"])
 
 
+def _check_location_types(location_types):
+    invalid = sorted({t for t in location_types if t not in schemas.VALID_LOCATION_TYPES})
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid location_type {', '.join(invalid)}. "
+                   f"Must be one of: {', '.join(schemas.VALID_LOCATION_TYPES)}"
+        )
+
+
 @router.patch("/locations/{location_id}/classify")
 def classify_location(
     location_id: int,
     location_type: str,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update the location_type for a specific location.
@@ -38,15 +50,7 @@ def classify_location(
     if current_user.role == "contributor" and location.uploaded_by != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    valid_types = [
-        'starting_point', 'mrf', 'landfill', 'incinerator',
-        'waste_transfer_station', 'transit', 'unknown'
-    ]
-    if location_type not in valid_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid location_type. Must be one of: {', '.join(valid_types)}"
-        )
+    _check_location_types([location_type])
 
     location.location_type = location_type
     location.location_type_confidence = 'manual'
@@ -55,15 +59,84 @@ def classify_location(
     return {"status": "success", "location_id": location_id, "location_type": location_type}
 
 
+@router.post("/locations/classify")
+def bulk_classify_locations(
+    bulk: schemas.BulkClassify,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Classify many locations in one transaction.
+
+    Send either `classifications` ([{location_id, location_type}, ...]) or
+    a `filter` (investigation_id plus address/city/state/tracker_id/
+    current_type) with one `location_type`, e.g. every location at an
+    address. Contributors can only classify their own uploads; a filter
+    only matches those.
+    """
+    if (bulk.classifications is None) == (bulk.filter is None):
+        raise HTTPException(status_code=400, detail="Send either classifications or filter")
+
+    connection = db.connection()
+
+    if bulk.classifications is not None:
+        # Later pairs for the same location win
+        wanted = {c.location_id: c.location_type for c in bulk.classifications}
+        _check_location_types(wanted.values())
+
+        # Existence and permissions for the whole batch in one query
+        owners = dict(connection.execute(
+            select(models.Location.id, models.Location.uploaded_by).where(models.Location.id.in_(list(wanted)))
+        ).all())
+        missing = sorted(set(wanted) - set(owners))
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Locations not found: {missing[:20]}")
+        if current_user.role == "contributor":
+            denied = sorted(i for i, uploaded_by in owners.items() if uploaded_by != current_user.id)
+            if denied:
+                raise HTTPException(status_code=403, detail=f"Access denied to locations: {denied[:20]}")
+
+        updated = classification.apply_classifications(connection, wanted)
+        by_type = Counter(wanted.values())
+    else:
+        if bulk.location_type is None:
+            raise HTTPException(status_code=400, detail="location_type is required with filter")
+        _check_location_types([bulk.location_type])
+
+        criteria = [models.Location.tracker_id.in_(
+            select(models.Tracker.id).where(models.Tracker.investigation_id == bulk.filter.investigation_id)
+        )]
+        if bulk.filter.address is not None:
+            criteria.append(func.lower(models.Location.address) == bulk.filter.address.lower())
+        for name in ('city', 'state', 'tracker_id'):
+            value = getattr(bulk.filter, name)
+            if value is not None:
+                criteria.append(getattr(models.Location, name) == value)
+        if bulk.filter.current_type is not None:
+            criteria.append(models.Location.location_type == bulk.filter.current_type)
+        if current_user.role == "contributor":
+            criteria.append(models.Location.uploaded_by == current_user.id)
+
+        updated = classification.classify_matching(connection, criteria, bulk.location_type)
+        by_type = Counter({bulk.location_type: updated})
+
+    db.commit()
+
+    return {"status": "success", "updated": updated, "by_type": dict(by_type)}
+
+
 @router.post("/investigations/{investigation_id}/mark-final-destinations")
 def mark_final_destinations(
     investigation_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Mark the last location for each tracker as the final destination.
     Clears previous final destination flags first.
+
+    Flags are maintained automatically as locations are saved; this is a
+    repair tool for data written outside the app.
     """
     # Verify investigation exists
     investigation = db.query(models.Investigation).filter(
@@ -72,33 +145,12 @@ def mark_final_destinations(
     if not investigation:
         raise HTTPException(status_code=404, detail="Investigation not found")
 
-    # Get all trackers for this investigation
-    trackers = db.query(models.Tracker).filter(
-        models.Tracker.investigation_id == investigation_id
-    ).all()
-
-    # Clear existing final destination flags for this investigation
-    for tracker in trackers:
-        db.query(models.Location).filter(
-            models.Location.tracker_id == tracker.id,
-            models.Location.is_final_destination == True
-        ).update({"is_final_destination": False})
-
-    # Mark the last location for each tracker as final
-    marked_count = 0
-    for tracker in trackers:
-        last_location = db.query(models.Location).filter(
-            models.Location.tracker_id == tracker.id
-        ).order_by(
-            models.Location.screenshot_timestamp.desc()
-        ).first()
-
-        if last_location:
-            last_location.is_final_destination = True
-            marked_count += 1
-
+    final_destinations.mark_final_destinations(db, investigation_id)
     db.commit()
 
+    trackers = final_destinations.tracker_final_locations(db, investigation_id)
+    marked_count = sum(1 for _, final_loc in trackers if final_loc is not None)
+
     return {
         "status": "success",
         "trackers_processed": len(trackers),
@@ -106,107 +158,89 @@ def mark_final_destinations(
     }
 
 
-@router.get("/investigations/{investigation_id}/summary")
-def get_investigation_summary(
+@router.post("/investigations/{investigation_id}/reclassify")
+def reclassify_investigation(
     investigation_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Get investigation summary with destination breakdown.
-    Auto-marks final destinations before generating summary.
+    Re-run facility auto-classification over an investigation's locations
+    in one pass, e.g. after adding facilities to the registry.
+    Manual and verified classifications are kept. Admin-only.
     """
-    # Verify investigation exists
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
     investigation = db.query(models.Investigation).filter(
         models.Investigation.id == investigation_id
     ).first()
     if not investigation:
         raise HTTPException(status_code=404, detail="Investigation not found")
 
-    # Auto-mark final destinations
-    trackers = db.query(models.Tracker).filter(
-        models.Tracker.investigation_id == investigation_id
-    ).all()
-
-    # Clear and re-mark final destinations
-    for tracker in trackers:
-        db.query(models.Location).filter(
-            models.Location.tracker_id == tracker.id
-        ).update({"is_final_destination": False})
+    result = facilities.reclassify_investigation(db.connection(), investigation_id)
+    db.commit()
 
-        last_location = db.query(models.Location).filter(
-            models.Location.tracker_id == tracker.id
-        ).order_by(
-            models.Location.screenshot_timestamp.desc()
-        ).first()
+    return {"status": "success", **result}
 
-        if last_location:
-            last_location.is_final_destination = True
 
-    db.commit()
+@router.get("/investigations/{investigation_id}/summary")
+async def get_investigation_summary(
+    investigation_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_async_current_user)
+):
+    """
+    Get investigation summary with destination breakdown.
 
-    # Destination breakdown (final destinations only)
-    destination_breakdown = db.query(
-        models.Location.location_type,
-        func.count(models.Location.id).label('count')
-    ).join(
-        models.Tracker, models.Location.tracker_id == models.Tracker.id
-    ).filter(
-        models.Tracker.investigation_id == investigation_id,
-        models.Location.is_final_destination == True
-    ).group_by(
-        models.Location.location_type
-    ).all()
+    Read-only: final destinations are maintained as locations are written.
+    """
+    # Verify investigation exists
+    investigation = await db.get(models.Investigation, investigation_id)
+    if not investigation:
+        raise HTTPException(status_code=404, detail="Investigation not found")
 
     # State breakdown
-    state_breakdown = db.query(
+    state_breakdown = (await db.execute(select(
         models.Location.state,
         func.count(func.distinct(models.Tracker.id)).label('tracker_count')
     ).join(
         models.Tracker, models.Location.tracker_id == models.Tracker.id
-    ).filter(
+    ).where(
         models.Tracker.investigation_id == investigation_id,
         models.Location.state.isnot(None)
     ).group_by(
         models.Location.state
     ).order_by(
         func.count(func.distinct(models.Tracker.id)).desc()
-    ).all()
+    ))).all()
 
-    # Total trackers and locations
-    total_trackers = len(trackers)
-    total_locations = db.query(func.count(models.Location.id)).join(
-        models.Tracker, models.Location.tracker_id == models.Tracker.id
-    ).filter(
-        models.Tracker.investigation_id == investigation_id
-    ).scalar()
+    # Tracker details with final destinations and per-tracker counts
+    trackers = await db.run_sync(final_destinations.tracker_final_locations, investigation_id)
 
-    # Tracker details with final destinations
     tracker_details = []
-    for tracker in trackers:
-        final_loc = db.query(models.Location).filter(
-            models.Location.tracker_id == tracker.id,
-            models.Location.is_final_destination == True
-        ).first()
-
-        location_count = db.query(func.count(models.Location.id)).filter(
-            models.Location.tracker_id == tracker.id
-        ).scalar()
-
+    destination_breakdown = Counter()
+    for tracker, final_loc in trackers:
+        if final_loc:
+            destination_breakdown[final_loc.location_type or 'unknown'] += 1
         tracker_details.append({
             "id": tracker.id,
             "name": tracker.name,
             "emoji": tracker.emoji,
             "platform": tracker.platform,
-            "location_count": location_count,
+            "location_count": final_loc.location_count if final_loc else 0,
             "final_destination": {
-                "address": final_loc.address if final_loc else None,
-                "city": final_loc.city if final_loc else None,
-                "state": final_loc.state if final_loc else None,
-                "location_type": final_loc.location_type if final_loc else None,
+                "address": final_loc.address,
+                "city": final_loc.city,
+                "state": final_loc.state,
+                "location_type": final_loc.location_type,
             } if final_loc else None
         })
 
+    # Total trackers and locations
+    total_trackers = len(tracker_details)
+    total_locations = sum(detail["location_count"] for detail in tracker_details)
+
     return {
         "investigation": {
             "id": investigation.id,
@@ -217,10 +251,7 @@ def get_investigation_summary(
         },
         "total_trackers": total_trackers,
         "total_locations": total_locations,
-        "destination_breakdown": {
-            row.location_type or 'unknown': row.count
-            for row in destination_breakdown
-        },
+        "destination_breakdown": dict(destination_breakdown),
         "state_breakdown": [
             {"state": row.state, "tracker_count": row.tracker_count}
             for row in state_breakdown
@@ -232,10 +263,17 @@ def get_investigation_summary(
 @router.get("/investigations/{investigation_id}/export/csv")
 def export_investigation_csv(
     investigation_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Export all investigation data as CSV."""
+    """
+    Export all investigation data as CSV.
+
+    Rows are streamed from the database in batches, so large investigations
+    start downloading right away without being built in memory. The body is
+    gzip-compressed when the client sends Accept-Encoding: gzip.
+    """
     # Verify investigation exists
     investigation = db.query(models.Investigation).filter(
         models.Investigation.id == investigation_id
@@ -243,62 +281,60 @@ def export_investigation_csv(
     if not investigation:
         raise HTTPException(status_code=404, detail="Investigation not found")
 
-    # Get all locations with tracker info
-    rows = db.query(
-        models.Tracker.name.label('tracker_name'),
-        models.Tracker.emoji,
-        models.Tracker.platform,
-        models.Location.address,
-        models.Location.city,
-        models.Location.state,
-        models.Location.postal_code,
-        models.Location.latitude,
-        models.Location.longitude,
-        models.Location.location_type,
-        models.Location.screenshot_timestamp,
-        models.Location.last_seen_text,
-        models.Location.is_final_destination,
-    ).join(
-        models.Tracker, models.Location.tracker_id == models.Tracker.id
-    ).filter(
-        models.Tracker.investigation_id == investigation_id
-    ).order_by(
-        models.Tracker.name,
-        models.Location.screenshot_timestamp
-    ).all()
-
-    # Build CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        'Tracker Name', 'Emoji', 'Platform', 'Address', 'City', 'State',
-        'Postal Code', 'Latitude', 'Longitude', 'Location Type',
-        'Screenshot Timestamp', 'Last Seen', 'Is Final Destination'
-    ])
-
-    for row in rows:
-        writer.writerow([
-            row.tracker_name,
-            row.emoji or '',
-            row.platform,
-            row.address,
-            row.city or '',
-            row.state or '',
-            row.postal_code or '',
-            str(row.latitude) if row.latitude else '',
-            str(row.longitude) if row.longitude else '',
-            row.location_type or 'unknown',
-            row.screenshot_timestamp.isoformat() if row.screenshot_timestamp else '',
-            row.last_seen_text or '',
-            'Yes' if row.is_final_destination else 'No'
-        ])
-
-    output.seek(0)
-
     filename = f"{investigation.brand}_{investigation.name}_export.csv".replace(' ', '_')
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Vary": "Accept-Encoding"
+    }
+
+    chunks = export.iter_csv(investigation_id, get_settings().export_batch_size, ReadSessionLocal)
+    if export.accepts_gzip(request.headers.get('accept-encoding', '')):
+        chunks = export.gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type="text/csv", headers=headers)
 
+
+def _columnar_export(investigation_id: int, db: Session, iter_format, media_type: str, extension: str):
+    investigation = db.query(models.Investigation).filter(
+        models.Investigation.id == investigation_id
+    ).first()
+    if not investigation:
+        raise HTTPException(status_code=404, detail="Investigation not found")
+
+    try:
+        chunks = iter_format(investigation_id, get_settings().export_record_batch_size, ReadSessionLocal)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Columnar exports require pyarrow")
+
+    filename = f"{investigation.brand}_{investigation.name}_export.{extension}".replace(' ', '_')
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        chunks,
+        media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
+
+
+@router.get("/investigations/{investigation_id}/export/arrow")
+def export_investigation_arrow(
+    investigation_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Export all investigation data as an Arrow IPC stream.
+
+    Columns are typed (float64 coordinates, UTC timestamps, dictionary-encoded
+    platform/state/location_type); load with pyarrow.ipc.open_stream.
+    """
+    return _columnar_export(investigation_id, db, export.iter_arrow, export.ARROW_MEDIA_TYPE, "arrows")
+
+
+@router.get("/investigations/{investigation_id}/export/parquet")
+def export_investigation_parquet(
+    investigation_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Export all investigation data as Parquet, with the same typed columns as the Arrow export."""
+    return _columnar_export(investigation_id, db, export.iter_parquet, export.PARQUET_MEDIA_TYPE, "parquet")
@@ -0,0 +1,165 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import Float, cast, select
+from typing import List, Optional
+
+from app.database import get_read_db
+from app import models, schemas
+from app.auth import get_current_user, Principal
+from app.services import spatial
+
+router = APIRouter(prefix="/api/investigations", tags=["spatial"])
+
+MAX_RESULTS = 10000
+
+
+def _spatial_query(
+    db: Session,
+    investigation_id: int,
+    boxes: List[spatial.Box],
+    final_only: bool,
+    current_user: Principal,
+    location_type: Optional[str]
+):
+    query = select(
+        models.Location.id,
+        models.Location.tracker_id,
+        models.Tracker.name.label('tracker_name'),
+        models.Location.address,
+        models.Location.city,
+        models.Location.state,
+        cast(models.Location.latitude, Float).label('latitude'),
+        cast(models.Location.longitude, Float).label('longitude'),
+        models.Location.location_type,
+        models.Location.screenshot_timestamp,
+        models.Location.is_final_destination,
+    )
+    if db.get_bind().dialect.name == 'sqlite':
+        # SQLite (no STAT4) can't estimate geohash ranges and, even with
+        # ANALYZE statistics, would rather walk the investigation's trackers
+        # or the uploader index; find the candidates first. Postgres plans
+        # the plain query from its own statistics.
+        in_boxes = select(models.Location.id).where(spatial.box_criteria(boxes)).cte('in_boxes').prefix_with(
+            'MATERIALIZED'
+        )
+        query = query.select_from(in_boxes).join(models.Location, models.Location.id == in_boxes.c.id)
+    else:
+        query = query.where(spatial.box_criteria(boxes))
+    query = query.join(
+        models.Tracker, models.Location.tracker_id == models.Tracker.id
+    ).where(
+        models.Tracker.investigation_id == investigation_id
+    )
+    if final_only:
+        query = query.where(models.Location.is_final_destination.is_(True))
+    if location_type:
+        query = query.where(models.Location.location_type == location_type)
+    # Contributors only see their own uploads
+    if current_user.role == "contributor":
+        query = query.where(models.Location.uploaded_by == current_user.id)
+    return query
+
+
+def _within_radius(db: Session, query, lat: float, lng: float, radius_m: float) -> List[dict]:
+    found = []
+    for row in db.connection().execute(query):
+        location = dict(row._mapping)
+        distance = spatial.distance_m(lat, lng, location["latitude"], location["longitude"])
+        if distance <= radius_m:
+            location["distance_m"] = round(distance, 1)
+            found.append(location)
+    found.sort(key=lambda location: (location["distance_m"], location["id"]))
+    return found
+
+
+def _check_investigation(db: Session, investigation_id: int):
+    exists = db.query(models.Investigation.id).filter(
+        models.Investigation.id == investigation_id
+    ).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Investigation not found")
+
+
+@router.get("/{investigation_id}/locations/within", response_model=List[schemas.SpatialLocation])
+def get_locations_in_box(
+    investigation_id: int,
+    west: float = Query(..., ge=-180, le=180),
+    south: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    north: float = Query(..., ge=-90, le=90),
+    final_only: bool = False,
+    location_type: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=MAX_RESULTS),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get an investigation's locations inside a bounding box.
+    west > east means the box crosses the antimeridian.
+    """
+    if south > north:
+        raise HTTPException(status_code=400, detail="south must not be greater than north")
+    _check_investigation(db, investigation_id)
+
+    query = _spatial_query(
+        db, investigation_id, spatial.split_box(west, south, east, north), final_only, current_user, location_type
+    ).order_by(models.Location.id).limit(limit)
+    return [dict(row._mapping) for row in db.connection().execute(query)]
+
+
+@router.get("/{investigation_id}/locations/near", response_model=List[schemas.SpatialLocation])
+def get_locations_near(
+    investigation_id: int,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(..., gt=0, le=spatial.MAX_DISTANCE_M),
+    final_only: bool = False,
+    location_type: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=MAX_RESULTS),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get an investigation's locations within radius_m meters of a point, nearest first.
+
+    E.g. final_only=true answers "which trackers ended within 2 km of
+    this landfill".
+    """
+    _check_investigation(db, investigation_id)
+
+    query = _spatial_query(
+        db, investigation_id, spatial.radius_boxes(lat, lng, radius_m), final_only, current_user, location_type
+    )
+    return _within_radius(db, query, lat, lng, radius_m)[:limit]
+
+
+@router.get("/{investigation_id}/locations/nearest", response_model=List[schemas.SpatialLocation])
+def get_nearest_locations(
+    investigation_id: int,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=1000),
+    final_only: bool = False,
+    location_type: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the k locations of an investigation nearest to a point.
+
+    Searches a radius that grows 4x per round until it holds k locations,
+    so each round is an index range scan rather than a full scan.
+    """
+    _check_investigation(db, investigation_id)
+
+    radius_m = 500.0
+    while True:
+        radius_m = min(radius_m, spatial.MAX_DISTANCE_M)
+        query = _spatial_query(
+            db, investigation_id, spatial.radius_boxes(lat, lng, radius_m), final_only, current_user, location_type
+        )
+        found = _within_radius(db, query, lat, lng, radius_m)
+        # Everything within the radius was seen, so the first k are the true nearest
+        if len(found) >= k or radius_m >= spatial.MAX_DISTANCE_M:
+            return found[:k]
+        radius_m *= 4
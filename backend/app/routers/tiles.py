@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from sqlalchemy import Float, cast, select
+import gzip
+
+from app.config import get_settings
+from app.database import get_read_db
+from app import models
+from app.auth import get_current_user, Principal
+from app.routers.tracks import GZIP_MIN_BYTES, get_tracks
+from app.services import vector_tiles
+from app.services.export import accepts_gzip
+from app.services.track_encoding import epoch_seconds
+from app.services.trajectory import MAX_ZOOM
+
+router = APIRouter(prefix="/api/investigations", tags=["tiles"])
+
+
+def _tile_points(db: Session, current_user: Principal, investigation_id: int, z: int, x: int, y: int):
+    west, south, east, north = vector_tiles.tile_bounds(z, x, y)
+    query = select(
+        models.Location.id,
+        models.Location.tracker_id,
+        cast(models.Location.latitude, Float),
+        cast(models.Location.longitude, Float),
+        models.Location.location_type,
+        models.Location.screenshot_timestamp,
+        models.Location.is_final_destination,
+    ).where(
+        models.Location.tracker_id.in_(
+            select(models.Tracker.id).where(models.Tracker.investigation_id == investigation_id)
+        ),
+        models.Location.latitude.between(south, north),
+        models.Location.longitude.between(west, east),
+    )
+
+    # Contributors only see their own uploads
+    if current_user.role == "contributor":
+        query = query.where(models.Location.uploaded_by == current_user.id)
+
+    project = vector_tiles.TileProjection(z, x, y)
+    for location_id, tracker_id, lat, lng, location_type, timestamp, final in db.connection().execute(query):
+        px, py = project(lat, lng)
+        yield px, py, location_id, {
+            "tracker_id": tracker_id,
+            "location_type": location_type,
+            "timestamp": epoch_seconds(timestamp) or None,
+            "final_destination": True if final else None,
+        }
+
+
+def _render_tile(db: Session, current_user: Principal, investigation_id: int, z: int, x: int, y: int) -> bytes:
+    settings = get_settings()
+
+    locations = vector_tiles.Layer("locations")
+    cluster_pixels = settings.tile_cluster_pixels if z <= settings.tile_cluster_max_zoom else 0
+    vector_tiles.add_points(locations, _tile_points(db, current_user, investigation_id, z, x, y), cluster_pixels)
+
+    # Paths simplified to about a pixel at this zoom, from the shared track
+    # cache; trackers that never come near the tile are skipped unsimplified
+    paths = vector_tiles.Layer("tracks")
+    tracks = get_tracks(
+        db, current_user, [models.Tracker.investigation_id == investigation_id], z, None, "dp",
+        vector_tiles.buffered_bounds(z, x, y)
+    )
+    vector_tiles.add_tracks(paths, tracks, z, x, y)
+
+    return vector_tiles.encode_tile([paths, locations])
+
+
+@router.get("/{investigation_id}/tiles/{z}/{x}/{y}.mvt")
+def get_investigation_tile(
+    investigation_id: int,
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get a Mapbox Vector Tile of an investigation's locations and tracker paths.
+
+    Layers: "locations" (points; grouped into cluster features with
+    point_count up to the configured zoom) and "tracks" (one linestring
+    per tracker, simplified for the zoom). Tiles are cached on disk per
+    data version, which changes whenever the investigation's locations do.
+    """
+    if not 0 <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    investigation = db.query(models.Investigation).filter(
+        models.Investigation.id == investigation_id
+    ).first()
+    if not investigation:
+        raise HTTPException(status_code=404, detail="Investigation not found")
+
+    settings = get_settings()
+    versions = dict(db.query(models.Tracker.id, models.Tracker.location_version).filter(
+        models.Tracker.investigation_id == investigation_id
+    ))
+    version = vector_tiles.data_version(
+        versions, settings.tile_cluster_max_zoom, settings.tile_cluster_pixels, settings.track_pixel_tolerance
+    )
+    # Contributors' tiles are built from their own uploads only
+    scope = f"user-{current_user.id}" if current_user.role == "contributor" else "all"
+
+    etag = f'"{scope}-{version}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    cache = vector_tiles.get_tile_cache()
+    tile = cache.get(investigation_id, scope, version, z, x, y)
+    if tile is None:
+        tile = _render_tile(db, current_user, investigation_id, z, x, y)
+        cache.put(investigation_id, scope, version, z, x, y, tile)
+
+    if not tile:
+        return Response(status_code=204, headers=headers)
+    if len(tile) >= GZIP_MIN_BYTES and accepts_gzip(request.headers.get('accept-encoding', '')):
+        tile = gzip.compress(tile, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=tile, media_type=vector_tiles.TILE_MEDIA_TYPE, headers=headers)
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models import Tracker, Investigation
-from app import schemas, models
-from app.auth import get_current_user
+from app import schemas
+from app.auth import get_async_access, get_async_current_user, Principal
+from app.services.access import AccessScope
 
 router = APIRouter(prefix="/api/trackers", tags=["trackers"])
 
@@ -19,24 +21,24 @@ class TrackerUpdate(BaseModel):
 
 
 @router.post("", response_model=schemas.Tracker)
-def create_tracker(
+async def create_tracker(
     tracker: schemas.TrackerCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
     """
     Create a new tracker within an investigation.
     """
     # Verify investigation exists
-    investigation = db.query(Investigation).filter(Investigation.id == tracker.investigation_id).first()
+    investigation = await db.get(Investigation, tracker.investigation_id)
     if not investigation:
         raise HTTPException(status_code=404, detail=f"Investigation {tracker.investigation_id} not found")
     
     # Check if tracker name already exists in this investigation
-    existing = db.query(Tracker).filter(
+    existing = (await db.scalars(select(Tracker).where(
         Tracker.investigation_id == tracker.investigation_id,
         Tracker.name == tracker.name
-    ).first()
+    ))).first()
     
     if existing:
         raise HTTPException(
@@ -47,22 +49,22 @@ def create_tracker(
     # Create tracker
     db_tracker = Tracker(**tracker.model_dump())
     db.add(db_tracker)
-    db.commit()
-    db.refresh(db_tracker)
+    await db.commit()
+    await db.refresh(db_tracker)
     return db_tracker
 
 
 @router.patch("/{tracker_id}", response_model=schemas.Tracker)
-def update_tracker(
+async def update_tracker(
     tracker_id: int,
     updates: TrackerUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_async_current_user)
 ):
     """
     Update tracker properties (emoji, name, notes).
     """
-    tracker = db.query(Tracker).filter(Tracker.id == tracker_id).first()
+    tracker = await db.get(Tracker, tracker_id)
     if not tracker:
         raise HTTPException(status_code=404, detail="Tracker not found")
     
@@ -74,58 +76,46 @@ def update_tracker(
     if updates.notes is not None:
         tracker.notes = updates.notes
     
-    db.commit()
-    db.refresh(tracker)
+    await db.commit()
+    await db.refresh(tracker)
     return tracker
 
 
 @router.get("/{tracker_id}", response_model=schemas.Tracker)
-def get_tracker(
+async def get_tracker(
     tracker_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    access: AccessScope = Depends(get_async_access)
 ):
     """
     Get a tracker by ID.
     Contributors can only see trackers they've uploaded locations to.
     """
-    tracker = db.query(Tracker).filter(Tracker.id == tracker_id).first()
+    # Contributors can only see trackers they've contributed to
+    access.require_tracker(tracker_id)
+
+    tracker = await db.get(Tracker, tracker_id)
     if not tracker:
         raise HTTPException(status_code=404, detail="Tracker not found")
     
-    # Contributors can only see trackers they've contributed to
-    if current_user.role != "admin":
-        has_locations = db.query(models.Location).filter(
-            models.Location.tracker_id == tracker_id,
-            models.Location.uploaded_by == current_user.id
-        ).first()
-        if not has_locations:
-            raise HTTPException(status_code=404, detail="Tracker not found")
-    
     return tracker
 
 
 @router.get("/investigation/{investigation_id}", response_model=List[schemas.Tracker])
-def list_trackers_for_investigation(
+async def list_trackers_for_investigation(
     investigation_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    access: AccessScope = Depends(get_async_access)
 ):
     """
     Get all trackers for a specific investigation.
     Admins see all trackers. Contributors only see trackers they've uploaded to.
     """
-    if current_user.role == "admin":
-        trackers = db.query(Tracker).filter(
-            Tracker.investigation_id == investigation_id
-        ).all()
-    else:
+    query = select(Tracker).where(Tracker.investigation_id == investigation_id)
+    if not access.is_admin:
         # Contributors: only trackers that have locations uploaded by them
-        trackers = db.query(Tracker).join(
-            models.Location, Tracker.id == models.Location.tracker_id
-        ).filter(
-            Tracker.investigation_id == investigation_id,
-            models.Location.uploaded_by == current_user.id
-        ).distinct().all()
+        if not access.tracker_ids:
+            return []
+        query = query.where(Tracker.id.in_(access.tracker_ids))
     
-    return trackers
\ No newline at end of file
+    return (await db.scalars(query)).all()
\ No newline at end of file
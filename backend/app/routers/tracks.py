@@ -0,0 +1,162 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from sqlalchemy import Float, cast, select
+from typing import List, Optional, Tuple
+import gzip
+
+from app.config import get_settings
+from app.database import get_read_db
+from app import models
+from app.auth import get_current_user, Principal
+from app.services import track_encoding, trajectory
+from app.services.track_encoding import Track
+from app.services.export import accepts_gzip
+
+router = APIRouter(prefix="/api/tracks", tags=["tracks"])
+
+# Responses smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+def _track_rows(db: Session, current_user: Principal, *criteria):
+    query = select(
+        models.Location.tracker_id,
+        # Floats straight from the DB skip building a Decimal per value
+        cast(models.Location.latitude, Float),
+        cast(models.Location.longitude, Float),
+        models.Location.screenshot_timestamp,
+        models.Location.location_type,
+    ).where(
+        models.Location.latitude.isnot(None),
+        *criteria
+    )
+
+    # Contributors only see their own uploads
+    if current_user.role == "contributor":
+        query = query.where(models.Location.uploaded_by == current_user.id)
+
+    # Core execution: plain tuples, no ORM row processing
+    return db.connection().execute(query.order_by(
+        models.Location.tracker_id,
+        models.Location.screenshot_timestamp.asc().nulls_last(),
+        models.Location.id
+    ))
+
+
+def _load_tracks(db: Session, current_user: Principal, *tracker_criteria) -> List[Track]:
+    return track_encoding.build_tracks(_track_rows(
+        db, current_user,
+        models.Location.tracker_id.in_(select(models.Tracker.id).where(*tracker_criteria))
+    ))
+
+
+def get_tracks(
+    db: Session,
+    current_user: Principal,
+    tracker_criteria,
+    zoom: Optional[int],
+    tolerance: Optional[float],
+    simplify: str,
+    bounds: Optional[Tuple[float, float, float, float]] = None
+) -> List[Track]:
+    """
+    Tracks of the trackers matching tracker_criteria, simplified when zoom
+    or tolerance is given; with bounds, only the simplified tracks whose
+    bounding box meets that (west, south, east, north) box.
+    """
+    if zoom is None and tolerance is None:
+        return _load_tracks(db, current_user, *tracker_criteria)
+
+    if tolerance is None:
+        tolerance = trajectory.zoom_tolerance(zoom, get_settings().track_pixel_tolerance)
+    versions = dict(db.query(models.Tracker.id, models.Tracker.location_version).filter(*tracker_criteria))
+    # Contributors' tracks are built from their own uploads only
+    scope = current_user.id if current_user.role == "contributor" else None
+
+    return trajectory.simplify_tracks(
+        versions,
+        lambda tracker_ids: _load_tracks(db, current_user, models.Tracker.id.in_(tracker_ids)),
+        simplify,
+        tolerance,
+        scope,
+        bounds
+    )
+
+
+def _track_response(request: Request, tracks: List[Track], format: str, precision: int) -> Response:
+    if format == "polyline":
+        return track_encoding.encode_polyline_json(tracks, precision)
+
+    body = track_encoding.encode_binary(tracks)
+    headers = {
+        "X-Location-Types": ",".join(track_encoding.LOCATION_TYPES),
+        "Vary": "Accept-Encoding",
+    }
+    if len(body) >= GZIP_MIN_BYTES and accepts_gzip(request.headers.get('accept-encoding', '')):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=track_encoding.TRACK_MEDIA_TYPE, headers=headers)
+
+
+TRACK_FORMAT = Query("binary", pattern="^(binary|polyline)$", description="binary, or polyline for JSON")
+POLYLINE_PRECISION = Query(5, ge=5, le=6, description="Polyline precision: 5 (Google) or 6")
+ZOOM = Query(None, ge=0, le=trajectory.MAX_ZOOM, description="Map zoom; simplifies to about one pixel of error")
+TOLERANCE = Query(None, ge=0, description="Simplification tolerance in meters (overrides zoom)")
+SIMPLIFY = Query("dp", pattern="^(dp|vw)$", description="dp (Douglas-Peucker) or vw (Visvalingam-Whyatt)")
+
+
+@router.get("/tracker/{tracker_id}")
+def get_tracker_track(
+    tracker_id: int,
+    request: Request,
+    format: str = TRACK_FORMAT,
+    precision: int = POLYLINE_PRECISION,
+    zoom: Optional[int] = ZOOM,
+    tolerance: Optional[float] = TOLERANCE,
+    simplify: str = SIMPLIFY,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get a tracker's path for map rendering (filtered by user role).
+
+    The default binary body (application/vnd.cuptracker.track) holds
+    delta-encoded int32 microdegree coordinates, uint32 epoch-second
+    timestamps and a uint8 location type code per point; see
+    app/services/track_encoding.py for the layout. format=polyline returns
+    JSON with a Google encoded polyline per track instead.
+
+    With zoom or tolerance the path is simplified (Douglas-Peucker by
+    default) and only the points that matter at that scale are sent.
+    """
+    tracker = db.query(models.Tracker).filter(models.Tracker.id == tracker_id).first()
+    if not tracker:
+        raise HTTPException(status_code=404, detail="Tracker not found")
+
+    tracks = get_tracks(db, current_user, [models.Tracker.id == tracker_id], zoom, tolerance, simplify)
+    return _track_response(request, tracks, format, precision)
+
+
+@router.get("/investigation/{investigation_id}")
+def get_investigation_tracks(
+    investigation_id: int,
+    request: Request,
+    format: str = TRACK_FORMAT,
+    precision: int = POLYLINE_PRECISION,
+    zoom: Optional[int] = ZOOM,
+    tolerance: Optional[float] = TOLERANCE,
+    simplify: str = SIMPLIFY,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get the paths of every tracker in an investigation, one track per tracker, in one response."""
+    investigation = db.query(models.Investigation).filter(
+        models.Investigation.id == investigation_id
+    ).first()
+    if not investigation:
+        raise HTTPException(status_code=404, detail="Investigation not found")
+
+    tracks = get_tracks(
+        db, current_user, [models.Tracker.investigation_id == investigation_id], zoom, tolerance, simplify
+    )
+    return _track_response(request, tracks, format, precision)
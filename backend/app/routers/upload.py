@@ -1,30 +1,51 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from typing import List
-import shutil
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from contextlib import aclosing
+import asyncio
+import json
+import time
 from pathlib import Path
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from app.services.ocr_processor import CrossPlatformOCRProcessor
+from app.services.ocr_pool import (
+    OCRWorkerPool, OCRPoolSaturated, OCRJobTimeout, get_ocr_pool,
+    format_ocr_result
+)
+from app.services.ocr_jobs import FINISHED_STATUSES, get_ocr_job_runner
+from app.services.upload_stream import stream_files_to_disk
+from app.services.screenshot_store import ScreenshotStore
+from app.services.ocr_cache import ocr_cache, process_with_cache
+from app.config import get_settings
 from app import models
-from app.auth import get_current_user
+from app.database import get_db, SessionLocal
+from app.auth import get_current_user, get_current_admin, Principal
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
-# Create uploads directory if it doesn't exist
+# Created by the app's lifespan at startup, not on import
 UPLOAD_DIR = Path(__file__).parent.parent.parent / "uploads"
-UPLOAD_DIR.mkdir(exist_ok=True)
+
+# Screenshots are stored by content hash, so duplicates share one file
+screenshot_store = ScreenshotStore(UPLOAD_DIR)
+
 
 @router.post("/screenshot")
 async def upload_screenshot(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    ocr_pool: OCRWorkerPool = Depends(get_ocr_pool)
 ):
     """
     Upload a single screenshot for OCR processing.
     
     Returns extracted data: tracker name, address, timestamp, etc.
     User can then review and confirm before saving to database.
+    OCR runs in the worker pool; returns 429 when the pool is saturated.
+    Screenshots that were uploaded before are answered from the OCR cache.
     """
     
     # Validate file type
@@ -34,42 +55,36 @@ async def upload_screenshot(
             detail=f"Invalid file type: {file.content_type}. Must be an image."
         )
     
-    # Generate unique filename
-    file_ext = Path(file.filename).suffix
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = UPLOAD_DIR / unique_filename
+    # Save file permanently under its content hash (don't delete after OCR)
+    stored = await run_in_threadpool(screenshot_store.save, file.file, file.filename)
     
     try:
-        # Save file permanently (don't delete after OCR)
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Process with OCR
-        processor = CrossPlatformOCRProcessor()
-        ocr_result = processor.process_screenshot(str(file_path))
+        # Process with OCR in the worker pool, unless already cached
+        ocr_result, cache_hit = await process_with_cache(ocr_pool, str(stored.disk_path))
         
         # Return results with relative path for serving
         return {
             "status": "success",
             "filename": file.filename,
             "uploaded_at": datetime.now().isoformat(),
-            "file_size": file_path.stat().st_size,
-            "file_path": f"/uploads/{unique_filename}",  # CHANGED: relative path for serving
-            "ocr_result": {
-                "platform": ocr_result.get('platform'),
-                "tracker_name": ocr_result.get('tracker_name'),
-                "address": ocr_result.get('address'),
-                "last_seen": ocr_result.get('last_seen'),
-                "confidence": ocr_result.get('confidence'),
-                "raw_text": ocr_result.get('raw_text'),
-                "error": ocr_result.get('error')
-            }
+            "file_size": stored.size,
+            "file_path": stored.url_path,  # CHANGED: relative path for serving
+            "content_hash": stored.sha256,
+            "cache_hit": cache_hit,
+            "ocr_result": format_ocr_result(ocr_result)
         }
         
     except Exception as e:
-        # Clean up file if processing failed
-        if file_path.exists():
-            file_path.unlink()
+        # The file stays: it is content-addressed, so a concurrent upload of
+        # the same bytes may already be pointing at it
+        if isinstance(e, OCRPoolSaturated):
+            raise HTTPException(
+                status_code=429,
+                detail="OCR queue is full, please retry shortly",
+                headers={"Retry-After": "5"}
+            )
+        if isinstance(e, OCRJobTimeout):
+            raise HTTPException(status_code=504, detail=str(e))
         
         raise HTTPException(
             status_code=500,
@@ -77,40 +92,318 @@ async def upload_screenshot(
         )
 
 
-@router.post("/screenshots")
+async def _ocr_with_retry(ocr_pool: OCRWorkerPool, file_path: str):
+    """Run cached OCR, waiting out short bursts of pool saturation."""
+    deadline = time.perf_counter() + ocr_pool.job_timeout
+    while True:
+        try:
+            return await process_with_cache(ocr_pool, file_path)
+        except OCRPoolSaturated:
+            if time.perf_counter() >= deadline:
+                raise
+            await asyncio.sleep(0.25)
+
+
+# The batch endpoints parse the body themselves; describe it for the docs
+FILES_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["files"],
+            "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}}
+        }}}
+    }
+}
+
+
+@router.post("/screenshots", openapi_extra=FILES_BODY)
 async def upload_screenshots(
-    files: List[UploadFile] = File(...),
-    current_user: models.User = Depends(get_current_user)
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    ocr_pool: OCRWorkerPool = Depends(get_ocr_pool)
 ):
     """
     Upload multiple screenshots for batch OCR processing.
     
-    Returns array of results for each screenshot.
+    Each file is written to disk as it is received and handed to the OCR
+    pool straight away, so OCR of early files overlaps the upload of later
+    ones. Returns results in upload order with per-file timings.
     """
+    settings = get_settings()
+    batch_start = time.perf_counter()
+    semaphore = asyncio.Semaphore(settings.upload_batch_concurrency or ocr_pool.workers)
+    results = {}
+    tasks = []
     
-    if len(files) > 10:
-        raise HTTPException(
-            status_code=400,
-            detail="Maximum 10 files allowed per batch upload"
-        )
+    async def process(part):
+        if not part.is_image:
+            results[part.position] = {
+                "status": "error",
+                "filename": part.filename,
+                "error": f"Invalid file type: {part.content_type}. Must be an image."
+            }
+            return
+        
+        queued_at = time.perf_counter()
+        async with semaphore:
+            ocr_start = time.perf_counter()
+            try:
+                ocr_result, cache_hit = await _ocr_with_retry(ocr_pool, str(part.stored.disk_path))
+            except Exception as e:
+                # Kept on disk, as in upload_screenshot
+                results[part.position] = {
+                    "status": "error",
+                    "filename": part.filename,
+                    "error": f"Error processing screenshot: {e}"
+                }
+                return
+            ocr_end = time.perf_counter()
+        
+        results[part.position] = {
+            "status": "success",
+            "filename": part.filename,
+            "uploaded_at": datetime.now().isoformat(),
+            "file_size": part.file_size,
+            "file_path": part.stored.url_path,
+            "content_hash": part.stored.sha256,
+            "cache_hit": cache_hit,
+            "ocr_result": format_ocr_result(ocr_result),
+            "timings": {
+                "receive_ms": round(part.receive_seconds * 1000, 1),
+                "queue_ms": round((ocr_start - queued_at) * 1000, 1),
+                "ocr_ms": round((ocr_end - ocr_start) * 1000, 1)
+            }
+        }
     
-    results = []
+    try:
+        async for part in stream_files_to_disk(
+            request, "files", screenshot_store, settings.upload_max_batch_files
+        ):
+            tasks.append(asyncio.create_task(process(part)))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
     
-    for file in files:
-        try:
-            # Process each file individually
-            result = await upload_screenshot(file)
-            results.append(result)
-        except HTTPException as e:
-            # Include error in results but continue processing other files
-            results.append({
-                "status": "error",
-                "filename": file.filename,
-                "error": e.detail
-            })
+    if not tasks:
+        raise HTTPException(status_code=400, detail="No files uploaded")
     
     return {
         "status": "success",
-        "total_files": len(files),
-        "results": results
+        "total_files": len(tasks),
+        "elapsed_ms": round((time.perf_counter() - batch_start) * 1000, 1),
+        "results": [results[position] for position in range(len(tasks))]
+    }
+
+
+def _create_job(db: Session, user_id: int, saved_files: List[dict]) -> str:
+    """Insert a job and its pending items (blocking; run in a thread)."""
+    job = models.OCRJob(
+        id=str(uuid.uuid4()),
+        status='pending',
+        total_files=len(saved_files),
+        completed_files=0,
+        created_by=user_id
+    )
+    db.add(job)
+    for position, saved in enumerate(saved_files):
+        db.add(models.OCRJobItem(
+            job_id=job.id,
+            position=position,
+            file_path=saved["disk_path"],
+            file_name=saved["filename"],
+            file_size=saved["file_size"],
+            status='pending',
+            attempts=0
+        ))
+    db.commit()
+    return job.id
+
+
+def _get_job_for_user(db: Session, job_id: str, current_user: Principal) -> models.OCRJob:
+    job = db.query(models.OCRJob).filter(models.OCRJob.id == job_id).first()
+    if not job or (current_user.role != "admin" and job.created_by != current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _job_item_to_dict(item: models.OCRJobItem) -> dict:
+    return {
+        "position": item.position,
+        "filename": item.file_name,
+        "status": item.status,
+        "file_size": item.file_size,
+        "file_path": screenshot_store.url_for(item.file_path),
+        "ocr_result": json.loads(item.ocr_result) if item.ocr_result else None,
+        "error": item.error
     }
+
+
+def _job_to_dict(job: models.OCRJob, include_items: bool = True) -> dict:
+    result = {
+        "job_id": job.id,
+        "status": job.status,
+        "total_files": job.total_files,
+        "completed_files": job.completed_files,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+    if include_items:
+        result["results"] = [_job_item_to_dict(item) for item in job.items]
+    return result
+
+
+@router.post("/jobs", status_code=202, openapi_extra=FILES_BODY)
+async def create_ocr_job(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Queue screenshots for background OCR processing.
+    
+    Files are written to disk as they arrive, with the same per-batch
+    limit as /screenshots. Returns a job ID immediately. Poll
+    /api/upload/jobs/{job_id} or stream /api/upload/jobs/{job_id}/events
+    for per-file results.
+    """
+    saved_files = []
+    parts = stream_files_to_disk(request, "files", screenshot_store, get_settings().upload_max_batch_files)
+    # Closing the stream on an error releases the files it already stored
+    async with aclosing(parts):
+        async for part in parts:
+            if not part.is_image:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid file type for {part.filename}: {part.content_type}. Must be an image."
+                )
+            saved_files.append({
+                "disk_path": str(part.stored.disk_path),
+                "filename": part.filename,
+                "file_size": part.stored.size
+            })
+    
+    if not saved_files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    
+    job_id = await run_in_threadpool(_create_job, db, current_user.id, saved_files)
+    
+    runner = get_ocr_job_runner()
+    if runner is not None:
+        runner.notify()
+    
+    return {
+        "status": "queued",
+        "job_id": job_id,
+        "total_files": len(saved_files),
+        "status_url": f"/api/upload/jobs/{job_id}",
+        "events_url": f"/api/upload/jobs/{job_id}/events"
+    }
+
+
+@router.get("/jobs/{job_id}")
+def get_ocr_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get the status of an OCR job and the results finished so far."""
+    job = _get_job_for_user(db, job_id, current_user)
+    return _job_to_dict(job)
+
+
+# Items are stamped finished_at just before their transaction commits, so
+# one can become visible after a later-stamped item was already streamed.
+# Each poll re-reads this far behind the newest item sent and skips the
+# few ids it has seen there.
+STREAM_OVERLAP = timedelta(seconds=5)
+
+
+def _load_finished_items(job_id: str, since: Optional[datetime]):
+    """
+    Return (job, [(item_id, finished_at, item)]) for items finished at or
+    after `since`, oldest first, using a short-lived session; job is None
+    once deleted.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(models.OCRJob).filter(models.OCRJob.id == job_id).first()
+        if job is None:
+            return None, []
+        query = db.query(models.OCRJobItem).filter(
+            models.OCRJobItem.job_id == job_id,
+            models.OCRJobItem.status.in_(['completed', 'error'])
+        )
+        if since is not None:
+            query = query.filter(models.OCRJobItem.finished_at >= since)
+        items = query.order_by(models.OCRJobItem.finished_at, models.OCRJobItem.id).all()
+        return _job_to_dict(job, include_items=False), [
+            (item.id, item.finished_at, _job_item_to_dict(item)) for item in items
+        ]
+    finally:
+        db.close()
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_ocr_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Server-sent events stream for an OCR job.
+    
+    Emits a `result` event with each file's ocr_result as it finishes,
+    then a final `done` event with the job status (completed, partial if
+    some files failed, or failed if all did), or an `error` event
+    if the job is deleted while being streamed.
+    """
+    await run_in_threadpool(_get_job_for_user, db, job_id, current_user)
+    
+    async def event_stream():
+        newest = None  # finished_at of the newest item sent
+        recent = {}  # item_id -> finished_at, for items sent within STREAM_OVERLAP of newest
+        while True:
+            since = newest - STREAM_OVERLAP if newest is not None else None
+            job, items = await run_in_threadpool(_load_finished_items, job_id, since)
+            if job is None:
+                yield _sse("error", {"job_id": job_id, "detail": "Job not found"})
+                return
+            for item_id, finished_at, item in items:
+                if item_id in recent:
+                    continue
+                recent[item_id] = finished_at
+                newest = finished_at if newest is None else max(newest, finished_at)
+                yield _sse("result", item)
+            if newest is not None:
+                recent = {item_id: at for item_id, at in recent.items() if at >= newest - STREAM_OVERLAP}
+            
+            if job["status"] in FINISHED_STATUSES:
+                yield _sse("done", job)
+                return
+            
+            # Wake on local progress; the timeout also covers other processes
+            runner = get_ocr_job_runner()
+            if runner is not None:
+                await runner.wait_for_progress(timeout=15)
+            else:
+                await asyncio.sleep(2)
+            yield ": keep-alive\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cache/stats")
+def get_ocr_cache_stats(current_user: Principal = Depends(get_current_admin)):
+    """OCR cache hit/miss counts for this server process. Admin-only."""
+    return ocr_cache.stats()
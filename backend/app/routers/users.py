@@ -5,10 +5,12 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app import models
-from app.auth import get_current_user
+from app.auth import get_current_user, invalidate_principal, Principal
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
+ROLES = ("admin", "contributor", "viewer")
+
 
 class UserOut(BaseModel):
     id: int
@@ -20,10 +22,14 @@ class UserOut(BaseModel):
         from_attributes = True
 
 
+class RoleUpdate(BaseModel):
+    role: str
+
+
 @router.get("", response_model=List[UserOut])
 def list_users(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     List all users. Admin-only.
@@ -32,4 +38,35 @@ def list_users(
         raise HTTPException(status_code=403, detail="Admin access required")
     
     users = db.query(models.User).order_by(models.User.full_name).all()
-    return users
\ No newline at end of file
+    return users
+
+
+@router.patch("/{user_id}/role", response_model=UserOut)
+def update_user_role(
+    user_id: int,
+    update: RoleUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Change a user's role. Admin-only.
+
+    Takes effect on the user's next request in this process; other
+    workers notice within principal_cache_ttl_seconds.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if update.role not in ROLES:
+        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(ROLES)}")
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot change your own role")
+
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user.role = update.role
+    db.commit()
+    db.refresh(user)
+    invalidate_principal(user.email)
+    return user
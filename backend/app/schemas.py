@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
+import json
 
 
 # User schemas
@@ -123,6 +124,12 @@ class Screenshot(ScreenshotBase):
 
 
 # Location schemas
+VALID_LOCATION_TYPES = (
+    'starting_point', 'mrf', 'landfill', 'incinerator',
+    'waste_transfer_station', 'transit', 'unknown'
+)
+
+
 class LocationBase(BaseModel):
     address: str
     latitude: Optional[Decimal] = None
@@ -146,12 +153,90 @@ class Location(LocationBase):
     uploaded_at: Optional[datetime] = None  # CHANGED: Made optional
     uploaded_by: Optional[int] = None
     uploaded_by_name: Optional[str] = None
+    geocode_status: Optional[str] = None  # pending until the background geocoder runs
     screenshots: List[Screenshot] = []
 
     class Config:
         from_attributes = True
 
 
+class LocationClassification(BaseModel):
+    location_id: int
+    location_type: str
+
+
+class LocationClassificationFilter(BaseModel):
+    """Selects an investigation's locations by exact field values."""
+    investigation_id: int
+    address: Optional[str] = None  # Case-insensitive
+    city: Optional[str] = None
+    state: Optional[str] = None
+    tracker_id: Optional[int] = None
+    current_type: Optional[str] = None  # Only locations with this location_type
+
+
+class BulkClassify(BaseModel):
+    """Either explicit (location_id, location_type) pairs, or a filter plus one location_type."""
+    classifications: Optional[List[LocationClassification]] = Field(None, max_length=10000)
+    filter: Optional[LocationClassificationFilter] = None
+    location_type: Optional[str] = None  # Applied to every location the filter matches
+
+
+class SpatialLocation(BaseModel):
+    """A location returned by the bbox / radius / nearest queries."""
+    id: int
+    tracker_id: int
+    tracker_name: str
+    address: str
+    city: Optional[str] = None
+    state: Optional[str] = None
+    latitude: float
+    longitude: float
+    location_type: Optional[str] = None
+    screenshot_timestamp: Optional[datetime] = None
+    is_final_destination: Optional[bool] = False
+    distance_m: Optional[float] = None  # From the query point, for radius and nearest
+
+
+# Facility registry schemas
+class FacilityBase(BaseModel):
+    facility_name: str
+    address: Optional[str] = None
+    facility_type: str
+    state: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)  # Defaults to the boundary's centre
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    radius_m: Optional[float] = Field(None, gt=0, le=50000)  # Used when there is no boundary
+    boundary: Optional[List[List[float]]] = None  # [[lng, lat], ...] outer ring
+    verified: Optional[bool] = False
+
+
+class FacilityCreate(FacilityBase):
+    pass
+
+
+class Facility(FacilityBase):
+    id: int
+    created_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    @field_validator('boundary', mode='before')
+    @classmethod
+    def decode_boundary(cls, value):
+        # Stored as JSON text on the model
+        return json.loads(value) if isinstance(value, str) else value
+
+    class Config:
+        from_attributes = True
+
+
+class GeocodeStatus(BaseModel):
+    pending: int = 0  # Includes locations being geocoded right now
+    complete: int = 0
+    not_found: int = 0
+    error: int = 0  # Lookups kept failing; not retried
+
+
 # OCR-specific schema
 class SaveLocationFromOCR(BaseModel):
     investigation_id: int
@@ -165,3 +250,10 @@ class SaveLocationFromOCR(BaseModel):
     postal_code: Optional[str] = None
     screenshot_path: Optional[str] = None
     ocr_raw_text: Optional[str] = None
+
+
+class BulkLocationFromOCR(SaveLocationFromOCR):
+    """One row of a bulk ingest; known coordinates skip the background geocoder."""
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    location_type: Optional[str] = None
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import event, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import get_settings
+
+
+@dataclass(frozen=True)
+class AccessScope:
+    """
+    What one user may see: the investigations they are assigned to and
+    the trackers they have uploaded locations to. Admins see everything,
+    so their sets are never consulted.
+    """
+    user_id: int
+    is_admin: bool
+    investigation_ids: FrozenSet[int] = frozenset()
+    tracker_ids: FrozenSet[int] = frozenset()
+
+    def can_view_investigation(self, investigation_id: int) -> bool:
+        return self.is_admin or investigation_id in self.investigation_ids
+
+    def can_view_tracker(self, tracker_id: int) -> bool:
+        return self.is_admin or tracker_id in self.tracker_ids
+
+    def require_investigation(self, investigation_id: int):
+        if not self.can_view_investigation(investigation_id):
+            raise HTTPException(status_code=403, detail="Access denied to this investigation")
+
+    def require_tracker(self, tracker_id: int):
+        # 404 rather than 403, so trackers of other contributors stay unseen
+        if not self.can_view_tracker(tracker_id):
+            raise HTTPException(status_code=404, detail="Tracker not found")
+
+
+def load_access(connection, user_id: int) -> AccessScope:
+    """Read a user's assigned investigations and uploaded-to trackers in one query."""
+    rows = connection.execute(union_all(
+        select(literal('i').label('kind'), models.InvestigationUser.investigation_id.label('id')).where(
+            models.InvestigationUser.user_id == user_id
+        ),
+        select(literal('t').label('kind'), models.Location.tracker_id.label('id')).where(
+            models.Location.uploaded_by == user_id
+        ).distinct(),
+    ))
+    investigation_ids, tracker_ids = set(), set()
+    for kind, id_ in rows:
+        (investigation_ids if kind == 'i' else tracker_ids).add(id_)
+    return AccessScope(user_id, False, frozenset(investigation_ids), frozenset(tracker_ids))
+
+
+class AccessCache:
+    """
+    AccessScopes by user id for a short TTL. Entries are dropped when a
+    user is assigned to an investigation or commits new locations; other
+    processes pick such changes up when their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_size: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[AccessScope]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            scope, expires_at = entry
+            if expires_at <= now:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return scope
+
+    def set(self, scope: AccessScope):
+        with self._lock:
+            self._entries[scope.user_id] = (scope, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(scope.user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[int]):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[AccessCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_access_cache() -> AccessCache:
+    """Get the process-wide access cache, created from settings on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = AccessCache(settings.access_cache_ttl_seconds, settings.access_cache_size)
+        return _cache
+
+
+def access_for(db: Session, user_id: int, role: str) -> AccessScope:
+    """The user's AccessScope, from the cache or loaded with one query."""
+    if role == "admin":
+        return AccessScope(user_id, True)
+    cache = get_access_cache()
+    scope = cache.get(user_id)
+    if scope is None:
+        scope = load_access(db.connection(), user_id)
+        cache.set(scope)
+    return scope
+
+
+def invalidate_access(*user_ids: int):
+    """Forget cached scopes, e.g. after Core writes that bypass the session hooks."""
+    get_access_cache().invalidate(user_ids)
+
+
+_AFFECTED_KEY = 'access_affected_users'
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_affected_users(session, flush_context, instances):
+    affected = session.info.setdefault(_AFFECTED_KEY, set())
+    for obj in session.new:
+        if isinstance(obj, models.InvestigationUser) and obj.user_id is not None:
+            affected.add(obj.user_id)
+        elif isinstance(obj, models.Location) and obj.uploaded_by is not None:
+            affected.add(obj.uploaded_by)
+    for obj in session.deleted:
+        if isinstance(obj, models.InvestigationUser) and obj.user_id is not None:
+            affected.add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_affected_users(session):
+    affected = session.info.pop(_AFFECTED_KEY, None)
+    if affected:
+        get_access_cache().invalidate(affected)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_affected_users(session):
+    session.info.pop(_AFFECTED_KEY, None)
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert, select, tuple_
+
+from app import models, schemas
+from app.services import facilities, final_destinations, spatial, track_versions
+
+
+class BulkIngestResult:
+    """What a bulk ingest wrote, accumulated across batches."""
+
+    def __init__(self):
+        self.rows: List[Dict] = []  # {location_id, tracker_id, screenshot_id} in input order
+        self.trackers_created = 0
+        self.pending_geocode = 0
+        self.tracker_ids = set()
+
+
+def _resolve_trackers(connection, items: List[schemas.BulkLocationFromOCR],
+                      result: BulkIngestResult) -> Dict[Tuple[int, str], int]:
+    keys = {(item.investigation_id, item.tracker_name) for item in items}
+    tracker_ids = {
+        (investigation_id, name): tracker_id
+        for tracker_id, investigation_id, name in connection.execute(
+            select(models.Tracker.id, models.Tracker.investigation_id, models.Tracker.name).where(
+                tuple_(models.Tracker.investigation_id, models.Tracker.name).in_(sorted(keys))
+            )
+        )
+    }
+
+    # First row naming a new tracker decides its platform, as with single saves
+    missing = {}
+    for item in items:
+        key = (item.investigation_id, item.tracker_name)
+        if key not in tracker_ids and key not in missing:
+            missing[key] = item.platform
+    if missing:
+        created = connection.execute(
+            insert(models.Tracker).returning(models.Tracker.id, sort_by_parameter_order=True),
+            [
+                {"investigation_id": investigation_id, "name": name, "platform": platform}
+                for (investigation_id, name), platform in missing.items()
+            ]
+        ).scalars().all()
+        tracker_ids.update(zip(missing, created))
+        result.trackers_created += len(created)
+    return tracker_ids
+
+
+def ingest_batch(connection, items: List[schemas.BulkLocationFromOCR], user_id: int, result: BulkIngestResult):
+    """
+    Insert one batch of OCR results: trackers resolved (and created) with
+    one query each way, then locations and screenshots as executemany
+    INSERT ... RETURNING, which SQLAlchemy sends as multi-row statements
+    (insertmanyvalues) on both Postgres and SQLite.
+
+    Geohash and facility classification are computed here for rows that
+    come with coordinates, since Core inserts bypass the flush hooks.
+    Call finish() once after the last batch.
+    """
+    if not items:
+        return
+
+    tracker_ids = _resolve_trackers(connection, items, result)
+    facility_index = facilities.get_facility_index(connection)
+    now = datetime.utcnow()
+
+    location_rows = []
+    for item in items:
+        tracker_id = tracker_ids[(item.investigation_id, item.tracker_name)]
+        row = {
+            "tracker_id": tracker_id,
+            "address": item.address,
+            "city": item.city,
+            "state": item.state,
+            "postal_code": item.postal_code,
+            "last_seen_text": item.last_seen_text,
+            "screenshot_timestamp": item.screenshot_timestamp,
+            "location_type": item.location_type,
+            "location_type_confidence": None,
+            "latitude": item.latitude,
+            "longitude": item.longitude,
+            "geohash": None,
+            "geocode_status": "pending",
+            "uploaded_by": user_id,
+            "uploaded_at": now,
+        }
+        if item.latitude is not None and item.longitude is not None:
+            row["geocode_status"] = "complete"
+            row["geohash"] = spatial.encode_geohash(item.latitude, item.longitude)
+            if item.location_type in (None, 'unknown'):
+                facility = facility_index.match(item.latitude, item.longitude)
+                if facility is not None:
+                    row["location_type"] = facility.facility_type
+                    row["location_type_confidence"] = 'auto'
+        else:
+            row["latitude"] = row["longitude"] = None
+            result.pending_geocode += 1
+        location_rows.append(row)
+        result.tracker_ids.add(tracker_id)
+
+    location_ids = connection.execute(
+        insert(models.Location).returning(models.Location.id, sort_by_parameter_order=True),
+        location_rows
+    ).scalars().all()
+
+    screenshot_rows = [
+        {
+            "location_id": location_id,
+            "file_path": item.screenshot_path,
+            "file_name": item.screenshot_path.split('/')[-1],
+            "platform": item.platform,
+            "ocr_raw_text": item.ocr_raw_text,
+            "uploaded_by": user_id,
+            "uploaded_at": now,
+        }
+        for item, location_id in zip(items, location_ids)
+        if item.screenshot_path
+    ]
+    screenshot_ids = {}
+    if screenshot_rows:
+        inserted = connection.execute(
+            insert(models.Screenshot).returning(
+                models.Screenshot.id, models.Screenshot.location_id, sort_by_parameter_order=True
+            ),
+            screenshot_rows
+        ).all()
+        screenshot_ids = {location_id: screenshot_id for screenshot_id, location_id in inserted}
+
+    for row, location_id in zip(location_rows, location_ids):
+        result.rows.append({
+            "location_id": location_id,
+            "tracker_id": row["tracker_id"],
+            "screenshot_id": screenshot_ids.get(location_id),
+        })
+
+
+def finish(connection, result: BulkIngestResult):
+    """Bring derived state up to date for every tracker the ingest touched."""
+    final_destinations.refresh_final_destinations(connection, result.tracker_ids)
+    track_versions.bump_track_versions(connection, result.tracker_ids)
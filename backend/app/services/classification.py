@@ -0,0 +1,68 @@
+from typing import Dict
+
+from sqlalchemy import Integer, String, bindparam, column, select, update, values
+
+from app import models
+from app.services import track_versions
+
+# Rows per UPDATE ... FROM (VALUES ...); two parameters each, well under
+# Postgres' 65535 bind parameter limit
+VALUES_BATCH_SIZE = 5000
+
+
+def apply_classifications(connection, classifications: Dict[int, str], confidence: str = 'manual') -> int:
+    """
+    Set location_type for many locations at once; returns the rows updated.
+
+    Postgres gets one UPDATE ... FROM (VALUES ...) per batch; other
+    databases (SQLite cannot alias VALUES columns) get a single
+    executemany. Affected trackers' location_version is bumped, since
+    these Core writes bypass the flush hooks.
+    """
+    if not classifications:
+        return 0
+
+    pairs = sorted(classifications.items())
+    updated = 0
+    if connection.dialect.name == 'postgresql':
+        for start in range(0, len(pairs), VALUES_BATCH_SIZE):
+            new_types = values(
+                column('id', Integer), column('location_type', String), name='new_types'
+            ).data(pairs[start:start + VALUES_BATCH_SIZE])
+            updated += connection.execute(
+                update(models.Location).where(models.Location.id == new_types.c.id).values(
+                    location_type=new_types.c.location_type,
+                    location_type_confidence=confidence
+                )
+            ).rowcount
+    else:
+        updated = connection.execute(
+            update(models.Location).where(models.Location.id == bindparam('location_id')).values(
+                location_type=bindparam('new_type'),
+                location_type_confidence=confidence
+            ),
+            [{'location_id': location_id, 'new_type': location_type} for location_id, location_type in pairs]
+        ).rowcount
+
+    tracker_ids = connection.execute(
+        select(models.Location.tracker_id).distinct().where(
+            models.Location.id.in_([location_id for location_id, _ in pairs])
+        )
+    ).scalars().all()
+    track_versions.bump_track_versions(connection, tracker_ids)
+    return updated
+
+
+def classify_matching(connection, criteria, location_type: str, confidence: str = 'manual') -> int:
+    """Set one location_type on every location matching criteria in a single UPDATE."""
+    tracker_ids = connection.execute(
+        select(models.Location.tracker_id).distinct().where(*criteria)
+    ).scalars().all()
+    updated = connection.execute(
+        update(models.Location).where(*criteria).values(
+            location_type=location_type,
+            location_type_confidence=confidence
+        )
+    ).rowcount
+    track_versions.bump_track_versions(connection, tracker_ids)
+    return updated
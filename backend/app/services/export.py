@@ -0,0 +1,238 @@
+import csv
+import io
+import zlib
+from typing import Iterator
+
+from sqlalchemy import select
+
+from app import models
+from app.database import SessionLocal
+
+CSV_HEADER = [
+    'Tracker Name', 'Emoji', 'Platform', 'Address', 'City', 'State',
+    'Postal Code', 'Latitude', 'Longitude', 'Location Type',
+    'Screenshot Timestamp', 'Last Seen', 'Is Final Destination'
+]
+
+
+def export_query(investigation_id: int):
+    """All locations of an investigation with their tracker, in export order."""
+    return select(
+        models.Location.id.label('location_id'),
+        models.Location.tracker_id,
+        models.Tracker.name.label('tracker_name'),
+        models.Tracker.emoji,
+        models.Tracker.platform,
+        models.Location.address,
+        models.Location.city,
+        models.Location.state,
+        models.Location.postal_code,
+        models.Location.latitude,
+        models.Location.longitude,
+        models.Location.location_type,
+        models.Location.screenshot_timestamp,
+        models.Location.last_seen_text,
+        models.Location.is_final_destination,
+    ).join(
+        models.Tracker, models.Location.tracker_id == models.Tracker.id
+    ).where(
+        models.Tracker.investigation_id == investigation_id
+    ).order_by(
+        models.Tracker.name,
+        models.Location.screenshot_timestamp
+    )
+
+
+def iter_export_batches(investigation_id: int, batch_size: int, session_factory=SessionLocal):
+    """
+    Yield export rows in lists of up to batch_size.
+
+    Uses its own session so it can outlive the request handler, and
+    yield_per so rows come off a server-side cursor (where the driver has
+    one) instead of being loaded all at once.
+    """
+    db = session_factory()
+    try:
+        result = db.execute(
+            export_query(investigation_id).execution_options(yield_per=batch_size)
+        )
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def _csv_fields(row):
+    return [
+        row.tracker_name,
+        row.emoji or '',
+        row.platform,
+        row.address,
+        row.city or '',
+        row.state or '',
+        row.postal_code or '',
+        str(row.latitude) if row.latitude else '',
+        str(row.longitude) if row.longitude else '',
+        row.location_type or 'unknown',
+        row.screenshot_timestamp.isoformat() if row.screenshot_timestamp else '',
+        row.last_seen_text or '',
+        'Yes' if row.is_final_destination else 'No'
+    ]
+
+
+def iter_csv(investigation_id: int, batch_size: int, session_factory=SessionLocal) -> Iterator[bytes]:
+    """
+    Stream an investigation export as UTF-8 CSV, one chunk per batch.
+
+    The header goes out before the query runs, and only one batch of rows
+    is held at a time, so memory stays flat regardless of export size.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_HEADER)
+    yield buffer.getvalue().encode('utf-8')
+
+    for batch in iter_export_batches(investigation_id, batch_size, session_factory):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_csv_fields(row) for row in batch)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """True if an Accept-Encoding header allows gzip (q > 0)."""
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() not in ('gzip', '*'):
+            continue
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member, chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Columnar exports (pyarrow is imported on first use; it is heavy and optional)
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+def arrow_schema():
+    """Typed schema for columnar exports; low-cardinality text is dictionary-encoded."""
+    import pyarrow as pa
+
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('location_id', pa.int64()),
+        ('tracker_id', pa.int64()),
+        ('tracker_name', pa.string()),
+        ('emoji', pa.string()),
+        ('platform', categorical),
+        ('address', pa.string()),
+        ('city', pa.string()),
+        ('state', categorical),
+        ('postal_code', pa.string()),
+        ('latitude', pa.float64()),
+        ('longitude', pa.float64()),
+        ('location_type', categorical),
+        ('screenshot_timestamp', pa.timestamp('us', tz='UTC')),
+        ('last_seen_text', pa.string()),
+        ('is_final_destination', pa.bool_()),
+    ])
+
+
+def _to_float(value):
+    return float(value) if value is not None else None
+
+
+def _record_batch(schema, rows):
+    import pyarrow as pa
+
+    columns = dict(zip(rows[0]._fields, zip(*rows)))
+    columns['latitude'] = [_to_float(v) for v in columns['latitude']]
+    columns['longitude'] = [_to_float(v) for v in columns['longitude']]
+    return pa.record_batch(
+        [pa.array(columns[field.name], type=field.type) for field in schema],
+        schema=schema
+    )
+
+
+class _ChunkSink:
+    """Write target for pyarrow writers that hands back what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_columnar(open_writer, investigation_id: int, batch_size: int, session_factory) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    writer = open_writer(pa.PythonFile(sink, mode='w'), schema)
+
+    for rows in iter_export_batches(investigation_id, batch_size, session_factory):
+        writer.write_batch(_record_batch(schema, rows))
+        data = sink.drain()
+        if data:
+            yield data
+
+    writer.close()
+    yield sink.drain()
+
+
+def iter_arrow(investigation_id: int, batch_size: int, session_factory=SessionLocal) -> Iterator[bytes]:
+    """
+    Stream an investigation export in the Arrow IPC stream format.
+
+    Each cursor batch becomes one record batch, written out as soon as it
+    is converted. Readers can open it with pyarrow.ipc.open_stream.
+    """
+    import pyarrow as pa
+
+    return _iter_columnar(pa.ipc.new_stream, investigation_id, batch_size, session_factory)
+
+
+def iter_parquet(investigation_id: int, batch_size: int, session_factory=SessionLocal) -> Iterator[bytes]:
+    """
+    Stream an investigation export as a zstd-compressed Parquet file.
+
+    Each cursor batch becomes one row group; the footer goes out last.
+    """
+    import pyarrow.parquet as pq
+
+    def open_writer(sink, schema):
+        return pq.ParquetWriter(sink, schema, compression='zstd')
+
+    return _iter_columnar(open_writer, investigation_id, batch_size, session_factory)
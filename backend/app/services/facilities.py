@@ -0,0 +1,305 @@
+import json
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, cast, event, inspect, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import get_settings
+from app.services import spatial, track_versions
+
+FACILITY_TYPES = ('starting_point', 'mrf', 'landfill', 'incinerator', 'waste_transfer_station')
+
+# Classifications made by a person; auto-classification never overrides them
+PROTECTED_CONFIDENCE = ('manual', 'verified')
+
+INDEX_PRECISION = 5  # Geohash cells of about 4.9 x 4.9 km
+
+
+def parse_boundary(boundary: Optional[str]) -> Optional[List[Tuple[float, float]]]:
+    """The stored JSON ring as (lng, lat) tuples, or None."""
+    if not boundary:
+        return None
+    return [(float(lng), float(lat)) for lng, lat in json.loads(boundary)]
+
+
+def _inside_ring(lat: float, lng: float, ring: List[Tuple[float, float]]) -> bool:
+    # Ray casting on the lng/lat plane; facility footprints are small enough
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class Facility:
+    """A registry entry reduced to what matching needs."""
+
+    __slots__ = ('id', 'facility_type', 'lat', 'lng', 'radius_m', 'ring', 'boxes')
+
+    def __init__(self, id: int, facility_type: str, lat: float, lng: float,
+                 radius_m: float, ring: Optional[List[Tuple[float, float]]]):
+        self.id = id
+        self.facility_type = facility_type
+        self.lat = lat
+        self.lng = lng
+        self.radius_m = radius_m
+        self.ring = ring
+        if ring:
+            lngs = [x for x, _ in ring]
+            lats = [y for _, y in ring]
+            self.boxes = [(min(lngs), min(lats), max(lngs), max(lats))]
+        else:
+            self.boxes = spatial.radius_boxes(lat, lng, radius_m)
+
+    def distance_if_inside(self, lat: float, lng: float) -> Optional[float]:
+        """Meters from the facility's point if (lat, lng) is within its footprint, else None."""
+        distance = spatial.distance_m(self.lat, self.lng, lat, lng)
+        if self.ring:
+            return distance if _inside_ring(lat, lng, self.ring) else None
+        return distance if distance <= self.radius_m else None
+
+
+class FacilityIndex:
+    """
+    Facilities bucketed by the geohash cells their footprints overlap.
+
+    A point only has to be tested against the facilities in its own cell;
+    where footprints overlap, the facility whose point is nearest wins.
+    """
+
+    def __init__(self, facilities: List[Facility]):
+        self.cells: Dict[str, List[Facility]] = {}
+        for facility in facilities:
+            for box in facility.boxes:
+                for cell in spatial.cover_cells(box, INDEX_PRECISION):
+                    self.cells.setdefault(cell, []).append(facility)
+
+    def match(self, lat: float, lng: float) -> Optional[Facility]:
+        best, best_distance = None, math.inf
+        for facility in self.cells.get(spatial.encode_geohash(lat, lng, INDEX_PRECISION), ()):
+            distance = facility.distance_if_inside(lat, lng)
+            if distance is not None and distance < best_distance:
+                best, best_distance = facility, distance
+        return best
+
+
+_index: Optional[FacilityIndex] = None
+_index_version: Optional[int] = None
+_index_checked_at = -math.inf
+_index_lock = threading.Lock()
+
+
+def registry_version(connection) -> int:
+    """The facility registry's change counter; 0 before the first change."""
+    return connection.execute(
+        select(models.FacilityRegistryVersion.version).where(models.FacilityRegistryVersion.id == 1)
+    ).scalar() or 0
+
+
+def bump_registry_version(connection):
+    """Count a change to the facility registry, so every process rebuilds its index."""
+    table = models.FacilityRegistryVersion
+    bumped = connection.execute(update(table).where(table.id == 1).values(version=table.version + 1))
+    if not bumped.rowcount:
+        connection.execute(insert(table).values(id=1, version=1))
+
+
+def _load_index(connection) -> FacilityIndex:
+    table = models.FacilityClassification
+    default_radius = get_settings().facility_default_radius_m
+    rows = connection.execute(select(
+        table.id,
+        table.facility_type,
+        cast(table.latitude, Float),
+        cast(table.longitude, Float),
+        cast(table.radius_m, Float),
+        table.boundary,
+    ))
+    return FacilityIndex([
+        Facility(id_, facility_type, lat, lng, radius_m or default_radius, parse_boundary(boundary))
+        for id_, facility_type, lat, lng, radius_m, boundary in rows
+    ])
+
+
+def get_facility_index(connection) -> FacilityIndex:
+    """
+    Get the in-memory facility index, rebuilt when the registry changes.
+
+    Every write to the registry bumps FacilityRegistryVersion, so edits
+    from other processes are picked up too. The version is read at most
+    once per facility_index_check_seconds; this process's own commits
+    force a check straight away.
+
+    The queries run outside _index_lock: this is called from flush hooks,
+    which on an AsyncSession suspend the event loop's coroutine mid-query,
+    and another coroutine waiting on a thread lock would then block the
+    loop for good. Callers racing to rebuild each load the index and the
+    newest version wins.
+    """
+    global _index, _index_version, _index_checked_at
+    now = time.monotonic()
+    with _index_lock:
+        index, index_version, checked_at = _index, _index_version, _index_checked_at
+    if index is not None and now - checked_at < get_settings().facility_index_check_seconds:
+        return index
+
+    version = registry_version(connection)
+    if index is None or version != index_version:
+        index = _load_index(connection)
+
+    with _index_lock:
+        if _index is None or _index_version is None or version >= _index_version:
+            _index, _index_version = index, version
+            _index_checked_at = now
+        return _index
+
+
+def _expire_index_check():
+    global _index_checked_at
+    with _index_lock:
+        _index_checked_at = -math.inf
+
+
+def _classification(index: FacilityIndex, lat: float, lng: float,
+                    confidence: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+    # (location_type, location_type_confidence) to store, or None to leave it
+    facility = index.match(lat, lng)
+    if facility is not None:
+        return facility.facility_type, 'auto'
+    if confidence == 'auto':
+        return 'unknown', None  # Moved out of the facility it was matched to
+    return None
+
+
+def _classifiable(location_type: Optional[str], confidence: Optional[str]) -> bool:
+    if confidence == 'auto':
+        return True
+    return confidence not in PROTECTED_CONFIDENCE and location_type in (None, 'unknown')
+
+
+def _classifiable_criteria():
+    confidence = models.Location.location_type_confidence
+    location_type = models.Location.location_type
+    return or_(
+        confidence == 'auto',
+        and_(
+            or_(confidence.is_(None), confidence.notin_(PROTECTED_CONFIDENCE)),
+            or_(location_type.is_(None), location_type == 'unknown'),
+        )
+    )
+
+
+def reclassify_investigation(connection, investigation_id: int) -> Dict:
+    """
+    Re-run auto-classification over every location of an investigation.
+
+    One query reads the candidates, matching happens in memory, and rows
+    are updated with one UPDATE per resulting type (in chunks). Manual and
+    verified classifications are left alone.
+    """
+    index = get_facility_index(connection)
+    rows = connection.execute(select(
+        models.Location.id,
+        models.Location.tracker_id,
+        cast(models.Location.latitude, Float),
+        cast(models.Location.longitude, Float),
+        models.Location.location_type,
+        models.Location.location_type_confidence,
+    ).where(
+        models.Location.tracker_id.in_(
+            select(models.Tracker.id).where(models.Tracker.investigation_id == investigation_id)
+        ),
+        models.Location.latitude.isnot(None),
+        models.Location.longitude.isnot(None),
+        _classifiable_criteria(),
+    ))
+
+    scanned = 0
+    changes: Dict[Tuple[str, Optional[str]], List[int]] = {}
+    trackers = set()
+    for location_id, tracker_id, lat, lng, location_type, confidence in rows:
+        scanned += 1
+        new = _classification(index, lat, lng, confidence)
+        if new is not None and new != (location_type, confidence):
+            changes.setdefault(new, []).append(location_id)
+            trackers.add(tracker_id)
+
+    for (location_type, confidence), location_ids in changes.items():
+        for start in range(0, len(location_ids), 1000):
+            connection.execute(
+                update(models.Location).where(
+                    models.Location.id.in_(location_ids[start:start + 1000])
+                ).values(location_type=location_type, location_type_confidence=confidence)
+            )
+    # location_type is drawn on the map, so cached tracks and tiles are stale
+    track_versions.bump_track_versions(connection, trackers)
+
+    by_type = Counter()
+    for (location_type, _), location_ids in changes.items():
+        by_type[location_type] += len(location_ids)
+    return {
+        "scanned": scanned,
+        "updated": sum(by_type.values()),
+        "by_type": dict(by_type),
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def _auto_classify(session, flush_context, instances):
+    pending = [obj for obj in session.new if isinstance(obj, models.Location)]
+    for obj in session.dirty:
+        if not isinstance(obj, models.Location):
+            continue
+        state = inspect(obj)
+        if state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes():
+            pending.append(obj)
+
+    pending = [
+        location for location in pending
+        if location.latitude is not None and location.longitude is not None
+        and _classifiable(location.location_type, location.location_type_confidence)
+    ]
+    if not pending:
+        return
+
+    index = get_facility_index(session.connection())
+    for location in pending:
+        new = _classification(
+            index, float(location.latitude), float(location.longitude), location.location_type_confidence
+        )
+        if new is not None:
+            location.location_type, location.location_type_confidence = new
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_registry(session, flush_context):
+    changed = any(
+        isinstance(obj, models.FacilityClassification)
+        for obj in (*session.new, *session.deleted)
+    ) or any(
+        isinstance(obj, models.FacilityClassification) and session.is_modified(obj)
+        for obj in session.dirty
+    )
+    if changed:
+        bump_registry_version(session.connection())
+        session.info['facility_registry_changed'] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _check_registry_after_commit(session):
+    if session.info.pop('facility_registry_changed', False):
+        _expire_index_check()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_registry_change(session):
+    session.info.pop('facility_registry_changed', None)
@@ -0,0 +1,200 @@
+from typing import List
+
+from sqlalchemy import event, func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Location attributes that can change which location is a tracker's latest
+_RANKING_ATTRIBUTES = ('tracker_id', 'screenshot_timestamp', 'is_final_destination')
+
+
+def _ranked(tracker_filter, *columns, with_counts: bool = False):
+    partition = models.Location.tracker_id
+    windows = [
+        func.row_number().over(
+            partition_by=partition,
+            # Undated locations rank last; Postgres would otherwise put NULLs first
+            order_by=(models.Location.screenshot_timestamp.desc().nulls_last(), models.Location.id.desc())
+        ).label('rank')
+    ]
+    if with_counts:
+        windows.append(func.count(models.Location.id).over(partition_by=partition).label('location_count'))
+
+    return select(
+        models.Location.id,
+        models.Location.tracker_id,
+        *columns,
+        *windows
+    ).where(tracker_filter).subquery()
+
+
+def _investigation_trackers(investigation_id: int):
+    return models.Location.tracker_id.in_(
+        select(models.Tracker.id).where(models.Tracker.investigation_id == investigation_id)
+    )
+
+
+def ranked_locations(investigation_id: int, *columns, with_counts: bool = False):
+    """
+    An investigation's locations ranked per tracker, newest first.
+
+    Rows have the requested Location columns (id and tracker_id always)
+    plus `rank` (1 = the tracker's latest location), computed with a window
+    function so callers get per-tracker results in a single pass. With
+    with_counts, `location_count` holds the tracker's total as well.
+    """
+    return _ranked(_investigation_trackers(investigation_id), *columns, with_counts=with_counts)
+
+
+def _refresh_flags(connection, *tracker_criteria) -> List[int]:
+    """
+    Re-flag the latest location of the trackers matching tracker_criteria;
+    returns the ids of the locations whose flag changed.
+
+    The trackers' rows are locked first, so two transactions adding
+    locations to one tracker refresh it one after the other and the second
+    sees the first's rows; otherwise each could flag its own newest location
+    and both commit. FOR NO KEY UPDATE does not wait on the key-share locks
+    the location inserts themselves hold on the tracker.
+    """
+    tracker_ids = connection.execute(
+        select(models.Tracker.id).where(*tracker_criteria).order_by(models.Tracker.id).with_for_update(key_share=True)
+    ).scalars().all()
+    if not tracker_ids:
+        return []
+
+    # Two UPDATEs that only touch rows whose flag actually changes, so
+    # re-running on unchanged data writes nothing
+    tracker_filter = models.Location.tracker_id.in_(tracker_ids)
+    ranked = _ranked(tracker_filter)
+    latest_ids = select(ranked.c.id).where(ranked.c.rank == 1)
+
+    cleared = connection.execute(
+        update(models.Location).where(
+            tracker_filter,
+            models.Location.is_final_destination == True,
+            models.Location.id.notin_(latest_ids)
+        ).values(is_final_destination=False).returning(models.Location.id)
+    ).scalars().all()
+    flagged = connection.execute(
+        update(models.Location).where(
+            models.Location.id.in_(latest_ids),
+            or_(
+                models.Location.is_final_destination == False,
+                models.Location.is_final_destination.is_(None)
+            )
+        ).values(is_final_destination=True).returning(models.Location.id)
+    ).scalars().all()
+    return cleared + flagged
+
+
+def mark_final_destinations(db: Session, investigation_id: int):
+    """
+    Flag each tracker's latest location as its final destination.
+
+    Flags are kept up to date on every ORM flush (see below), so this is
+    only needed to repair data written around the ORM, e.g. bulk inserts
+    or manual SQL. The caller commits.
+    """
+    _refresh_flags(db.connection(), models.Tracker.investigation_id == investigation_id)
+
+
+def refresh_final_destinations(connection, tracker_ids):
+    """
+    Re-flag the latest location of the given trackers, e.g. after inserting
+    their locations with Core. The caller commits.
+    """
+    tracker_ids = sorted(set(tracker_ids))
+    if tracker_ids:
+        _refresh_flags(connection, models.Tracker.id.in_(tracker_ids))
+
+
+def tracker_final_locations(db: Session, investigation_id: int):
+    """
+    The investigation's trackers paired with their latest location.
+
+    Returns [(Tracker, row)] ordered by tracker id, where row has id,
+    address, city, state, location_type and location_count, or is None for
+    trackers with no locations. Two queries regardless of tracker count;
+    the latest rows are matched up in Python rather than with an outer
+    join, which SQLite would evaluate as a nested scan of the window
+    subquery.
+    """
+    trackers = db.query(models.Tracker).filter(
+        models.Tracker.investigation_id == investigation_id
+    ).order_by(
+        models.Tracker.id
+    ).all()
+
+    ranked = ranked_locations(
+        investigation_id,
+        models.Location.address,
+        models.Location.city,
+        models.Location.state,
+        models.Location.location_type,
+        with_counts=True
+    )
+    latest = db.execute(
+        select(
+            ranked.c.tracker_id,
+            ranked.c.id,
+            ranked.c.address,
+            ranked.c.city,
+            ranked.c.state,
+            ranked.c.location_type,
+            ranked.c.location_count
+        ).where(ranked.c.rank == 1)
+    ).all()
+    latest_by_tracker = {row.tracker_id: row for row in latest}
+
+    return [(tracker, latest_by_tracker.get(tracker.id)) for tracker in trackers]
+
+
+# Incremental maintenance: whenever a flush inserts, deletes or re-times a
+# Location, recompute the flag for just the trackers involved, in the same
+# transaction as the write.
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_trackers(session, flush_context, instances):
+    tracker_ids = session.info.setdefault('final_destination_trackers', set())
+
+    for obj in session.deleted:
+        if isinstance(obj, models.Location):
+            tracker_ids.add(obj.tracker_id)
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.Location):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in _RANKING_ATTRIBUTES):
+            tracker_ids.add(obj.tracker_id)
+            # A location moved between trackers changes both
+            tracker_ids.update(state.attrs.tracker_id.history.deleted or ())
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_changed_trackers(session, flush_context):
+    tracker_ids = session.info.pop('final_destination_trackers', set())
+    # New rows only have their tracker_id for certain once they are flushed
+    tracker_ids.update(obj.tracker_id for obj in session.new if isinstance(obj, models.Location))
+    tracker_ids.discard(None)
+    if not tracker_ids:
+        return
+
+    changed = _refresh_flags(session.connection(), models.Tracker.id.in_(sorted(tracker_ids)))
+    if changed:
+        session.info['final_destination_changed'] = changed
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_refreshed_flags(session, flush_context):
+    location_ids = session.info.pop('final_destination_changed', None)
+    if not location_ids:
+        return
+    # The UPDATEs bypassed the identity map, so reload the flag on next
+    # access; only the rows they changed can be stale
+    for location_id in location_ids:
+        obj = session.identity_map.get(session.identity_key(models.Location, location_id))
+        if obj is not None:
+            session.expire(obj, ['is_final_destination'])
@@ -0,0 +1,228 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, or_, select, update
+
+from app import models
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.geocoder import Geocoder, get_geocoder, normalize_address
+
+
+class GeocodeEnrichmentWorker:
+    """
+    Background thread that fills in coordinates for saved locations.
+
+    Locations are saved with geocode_status='pending'. Each pass claims a
+    batch of pending rows (status 'geocoding', so other processes skip
+    them), geocodes every distinct normalized address once through the
+    shared (cached, rate-limited) geocoder and backfills latitude/longitude
+    plus any missing city/state/postal_code.
+
+    A failed lookup only affects the rows with that address: they go back
+    to pending with an exponential retry delay, and are marked 'error'
+    after max_attempts failures. Claims left behind by a process that died
+    are taken over once they are older than claim_timeout.
+    """
+
+    def __init__(self, geocoder: Geocoder, batch_size: int = 50, poll_interval: float = 30.0,
+                 max_attempts: int = 5, retry_seconds: float = 60.0, claim_timeout: float = 600.0):
+        self.geocoder = geocoder
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.claim_timeout = claim_timeout
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="geocode-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def notify(self):
+        """Wake the worker after new pending locations were saved."""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                # Database trouble; claimed rows are picked up again after claim_timeout
+                print(f"Geocode worker error: {e}")
+                processed = 0
+
+            if processed < self.batch_size:
+                self._wakeup.wait(timeout=self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self) -> int:
+        """Geocode one batch of pending locations. Returns rows processed."""
+        claimed = self._claim()
+        if not claimed:
+            return 0
+
+        db = SessionLocal()
+        done = set()
+        try:
+            pending = db.query(models.Location).filter(
+                models.Location.id.in_(claimed)
+            ).order_by(models.Location.id).all()
+
+            # Many pings share an address (same facility), so look each up once
+            by_address = OrderedDict()
+            for location in pending:
+                by_address.setdefault(normalize_address(location.address), []).append(location)
+
+            for locations in by_address.values():
+                if self._stopping.is_set():
+                    break
+                try:
+                    result = self.geocoder.geocode(locations[0].address, raise_errors=True)
+                except Exception as e:
+                    print(f"Geocode lookup failed for {locations[0].address!r}: {e}")
+                    _record_failure(locations, self.max_attempts, self.retry_seconds)
+                else:
+                    _apply_geocode(locations, result)
+                db.commit()
+                done.update(location.id for location in locations)
+            return len(done)
+        finally:
+            db.close()
+            leftover = [location_id for location_id in claimed if location_id not in done]
+            if leftover:
+                _release(leftover)
+
+    def _claim(self) -> List[int]:
+        """
+        Flip up to batch_size due rows to 'geocoding' and return their ids.
+        On Postgres, rows another process is claiming are skipped rather
+        than waited for; the status condition in the UPDATE makes sure a
+        row is only ever claimed once either way.
+        """
+        now = datetime.utcnow()
+        status = models.Location.geocode_status
+        due = or_(
+            and_(status == 'pending', or_(
+                models.Location.geocode_retry_at.is_(None),
+                models.Location.geocode_retry_at <= now
+            )),
+            and_(status == 'geocoding',
+                 models.Location.geocode_claimed_at < now - timedelta(seconds=self.claim_timeout)),
+        )
+        db = SessionLocal()
+        try:
+            candidates = db.scalars(
+                select(models.Location.id).where(due).order_by(models.Location.id)
+                .limit(self.batch_size).with_for_update(skip_locked=True)
+            ).all()
+            claimed = []
+            if candidates:
+                claimed = db.scalars(
+                    update(models.Location).where(models.Location.id.in_(candidates), due)
+                    .values(geocode_status='geocoding', geocode_claimed_at=now)
+                    .returning(models.Location.id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+
+def _release(location_ids: List[int]):
+    """Hand claimed rows that weren't looked up (worker stopping) back to the queue."""
+    db = SessionLocal()
+    try:
+        db.query(models.Location).filter(
+            models.Location.id.in_(location_ids),
+            models.Location.geocode_status == 'geocoding'
+        ).update({"geocode_status": 'pending', "geocode_claimed_at": None}, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        print(f"Geocode worker error: {e}")
+    finally:
+        db.close()
+
+
+def _record_failure(locations, max_attempts: int, retry_seconds: float):
+    now = datetime.utcnow()
+    for location in locations:
+        location.geocode_attempts = (location.geocode_attempts or 0) + 1
+        location.geocode_claimed_at = None
+        if location.geocode_attempts >= max_attempts:
+            location.geocode_status = 'error'
+            location.geocode_retry_at = None
+            location.geocoded_at = now
+        else:
+            location.geocode_status = 'pending'
+            location.geocode_retry_at = now + timedelta(
+                seconds=retry_seconds * 2 ** (location.geocode_attempts - 1)
+            )
+
+
+def _apply_geocode(locations, result):
+    now = datetime.utcnow()
+    for location in locations:
+        location.geocoded_at = now
+        location.geocode_claimed_at = None
+        location.geocode_retry_at = None
+        if result is None:
+            location.geocode_status = 'not_found'
+            continue
+
+        latitude, longitude, city, state, postal_code = result
+        location.latitude = latitude
+        location.longitude = longitude
+        # Values read from the screenshot win over geocoded ones
+        location.city = location.city or city
+        location.state = location.state or state
+        location.postal_code = location.postal_code or postal_code
+        location.geocode_status = 'complete'
+
+
+_worker: Optional[GeocodeEnrichmentWorker] = None
+
+
+def start_geocode_worker() -> GeocodeEnrichmentWorker:
+    """Start the shared enrichment worker (called at app startup)."""
+    global _worker
+    if _worker is None:
+        settings = get_settings()
+        _worker = GeocodeEnrichmentWorker(
+            get_geocoder(),
+            batch_size=settings.geocode_batch_size,
+            poll_interval=settings.geocode_poll_seconds,
+            max_attempts=settings.geocode_max_attempts,
+            retry_seconds=settings.geocode_retry_seconds,
+            claim_timeout=settings.geocode_claim_timeout_seconds
+        )
+    _worker.start()
+    return _worker
+
+
+def stop_geocode_worker():
+    """Stop the shared enrichment worker (called at app shutdown)."""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
+
+
+def notify_geocode_worker():
+    """Tell the worker there are new pending locations, if it is running."""
+    if _worker is not None:
+        _worker.notify()
@@ -1,52 +1,327 @@
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-import requests
+from functools import lru_cache
+import re
+import threading
 import time
 
+from app import models
+from app.config import get_settings
+from app.database import SessionLocal
+
+# (lat, lng, city, state, postal_code)
+GeocodeResult = Tuple[Decimal, Decimal, str, str, str]
+
+# Street words that appear both spelled out and abbreviated in screenshots
+_ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'drive': 'dr',
+    'boulevard': 'blvd', 'parkway': 'pkwy', 'lane': 'ln', 'court': 'ct',
+    'place': 'pl', 'highway': 'hwy', 'suite': 'ste', 'north': 'n',
+    'south': 's', 'east': 'e', 'west': 'w',
+}
+
+
+def normalize_address(address: str) -> str:
+    """
+    Reduce an address to a cache key.
+
+    "1 Market Street, San Francisco, CA 94105" and
+    "1 market st san francisco ca 94105 USA" map to the same key.
+    """
+    text = re.sub(r'[^\w\s]', ' ', address.lower())
+    words = [_ADDRESS_ABBREVIATIONS.get(word, word) for word in text.split()]
+    if words[-2:] == ['united', 'states']:
+        words = words[:-2]
+    elif words[-1:] == ['usa']:
+        words = words[:-1]
+    return ' '.join(words)
+
+
+class NominatimProvider:
+    """Remote geocoding through the public Nominatim API."""
+
+    # Nominatim allows one request per second per application, so the
+    # throttle is shared by every provider instance in the process
+    _rate_lock = threading.Lock()
+    _last_request_time = 0.0
 
-class Geocoder:
     def __init__(self):
         self.base_url = "https://nominatim.openstreetmap.org/search"
         self.headers = {
             'User-Agent': 'CupTracker/0.1 (investigating plastic cup lifecycle)'
         }
-        self.last_request_time = 0
-    
-    def geocode(self, address: str) -> Optional[Tuple[Decimal, Decimal, str, str, str]]:
+        self._session = None
+
+    @property
+    def session(self):
+        # requests is imported on the first remote lookup, not at app startup
+        if self._session is None:
+            import requests
+
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._session = session
+        return self._session
+
+    def geocode(self, address: str) -> Optional[GeocodeResult]:
         """
-        Geocode an address and return (lat, lng, city, state, postal_code)
+        Geocode an address and return (lat, lng, city, state, postal_code).
+        Returns None if Nominatim has no match; raises on request errors.
         """
         # Rate limiting: 1 request per second
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 1.0:
-            time.sleep(1.0 - time_since_last)
-        
+        with NominatimProvider._rate_lock:
+            time_since_last = time.time() - NominatimProvider._last_request_time
+            if time_since_last < 1.0:
+                time.sleep(1.0 - time_since_last)
+            NominatimProvider._last_request_time = time.time()
+
         params = {
             'q': address,
             'format': 'json',
             'limit': 1,
             'addressdetails': 1  # Get structured address data
         }
-        
+
+        response = self.session.get(self.base_url, params=params, timeout=10)
+        response.raise_for_status()
+
+        data = response.json()
+        if not data:
+            return None
+
+        result = data[0]
+        address_details = result.get('address', {})
+
+        return (
+            Decimal(result['lat']),
+            Decimal(result['lon']),
+            address_details.get('city') or address_details.get('town') or address_details.get('village'),
+            address_details.get('state'),
+            address_details.get('postcode')
+        )
+
+
+class GeocodeCache:
+    """
+    Geocode results keyed by normalized address.
+
+    An in-process LRU sits in front of the geocode_cache table. Misses
+    (addresses the provider could not resolve) are cached too, with a
+    shorter TTL. Pass session_factory=None for a memory-only cache.
+    """
+
+    _MISSING = object()
+
+    def __init__(
+        self,
+        ttl: timedelta = timedelta(days=90),
+        negative_ttl: timedelta = timedelta(hours=24),
+        lru_size: int = 4096,
+        session_factory=SessionLocal
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lru_size = lru_size
+        self.session_factory = session_factory
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return (hit, result); result is None for a cached miss."""
+        now = datetime.now(timezone.utc)
+
+        with self._lock:
+            entry = self._lru.get(key, self._MISSING)
+            if entry is not self._MISSING:
+                result, expires_at = entry
+                if expires_at > now:
+                    self._lru.move_to_end(key)
+                    return True, result
+                del self._lru[key]
+
+        if self.session_factory is None:
+            return False, None
+
+        db = self.session_factory()
+        try:
+            row = db.query(models.GeocodeCacheEntry).filter(
+                models.GeocodeCacheEntry.address_key == key,
+                models.GeocodeCacheEntry.expires_at > now
+            ).first()
+        finally:
+            db.close()
+
+        if row is None:
+            return False, None
+
+        result = None
+        if row.found:
+            result = (row.latitude, row.longitude, row.city, row.state, row.postal_code)
+        self._remember(key, result, _as_utc(row.expires_at))
+        return True, result
+
+    def set(self, key: str, address: str, result: Optional[GeocodeResult]):
+        """Store a provider answer (or a miss) for the configured TTL."""
+        expires_at = datetime.now(timezone.utc) + (self.ttl if result else self.negative_ttl)
+        self._remember(key, result, expires_at)
+
+        if self.session_factory is None:
+            return
+
+        latitude, longitude, city, state, postal_code = result or (None, None, None, None, None)
+        db = self.session_factory()
         try:
-            response = requests.get(self.base_url, params=params, headers=self.headers)
-            self.last_request_time = time.time()
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    result = data[0]
-                    address_details = result.get('address', {})
-                    
-                    return (
-                        Decimal(result['lat']),
-                        Decimal(result['lon']),
-                        address_details.get('city') or address_details.get('town') or address_details.get('village'),
-                        address_details.get('state'),
-                        address_details.get('postcode')
-                    )
+            db.merge(models.GeocodeCacheEntry(
+                address_key=key,
+                query=address,
+                found=result is not None,
+                latitude=latitude,
+                longitude=longitude,
+                city=city,
+                state=state,
+                postal_code=postal_code,
+                expires_at=expires_at
+            ))
+            db.commit()
+        except Exception as e:
+            # The cache is an optimization; never fail a geocode over it
+            db.rollback()
+            print(f"Geocode cache write error: {e}")
+        finally:
+            db.close()
+
+    def _remember(self, key: str, result, expires_at: datetime):
+        with self._lock:
+            self._lru[key] = (result, expires_at)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything here is stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@lru_cache()
+def get_geocode_cache() -> GeocodeCache:
+    """Get the process-wide geocode cache."""
+    settings = get_settings()
+    return GeocodeCache(
+        ttl=timedelta(days=settings.geocode_cache_ttl_days),
+        negative_ttl=timedelta(hours=settings.geocode_negative_ttl_hours),
+        lru_size=settings.geocode_lru_size
+    )
+
+
+_DEFAULT = object()
+
+# The order Geocoder runs its stages in; geocoder_chain must list them the same way
+CHAIN_STAGES = ('local', 'cache', 'remote')
+
+
+class Geocoder:
+    """
+    Geocoder that tries a chain of sources in order: local gazetteer,
+    cache, then the remote provider (Nominatim by default).
+
+    Each stage can be left out: pass provider=None for offline use,
+    cache=None to skip caching, or a LocalGeocoder as `local`. When
+    nothing matches the exact address, the local gazetteer's ZIP centroid
+    is used as a last resort. Stages can be swapped out, e.g. for a stub
+    provider and memory-only cache in tests.
+    """
+
+    def __init__(self, provider=_DEFAULT, cache=_DEFAULT, local=None, zip_fallback: bool = True):
+        self.provider = NominatimProvider() if provider is _DEFAULT else provider
+        self.cache = get_geocode_cache() if cache is _DEFAULT else cache
+        self.local = local
+        self.zip_fallback = zip_fallback
+
+    def geocode(self, address: str, raise_errors: bool = False) -> Optional[GeocodeResult]:
+        """
+        Geocode an address and return (lat, lng, city, state, postal_code)
+        
+        Returns None when the address can't be resolved. Provider errors
+        are also reported as None unless raise_errors is set.
+        """
+        key = normalize_address(address)
+        if not key:
             return None
+
+        if self.local is not None:
+            result = self.local.geocode(address)
+            if result:
+                return result
+
+        result = self._geocode_remote(key, address, raise_errors)
+
+        if result is None and self.local is not None and self.zip_fallback:
+            result = self.local.geocode_postal_code(address)
+        return result
+
+    def _geocode_remote(self, key: str, address: str, raise_errors: bool) -> Optional[GeocodeResult]:
+        if self.cache is not None:
+            hit, result = self.cache.get(key)
+            if hit:
+                return result
+
+        if self.provider is None:
+            return None
+
+        try:
+            result = self.provider.geocode(address)
         except Exception as e:
+            # Transient failures are not cached
+            if raise_errors:
+                raise
             print(f"Geocoding error: {e}")
             return None
+
+        if self.cache is not None:
+            self.cache.set(key, address, result)
+        return result
+
+
+def parse_chain(value: str) -> List[str]:
+    """
+    The stages named in a geocoder_chain setting. The order is fixed
+    (CHAIN_STAGES), so a setting listing them any other way is rejected
+    rather than silently run in a different order than it reads.
+    """
+    chain = [stage.strip() for stage in value.split(',') if stage.strip()]
+    unknown = set(chain) - set(CHAIN_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown geocoder_chain stages: {', '.join(sorted(unknown))}")
+    expected = [stage for stage in CHAIN_STAGES if stage in chain]
+    if chain != expected:
+        raise ValueError(
+            f"geocoder_chain stages always run as {', '.join(CHAIN_STAGES)}; "
+            f"list them in that order ({','.join(expected)})"
+        )
+    return chain
+
+
+@lru_cache()
+def get_geocoder() -> Geocoder:
+    """
+    Get the shared geocoder (one rate limiter, HTTP session and cache),
+    built from the geocoder_chain setting.
+    """
+    settings = get_settings()
+    chain = parse_chain(settings.geocoder_chain)
+
+    local = None
+    if 'local' in chain:
+        if not settings.gazetteer_path:
+            raise ValueError("geocoder_chain includes 'local' but gazetteer_path is not set")
+        from app.services.local_geocoder import LocalGeocoder
+        local = LocalGeocoder(settings.gazetteer_path)
+
+    return Geocoder(
+        provider=NominatimProvider() if 'remote' in chain else None,
+        cache=get_geocode_cache() if 'cache' in chain else None,
+        local=local
+    )
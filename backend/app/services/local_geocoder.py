@@ -0,0 +1,198 @@
+import csv
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+from collections import Counter, defaultdict
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional
+
+from app.services.geocoder import GeocodeResult, normalize_address
+
+# Index file layout (little-endian):
+#   header   MAGIC, address count, ZIP count, string table offset
+#   address  (key hash u64, lat e7 i32, lng e7 i32, place offset u32), sorted by hash
+#   zip      (ZIP u32, lat e7 i32, lng e7 i32, place offset u32), sorted by ZIP
+#   strings  length-prefixed (u16) UTF-8 "city\tstate\tpostal_code" entries
+MAGIC = b'CTGAZ001'
+_HEADER = struct.Struct('<8sIIQ')
+_ADDRESS = struct.Struct('<QiiI')
+_ZIP = struct.Struct('<IiiI')
+_LENGTH = struct.Struct('<H')
+
+# Accepted CSV header names for each field
+_COLUMNS = {
+    'address': ('address', 'full_address', 'addr'),
+    'latitude': ('latitude', 'lat', 'y'),
+    'longitude': ('longitude', 'lng', 'lon', 'x'),
+    'city': ('city', 'place', 'town'),
+    'state': ('state', 'region', 'stusps'),
+    'postal_code': ('postal_code', 'postcode', 'zip', 'zipcode', 'zcta'),
+}
+
+_ZIP_PATTERN = re.compile(r'\b(\d{5})(?:-\d{4})?\s*(?:,?\s*(?:usa|united states))?\s*$', re.IGNORECASE)
+
+
+def _key_hash(key: str) -> int:
+    return struct.unpack('<Q', hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest())[0]
+
+
+def _e7(value: str) -> int:
+    return int(round(float(value) * 10_000_000))
+
+
+def build_index(gazetteer_path, index_path):
+    """
+    Build a binary index from a gazetteer CSV.
+
+    The CSV needs a header row with address, latitude and longitude
+    columns; city, state and postal_code are optional (common aliases
+    such as lat/lon/zip are accepted). ZIP centroids are the mean of all
+    points in the ZIP.
+    """
+    places = {}
+    strings = bytearray()
+
+    def place_offset(city, state, postal_code):
+        text = '\t'.join([city or '', state or '', postal_code or ''])
+        if text not in places:
+            encoded = text.encode('utf-8')
+            places[text] = len(strings)
+            strings.extend(_LENGTH.pack(len(encoded)))
+            strings.extend(encoded)
+        return places[text]
+
+    addresses = {}
+    zip_points = defaultdict(list)
+    zip_places = defaultdict(Counter)
+
+    with open(gazetteer_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fields = {name.lower().strip(): name for name in reader.fieldnames or []}
+        columns = {}
+        for column, aliases in _COLUMNS.items():
+            columns[column] = next((fields[a] for a in aliases if a in fields), None)
+        missing = [c for c in ('address', 'latitude', 'longitude') if columns[c] is None]
+        if missing:
+            raise ValueError(f"Gazetteer {gazetteer_path} is missing columns: {', '.join(missing)}")
+
+        for row in reader:
+            try:
+                lat = _e7(row[columns['latitude']])
+                lng = _e7(row[columns['longitude']])
+            except (TypeError, ValueError):
+                continue
+            city = row.get(columns['city']) if columns['city'] else None
+            state = row.get(columns['state']) if columns['state'] else None
+            postal_code = (row.get(columns['postal_code']) or '')[:5] if columns['postal_code'] else ''
+
+            key = normalize_address(row[columns['address']] or '')
+            if key:
+                addresses[_key_hash(key)] = (lat, lng, place_offset(city, state, postal_code))
+
+            if postal_code.isdigit() and len(postal_code) == 5:
+                zip_points[postal_code].append((lat, lng))
+                zip_places[postal_code][(city, state)] += 1
+
+    zips = []
+    for postal_code, points in zip_points.items():
+        city, state = zip_places[postal_code].most_common(1)[0][0]
+        zips.append((
+            int(postal_code),
+            round(sum(p[0] for p in points) / len(points)),
+            round(sum(p[1] for p in points) / len(points)),
+            place_offset(city, state, postal_code)
+        ))
+    zips.sort()
+
+    string_offset = _HEADER.size + len(addresses) * _ADDRESS.size + len(zips) * _ZIP.size
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, 'wb') as out:
+        out.write(_HEADER.pack(MAGIC, len(addresses), len(zips), string_offset))
+        for key_hash in sorted(addresses):
+            out.write(_ADDRESS.pack(key_hash, *addresses[key_hash]))
+        for record in zips:
+            out.write(_ZIP.pack(*record))
+        out.write(strings)
+    os.replace(temp_path, index_path)
+
+
+class LocalGeocoder:
+    """
+    Offline geocoder backed by a memory-mapped gazetteer index.
+
+    Same result tuple as Geocoder.geocode. The index is built next to the
+    CSV (<csv>.idx) on first use, and rebuilt when the CSV is newer. Lookups
+    are binary searches over the mapped file, so memory use stays small and
+    the OS page cache is shared between worker processes.
+    """
+
+    def __init__(self, gazetteer_path, index_path=None):
+        self.gazetteer_path = Path(gazetteer_path)
+        self.index_path = Path(index_path or f"{gazetteer_path}.idx")
+        if (not self.index_path.exists()
+                or self.index_path.stat().st_mtime < self.gazetteer_path.stat().st_mtime):
+            build_index(self.gazetteer_path, self.index_path)
+
+        with open(self.index_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.address_count, self.zip_count, self._strings = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.index_path} is not a gazetteer index")
+        self._zips = _HEADER.size + self.address_count * _ADDRESS.size
+
+    def geocode(self, address: str) -> Optional[GeocodeResult]:
+        """Exact lookup of the normalized address."""
+        key = normalize_address(address)
+        if not key:
+            return None
+        record = self._search(_HEADER.size, self.address_count, _ADDRESS, _key_hash(key))
+        return self._result(record) if record else None
+
+    def geocode_postal_code(self, address: str) -> Optional[GeocodeResult]:
+        """ZIP centroid for the ZIP code at the end of an address."""
+        match = _ZIP_PATTERN.search(address.strip())
+        if not match:
+            return None
+        record = self._search(self._zips, self.zip_count, _ZIP, int(match.group(1)))
+        return self._result(record) if record else None
+
+    def _search(self, base: int, count: int, layout: struct.Struct, key: int):
+        low, high = 0, count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            record = layout.unpack_from(self._map, base + middle * layout.size)
+            if record[0] < key:
+                low = middle + 1
+            elif record[0] > key:
+                high = middle - 1
+            else:
+                return record
+        return None
+
+    def _result(self, record) -> GeocodeResult:
+        _, lat, lng, place = record
+        offset = self._strings + place
+        (length,) = _LENGTH.unpack_from(self._map, offset)
+        start = offset + _LENGTH.size
+        city, state, postal_code = self._map[start:start + length].decode('utf-8').split('\t')
+        return (
+            Decimal(lat).scaleb(-7),
+            Decimal(lng).scaleb(-7),
+            city or None,
+            state or None,
+            postal_code or None
+        )
+
+
+if __name__ == "__main__":
+    # python -m app.services.local_geocoder gazetteer.csv [index_path]
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m app.services.local_geocoder GAZETTEER_CSV [INDEX_PATH]")
+    csv_path = sys.argv[1]
+    build_index(csv_path, sys.argv[2] if len(sys.argv) > 2 else f"{csv_path}.idx")
+    print(f"Built index for {csv_path}")
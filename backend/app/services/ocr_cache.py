@@ -0,0 +1,160 @@
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, func
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.database import SessionLocal
+from app.services.ocr_pool import OCRWorkerPool
+from app.services.screenshot_store import ScreenshotStore
+
+CACHED_FIELDS = ('platform', 'tracker_name', 'address', 'last_seen', 'confidence', 'raw_text')
+
+
+class OCRResultCache:
+    """
+    OCR results stored against the screenshot's SHA-256.
+
+    A re-uploaded screenshot has the same bytes, so its cached result is
+    returned without touching Tesseract. Failed OCR runs are not cached.
+    Hits are counted in memory and written to the entries in batches
+    (every flush_every hits or flush_interval seconds, and at shutdown),
+    so a hit costs one SELECT rather than a write and a commit.
+    """
+
+    def __init__(self, flush_every: int = 100, flush_interval: float = 30.0):
+        self.hits = 0
+        self.misses = 0
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._unwritten: Dict[str, Tuple[int, datetime]] = {}  # sha256 -> (hits, last hit)
+        self._unwritten_hits = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def get(self, sha256: str) -> Optional[Dict]:
+        """Return the cached OCR result for a hash, counting the hit or miss."""
+        db = SessionLocal()
+        try:
+            entry = db.query(models.OCRCacheEntry).filter(
+                models.OCRCacheEntry.sha256 == sha256
+            ).first()
+            if entry is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            result = {field: getattr(entry, field) for field in CACHED_FIELDS}
+        finally:
+            db.close()
+
+        with self._lock:
+            self.hits += 1
+            count, _ = self._unwritten.get(sha256, (0, None))
+            self._unwritten[sha256] = (count + 1, datetime.utcnow())
+            self._unwritten_hits += 1
+            due = (self._unwritten_hits >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+        if isinstance(result['confidence'], Decimal):
+            result['confidence'] = float(result['confidence'])
+        return result
+
+    def flush(self):
+        """Write the hits counted since the last flush to their entries (blocking)."""
+        with self._lock:
+            unwritten, self._unwritten = self._unwritten, {}
+            self._unwritten_hits = 0
+            self._last_flush = time.monotonic()
+        if not unwritten:
+            return
+
+        table = models.OCRCacheEntry.__table__
+        db = SessionLocal()
+        try:
+            db.execute(
+                table.update().where(table.c.sha256 == bindparam('entry_sha256')).values(
+                    hit_count=func.coalesce(table.c.hit_count, 0) + bindparam('new_hits'),
+                    last_hit_at=bindparam('hit_at')
+                ),
+                [
+                    {'entry_sha256': sha256, 'new_hits': count, 'hit_at': hit_at}
+                    for sha256, (count, hit_at) in unwritten.items()
+                ]
+            )
+            db.commit()
+        except Exception as e:
+            # Keep the counts for the next flush rather than losing them
+            db.rollback()
+            print(f"OCR cache: could not record hits ({e.__class__.__name__}: {e})")
+            with self._lock:
+                for sha256, (count, hit_at) in unwritten.items():
+                    pending, last_hit_at = self._unwritten.get(sha256, (0, hit_at))
+                    self._unwritten[sha256] = (pending + count, last_hit_at)
+                    self._unwritten_hits += count
+        finally:
+            db.close()
+
+    def put(self, sha256: str, ocr_result: Dict):
+        """Cache a successful OCR result."""
+        if ocr_result.get('error'):
+            return
+
+        db = SessionLocal()
+        try:
+            db.add(models.OCRCacheEntry(
+                sha256=sha256,
+                hit_count=0,
+                **{field: ocr_result.get(field) for field in CACHED_FIELDS}
+            ))
+            db.commit()
+        except IntegrityError:
+            # Another request cached the same screenshot first
+            db.rollback()
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        """Hit/miss counts for this process plus the number of cached entries."""
+        db = SessionLocal()
+        try:
+            entries = db.query(func.count(models.OCRCacheEntry.sha256)).scalar()
+        finally:
+            db.close()
+
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "entries": entries
+        }
+
+
+ocr_cache = OCRResultCache()
+
+
+async def process_with_cache(pool: OCRWorkerPool, disk_path: str) -> Tuple[Dict, bool]:
+    """
+    OCR a stored screenshot, using the cache when possible.
+
+    Returns (ocr_result, cache_hit). The file must live in a ScreenshotStore
+    so its name carries the content hash.
+    """
+    sha256 = ScreenshotStore.sha256_of(disk_path)
+    cached = await run_in_threadpool(ocr_cache.get, sha256)
+    if cached is not None:
+        return cached, True
+
+    ocr_result = await pool.process(disk_path)
+    await run_in_threadpool(ocr_cache.put, sha256, ocr_result)
+    return ocr_result, False
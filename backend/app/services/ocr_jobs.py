@@ -0,0 +1,247 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.ocr_pool import (
+    OCRWorkerPool, OCRPoolSaturated, OCRJobTimeout, format_ocr_result
+)
+from app.services.ocr_cache import process_with_cache
+
+
+# Job statuses once every item has a result: all succeeded, some failed, all failed
+FINISHED_STATUSES = ('completed', 'partial', 'failed')
+
+
+class OCRJobRunner:
+    """
+    Local worker that drains pending OCR job items from the database.
+
+    Job state lives in the ocr_jobs / ocr_job_items tables, so no outside
+    broker is needed and a restart picks up where it left off. Items are
+    claimed with a conditional UPDATE, so an item is never handed to two
+    runner tasks at once. An item still processing claim_timeout seconds
+    after it was claimed is presumed lost with its process and can be
+    claimed again by any runner; fresher claims are left alone, so several
+    workers or a rolling restart don't process an item twice.
+    """
+
+    def __init__(self, pool: OCRWorkerPool, poll_interval: float = 5.0, claim_timeout: float = 300.0):
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        # Keep some pool capacity free for interactive single uploads
+        self.concurrency = max(pool.workers - 1, 1)
+        self._wakeup = asyncio.Event()
+        self._progress = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+        self._running = set()
+
+    async def start(self):
+        """Start draining the queue. Touches no database, so app startup can't fail here."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop claiming new items; in-flight items are reclaimed once their claim goes stale."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        """Wake the runner after new items were queued."""
+        self._wakeup.set()
+
+    async def wait_for_progress(self, timeout: float):
+        """Block until any item finishes or the timeout expires."""
+        async with self._progress:
+            try:
+                await asyncio.wait_for(self._progress.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self):
+        # The database may be down or not migrated yet; keep retrying, with
+        # backoff, rather than failing startup (/ready reports it meanwhile)
+        backoff = 1.0
+        while True:
+            try:
+                await self._claim_and_dispatch()
+                backoff = 1.0
+            except Exception as e:
+                print(f"OCR job runner error ({e.__class__.__name__}: {e}); retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_and_dispatch(self):
+        """Hand pending (or abandoned) items to the pool while there are free slots."""
+        while True:
+            free_slots = self.concurrency - len(self._running)
+            if free_slots > 0:
+                # Don't claim items the pool can't take yet
+                await self.pool.wait_for_capacity()
+                claimed = await run_in_threadpool(_claim_items, free_slots, self.claim_timeout)
+                for item_id, file_path, claim in claimed:
+                    task = asyncio.create_task(self._process_item(item_id, file_path, claim))
+                    self._running.add(task)
+                    task.add_done_callback(self._item_done)
+                if len(claimed) == free_slots:
+                    # There may be more work queued; check again once a slot frees up
+                    self._wakeup.clear()
+                    continue
+            return
+
+    def _item_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _process_item(self, item_id: int, file_path: str, claim: int):
+        while True:
+            try:
+                ocr_result, _ = await process_with_cache(self.pool, file_path)
+            except OCRPoolSaturated:
+                # Interactive uploads took the free slots first; keep the
+                # claim and go again as soon as a job finishes
+                await self.pool.wait_for_capacity()
+                continue
+            except OCRJobTimeout as e:
+                await run_in_threadpool(_finish_item, item_id, claim, None, str(e))
+            except Exception as e:
+                await run_in_threadpool(_finish_item, item_id, claim, None, f"Error processing screenshot: {e}")
+            else:
+                await run_in_threadpool(_finish_item, item_id, claim, format_ocr_result(ocr_result), None)
+            break
+
+        async with self._progress:
+            self._progress.notify_all()
+
+
+def _claim_items(limit: int, claim_timeout: float) -> List[Tuple[int, str, int]]:
+    """
+    Mark up to `limit` claimable items as processing and return them as
+    (item_id, file_path, claim). Claimable means pending, or processing
+    under a claim older than claim_timeout. The claim is the item's new
+    attempts count; finishing the item only counts while it
+    still matches, so a runner whose claim was taken over can't record
+    a second result.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        Item = models.OCRJobItem
+        claimable = or_(
+            Item.status == 'pending',
+            and_(Item.status == 'processing',
+                 or_(Item.claimed_at.is_(None), Item.claimed_at < now - timedelta(seconds=claim_timeout)))
+        )
+        candidates = db.query(Item.id, Item.file_path, Item.attempts).filter(
+            claimable
+        ).order_by(Item.id).limit(limit).all()
+
+        claimed = []
+        for item_id, file_path, attempts in candidates:
+            # Only one runner can take an item while it is still claimable
+            updated = db.query(Item).filter(
+                Item.id == item_id,
+                Item.attempts == attempts,
+                claimable
+            ).update({
+                "status": 'processing',
+                "attempts": Item.attempts + 1,
+                "claimed_at": now
+            }, synchronize_session=False)
+            if updated:
+                claimed.append((item_id, file_path, (attempts or 0) + 1))
+
+        if claimed:
+            db.query(models.OCRJob).filter(
+                models.OCRJob.id.in_(
+                    db.query(Item.job_id).filter(Item.id.in_([item_id for item_id, _, _ in claimed]))
+                ),
+                models.OCRJob.status == 'pending'
+            ).update({"status": 'processing'}, synchronize_session=False)
+
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def _finish_item(item_id: int, claim: int, ocr_result: Optional[dict], error: Optional[str]):
+    db = SessionLocal()
+    try:
+        # Conditional, so only the current claim's result is recorded (and counted) once
+        finished = db.query(models.OCRJobItem).filter(
+            models.OCRJobItem.id == item_id,
+            models.OCRJobItem.status == 'processing',
+            models.OCRJobItem.attempts == claim
+        ).update({
+            "status": 'error' if error else 'completed',
+            "ocr_result": json.dumps(ocr_result) if ocr_result is not None else None,
+            "error": error,
+            "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+        if not finished:
+            db.rollback()
+            return
+        job_id = db.query(models.OCRJobItem.job_id).filter(models.OCRJobItem.id == item_id).scalar()
+
+        # Atomic increment so concurrent items of one job don't lose counts
+        db.query(models.OCRJob).filter(
+            models.OCRJob.id == job_id
+        ).update({
+            "completed_files": models.OCRJob.completed_files + 1
+        }, synchronize_session=False)
+
+        job = db.query(models.OCRJob).filter(models.OCRJob.id == job_id).first()
+        if job.completed_files >= job.total_files:
+            errors = db.query(func.count(models.OCRJobItem.id)).filter(
+                models.OCRJobItem.job_id == job_id,
+                models.OCRJobItem.status == 'error'
+            ).scalar()
+            job.status = 'completed' if not errors else 'failed' if errors >= job.total_files else 'partial'
+            job.finished_at = datetime.utcnow()
+
+        db.commit()
+    finally:
+        db.close()
+
+
+_runner: Optional[OCRJobRunner] = None
+
+
+async def start_ocr_job_runner(pool: OCRWorkerPool) -> OCRJobRunner:
+    """Create and start the shared job runner (called at app startup)."""
+    global _runner
+    if _runner is None:
+        _runner = OCRJobRunner(pool, claim_timeout=get_settings().ocr_job_claim_timeout_seconds)
+        await _runner.start()
+    return _runner
+
+
+async def stop_ocr_job_runner():
+    """Stop the shared job runner (called at app shutdown)."""
+    global _runner
+    if _runner is not None:
+        await _runner.stop()
+        _runner = None
+
+
+def get_ocr_job_runner() -> Optional[OCRJobRunner]:
+    """Return the shared job runner, if it has been started."""
+    return _runner
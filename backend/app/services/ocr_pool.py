@@ -0,0 +1,216 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from app.config import get_settings
+
+
+class OCRPoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class OCRJobTimeout(Exception):
+    """Raised when an OCR job does not finish within the job timeout."""
+
+
+# Per-worker processor, created on the first job a worker runs
+_processor = None
+
+
+def _run_ocr(image_path: str, tesseract_timeout: float) -> Dict:
+    """Entry point executed inside a pool worker process."""
+    global _processor
+    if _processor is None:
+        from app.services.ocr_processor import CrossPlatformOCRProcessor
+        _processor = CrossPlatformOCRProcessor(tesseract_timeout=tesseract_timeout)
+    return _processor.process_screenshot(image_path)
+
+
+def format_ocr_result(ocr_result: Dict) -> Dict:
+    """Select the OCR fields returned to API clients."""
+    return {
+        "platform": ocr_result.get('platform'),
+        "tracker_name": ocr_result.get('tracker_name'),
+        "address": ocr_result.get('address'),
+        "last_seen": ocr_result.get('last_seen'),
+        "confidence": ocr_result.get('confidence'),
+        "raw_text": ocr_result.get('raw_text'),
+        "error": ocr_result.get('error')
+    }
+
+
+class OCRWorkerPool:
+    """
+    Bounded process pool for OCR jobs.
+    
+    Tesseract and Pillow are CPU-bound and blocking, so jobs run in
+    separate processes and the event loop only awaits their results.
+    At most `workers + max_queue` jobs are admitted at once; beyond that
+    `process` raises OCRPoolSaturated so callers can shed load.
+    """
+    
+    def __init__(
+        self,
+        workers: int = 0,
+        max_queue: int = 32,
+        job_timeout: float = 60.0,
+        max_jobs_per_worker: int = 50
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = 0  # Bumped by every start(), so a broken pool is replaced once
+        self._pending = 0
+        self._jobs_since_start = 0
+        self._job_done = asyncio.Event()
+    
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+    
+    @property
+    def pending(self) -> int:
+        """Jobs running or waiting for a worker, including ones their caller gave up on."""
+        return self._pending
+    
+    def start(self):
+        """Start the worker processes."""
+        if self._executor is not None:
+            return
+        
+        kwargs = {}
+        if sys.version_info >= (3, 11):
+            # Each worker exits after N jobs and is replaced with a fresh one
+            kwargs['max_tasks_per_child'] = self.max_jobs_per_worker
+        
+        # spawn keeps workers from inheriting the server's sockets and DB pool
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            **kwargs
+        )
+        self._generation += 1
+        self._jobs_since_start = 0
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+    
+    def _recycle_if_needed(self):
+        # Python < 3.11 has no max_tasks_per_child, so replace the whole
+        # pool once it has run N jobs per worker. Running jobs finish on
+        # the old executor.
+        if sys.version_info >= (3, 11):
+            return
+        self._jobs_since_start += 1
+        if self._jobs_since_start >= self.workers * self.max_jobs_per_worker:
+            old_executor = self._executor
+            self._executor = None
+            self.start()
+            old_executor.shutdown(wait=False)
+    
+    def _job_finished(self):
+        self._pending -= 1
+        self._job_done.set()
+    
+    async def wait_for_capacity(self):
+        """Wait until process() would admit another job."""
+        while self._pending >= self.capacity:
+            self._job_done.clear()
+            await self._job_done.wait()
+    
+    def _replace_broken(self, generation: int):
+        # A worker died (e.g. OOM-killed) and broke the executor; every job
+        # on it fails, but only the first to notice starts a fresh pool
+        if generation == self._generation:
+            self.shutdown(wait=False)
+            self.start()
+    
+    async def process(self, image_path: str) -> Dict:
+        """
+        Run OCR on an image in a worker process and return the result.
+        
+        A job counts as pending until its worker is done with it, even if
+        the caller timed out or went away first, so capacity reflects the
+        work the workers actually have.
+        """
+        if self._executor is None:
+            raise RuntimeError("OCR worker pool has not been started")
+        
+        if self._pending >= self.capacity:
+            raise OCRPoolSaturated(
+                f"OCR queue is full ({self._pending} jobs pending)"
+            )
+        
+        loop = asyncio.get_running_loop()
+        self._recycle_if_needed()
+        generation = self._generation
+        try:
+            # The job's Tesseract runs share a budget a little under the job
+            # timeout, so a stuck subprocess does not keep its worker busy
+            job = self._executor.submit(_run_ocr, image_path, max(self.job_timeout - 1, 0))
+        except BrokenProcessPool:
+            self._replace_broken(generation)
+            raise
+        
+        self._pending += 1
+        job.add_done_callback(lambda _: _call_soon(loop, self._job_finished))
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job)), timeout=self.job_timeout)
+        except asyncio.TimeoutError:
+            job.cancel()  # Only possible if it never reached a worker
+            raise OCRJobTimeout(
+                f"OCR did not finish within {self.job_timeout:g} seconds"
+            )
+        except BrokenProcessPool:
+            self._replace_broken(generation)
+            raise
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback):
+    """Run callback on the loop from an executor thread, unless the loop is gone."""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
+
+
+_pool: Optional[OCRWorkerPool] = None
+
+
+def start_ocr_pool() -> OCRWorkerPool:
+    """Create and start the shared OCR pool (called at app startup)."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = OCRWorkerPool(
+            workers=settings.ocr_workers,
+            max_queue=settings.ocr_max_queue,
+            job_timeout=settings.ocr_job_timeout,
+            max_jobs_per_worker=settings.ocr_max_jobs_per_worker
+        )
+    _pool.start()
+    return _pool
+
+
+def stop_ocr_pool():
+    """Stop the shared OCR pool (called at app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def get_ocr_pool() -> OCRWorkerPool:
+    """FastAPI dependency returning the shared OCR pool."""
+    if _pool is None:
+        return start_ocr_pool()
+    return _pool
@@ -1,6 +1,7 @@
 import pytesseract
 from PIL import Image, ImageEnhance
 import re
+import time
 from typing import Dict, Optional, Literal
 from pathlib import Path
 
@@ -14,7 +15,20 @@ class CrossPlatformOCRProcessor:
     Extracts tracker names, addresses, and timestamps.
     """
     
-    def __init__(self):
+    # Info panel crops, as a fraction of screenshot height
+    APPLE_PANEL_TOP = 0.6
+    GOOGLE_PANEL_TOP = 0.65
+    
+    def __init__(self, single_pass: bool = True, tesseract_timeout: float = 0):
+        # Run one image_to_data pass per screenshot instead of three
+        # separate Tesseract calls (see process_screenshot)
+        self.single_pass = single_pass
+        
+        # Seconds all of one screenshot's Tesseract runs may take together
+        # before the running one is killed (0 = no limit)
+        self.tesseract_timeout = tesseract_timeout
+        self._deadline: Optional[float] = None
+        
         # Apple Find My patterns
         self.apple_patterns = {
             'address': r'(\d+\s+[\w\s\-]+(?:Rd|Ave|St|Dr|Blvd|Pkwy|Way|Ln|Court|Place|Road|Avenue|Street|Drive|Boulevard|Parkway|Lane)[.,\s]*[\w\s]+,\s*[A-Z]{2}\s+\d{5})',
@@ -27,40 +41,66 @@ class CrossPlatformOCRProcessor:
             'last_seen': r'Last seen\s+(\d+\s+(?:min|hr|day)s?\s+ago)',
         }
     
-    def detect_platform(self, image_path: str) -> Literal['apple', 'google']:
+    def detect_platform(self, image_path: str, img: Optional[Image.Image] = None) -> Literal['apple', 'google']:
         """
         Auto-detect if screenshot is from Apple Find My or Google Find My Device.
+        Pass img to reuse an already decoded screenshot.
         """
         try:
-            img = Image.open(image_path)
-            # Quick low-res scan for platform detection
+            if img is None:
+                img = Image.open(image_path)
+            # Quick low-res scan of the whole screenshot for platform detection
             img_small = img.resize((img.width // 4, img.height // 4))
-            text = pytesseract.image_to_string(img_small).lower()
-            
-            # Check for platform-specific indicators
-            google_score = sum([
-                'find my device' in text,
-                'last seen' in text,
-                'get directions' in text,
-            ])
-            
-            apple_score = sum([
-                'play sound' in text,
-                'share item' in text,
-                'directions' in text and 'get directions' not in text,
-            ])
-            
-            return 'google' if google_score > apple_score else 'apple'
+            text = pytesseract.image_to_string(img_small, timeout=self._tesseract_timeout())
+            return self._score_platform(text)
             
         except Exception as e:
             print(f"Platform detection error: {e}")
             # Default to Apple if detection fails
             return 'apple'
     
+    def _tesseract_timeout(self) -> float:
+        """Timeout for the next Tesseract run: what is left of the screenshot's budget."""
+        if self._deadline is None:
+            return self.tesseract_timeout
+        remaining = self._deadline - time.monotonic()
+        if remaining <= 0:
+            # What pytesseract raises when it kills a run itself
+            raise RuntimeError('Tesseract process timeout')
+        return remaining
+    
+    def _score_platform(self, text: str) -> Literal['apple', 'google']:
+        """Pick a platform from the UI labels present in OCR text."""
+        google_score, apple_score = self._platform_scores(text)
+        return 'google' if google_score > apple_score else 'apple'
+    
+    def _platform_scores(self, text: str):
+        """(google, apple) counts of each platform's UI labels in OCR text."""
+        text = text.lower()
+        
+        # Check for platform-specific indicators
+        google_score = sum([
+            'find my device' in text,
+            'last seen' in text,
+            'get directions' in text,
+        ])
+        
+        apple_score = sum([
+            'play sound' in text,
+            'share item' in text,
+            'directions' in text and 'get directions' not in text,
+        ])
+        
+        return google_score, apple_score
+    
     def process_screenshot(self, image_path: str) -> Dict:
         """
         Extract tracker data from screenshot (auto-detects platform).
         
+        In single-pass mode (the default) the image is decoded once and
+        Tesseract runs once; otherwise platform detection, text extraction
+        and confidence scoring each launch their own Tesseract process.
+        
         Returns:
             {
                 'platform': 'apple' | 'google',
@@ -72,6 +112,16 @@ class CrossPlatformOCRProcessor:
                 'error': Optional[str]
             }
         """
+        if self.tesseract_timeout:
+            self._deadline = time.monotonic() + self.tesseract_timeout
+        try:
+            if self.single_pass:
+                return self._process_single_pass(image_path)
+            return self._process_multi_pass(image_path)
+        finally:
+            self._deadline = None
+    
+    def _process_multi_pass(self, image_path: str) -> Dict:
         try:
             # Detect platform
             platform = self.detect_platform(image_path)
@@ -94,6 +144,87 @@ class CrossPlatformOCRProcessor:
                 'raw_text': ''
             }
     
+    def _process_single_pass(self, image_path: str) -> Dict:
+        """
+        Process a screenshot with a single image_to_data call.
+        
+        The word boxes from that one run give us the raw text, the
+        confidence and usually the platform. The panel is cropped at the
+        taller Apple offset so it covers both layouts; for Google
+        screenshots, words above the Google panel are dropped afterwards.
+        When the panel holds no deciding label (Google's "Find My Device"
+        header sits above the crop), the platform comes from a quick
+        low-res pass over the whole screenshot, as detect_platform does.
+        """
+        try:
+            with Image.open(image_path) as img:
+                img.load()
+                width, height = img.size
+                panel_top = int(height * self.APPLE_PANEL_TOP)
+                info_panel = img.crop((0, panel_top, width, height))
+            
+            processed = self._preprocess_image(info_panel)
+            custom_config = r'--oem 3 --psm 6'
+            ocr_data = pytesseract.image_to_data(
+                processed, config=custom_config, output_type=pytesseract.Output.DICT,
+                timeout=self._tesseract_timeout()
+            )
+            
+            google_score, apple_score = self._platform_scores(self._text_from_data(ocr_data))
+            if google_score != apple_score:
+                platform = 'google' if google_score > apple_score else 'apple'
+            else:
+                platform = self.detect_platform(image_path, img)
+            print(f"Detected platform: {platform}")
+            
+            if platform == 'apple':
+                patterns = self.apple_patterns
+            else:
+                patterns = self.google_patterns
+                # _preprocess_image doubles the resolution
+                min_top = (int(height * self.GOOGLE_PANEL_TOP) - panel_top) * 2
+                ocr_data = self._filter_data(ocr_data, min_top)
+            
+            raw_text = self._text_from_data(ocr_data)
+            print(f"Raw OCR text:\n{raw_text}\n")
+            
+            result = self._parse_text(raw_text, patterns)
+            if platform == 'google' and 'last_seen' in result:
+                result['last_seen'] = self._normalize_time_format(result['last_seen'])
+            
+            result['confidence'] = self._calculate_confidence(ocr_data)
+            result['raw_text'] = raw_text
+            result['platform'] = platform
+            return result
+            
+        except Exception as e:
+            return {
+                'platform': 'unknown',
+                'error': str(e),
+                'confidence': 0.0,
+                'raw_text': ''
+            }
+    
+    def _text_from_data(self, ocr_data: Dict) -> str:
+        """Rebuild line-oriented text from image_to_data word boxes."""
+        lines = []
+        current_key = None
+        for i, word in enumerate(ocr_data['text']):
+            word = str(word).strip()
+            if not word:
+                continue
+            key = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
+            if key != current_key:
+                lines.append([])
+                current_key = key
+            lines[-1].append(word)
+        return '\n'.join(' '.join(words) for words in lines)
+    
+    def _filter_data(self, ocr_data: Dict, min_top: int) -> Dict:
+        """Keep only the boxes whose top edge is at or below min_top."""
+        keep = [i for i, top in enumerate(ocr_data['top']) if top >= min_top]
+        return {key: [values[i] for i in keep] for key, values in ocr_data.items()}
+    
     def _process_apple_screenshot(self, image_path: str) -> Dict:
         """Process Apple Find My screenshot."""
         img = Image.open(image_path)
@@ -105,12 +236,16 @@ class CrossPlatformOCRProcessor:
         # Preprocess and run OCR
         processed = self._preprocess_image(info_panel)
         custom_config = r'--oem 3 --psm 6'
-        raw_text = pytesseract.image_to_string(processed, config=custom_config)
+        raw_text = pytesseract.image_to_string(
+            processed, config=custom_config, timeout=self._tesseract_timeout()
+        )
         
         print(f"Raw OCR text:\n{raw_text}\n")
         
         # Get confidence
-        ocr_data = pytesseract.image_to_data(processed, output_type=pytesseract.Output.DICT)
+        ocr_data = pytesseract.image_to_data(
+            processed, output_type=pytesseract.Output.DICT, timeout=self._tesseract_timeout()
+        )
         avg_confidence = self._calculate_confidence(ocr_data)
         
         # Parse with Apple patterns
@@ -131,12 +266,16 @@ class CrossPlatformOCRProcessor:
         # Preprocess and run OCR
         processed = self._preprocess_image(info_panel)
         custom_config = r'--oem 3 --psm 6'
-        raw_text = pytesseract.image_to_string(processed, config=custom_config)
+        raw_text = pytesseract.image_to_string(
+            processed, config=custom_config, timeout=self._tesseract_timeout()
+        )
         
         print(f"Raw OCR text:\n{raw_text}\n")
         
         # Get confidence
-        ocr_data = pytesseract.image_to_data(processed, output_type=pytesseract.Output.DICT)
+        ocr_data = pytesseract.image_to_data(
+            processed, output_type=pytesseract.Output.DICT, timeout=self._tesseract_timeout()
+        )
         avg_confidence = self._calculate_confidence(ocr_data)
         
         # Parse with Google patterns
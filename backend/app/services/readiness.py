@@ -0,0 +1,49 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+@lru_cache()
+def schema_heads() -> Tuple[str, ...]:
+    """The migration revisions this build expects the database to be at."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    return tuple(sorted(ScriptDirectory.from_config(config).get_heads()))
+
+
+def check_database(db: Session) -> Dict[str, str]:
+    """
+    Whether the database answers and has been migrated to this build's
+    head revision; "ok" or the reason per check. Tables are created by
+    `alembic upgrade head` only, so a fresh database is not ready until
+    that has run.
+    """
+    checks = {}
+    try:
+        db.execute(text("SELECT 1"))
+        checks["database"] = "ok"
+    except Exception as e:
+        db.rollback()
+        checks["database"] = f"unavailable: {e.__class__.__name__}"
+        checks["schema"] = "unknown"
+        return checks
+
+    try:
+        current = tuple(sorted(db.execute(text("SELECT version_num FROM alembic_version")).scalars()))
+    except Exception:
+        db.rollback()
+        current = ()
+    expected = schema_heads()
+    if current == expected:
+        checks["schema"] = "ok"
+    else:
+        checks["schema"] = f"at {', '.join(current) or 'no revision'}, expected {', '.join(expected)}"
+    return checks
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+
+class PendingScreenshot:
+    """An upload being written to the store; hashed as the bytes arrive."""
+
+    def __init__(self, temp_path: Path, extension: str):
+        self.temp_path = temp_path
+        self.extension = extension
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = temp_path.open('wb')
+
+    def write(self, data: bytes):
+        self._sha256.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+
+class StoredScreenshot:
+    """A screenshot saved under its content address."""
+
+    def __init__(self, sha256: str, disk_path: Path, url_path: str, size: int, duplicate: bool,
+                 mtime_ns: Optional[int] = None):
+        self.sha256 = sha256
+        self.disk_path = disk_path
+        self.url_path = url_path
+        self.size = size
+        self.duplicate = duplicate  # True if identical bytes were already stored
+        self.mtime_ns = mtime_ns  # Of the file as this upload created it; see ScreenshotStore.release
+
+
+class ScreenshotStore:
+    """
+    Content-addressed screenshot storage.
+
+    Files are stored as <root>/<sha[:2]>/<sha256><ext>, so re-uploading the
+    same screenshot reuses the existing file instead of writing a new one.
+    Uploads are streamed to a temp file while the SHA-256 is computed and
+    then renamed into place. An upload that finds its bytes already stored
+    touches the file, which is how release() tells that a file it created
+    has been picked up by another upload since.
+    """
+
+    def __init__(self, root: Path, url_prefix: str = "/uploads"):
+        self.root = root
+        self.url_prefix = url_prefix
+        self.incoming = root / ".incoming"
+
+    def open(self, filename: str) -> PendingScreenshot:
+        """Start writing a new upload."""
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        return PendingScreenshot(self.incoming / uuid.uuid4().hex, Path(filename).suffix.lower())
+
+    def commit(self, pending: PendingScreenshot) -> StoredScreenshot:
+        """Move a finished upload to its content address."""
+        pending.close()
+        sha256 = pending.sha256
+        relative = Path(sha256[:2]) / f"{sha256}{pending.extension}"
+        disk_path = self.root / relative
+
+        try:
+            os.utime(disk_path)
+            duplicate = True
+        except FileNotFoundError:
+            duplicate = False
+
+        mtime_ns = None
+        if duplicate:
+            pending.temp_path.unlink(missing_ok=True)
+        else:
+            disk_path.parent.mkdir(exist_ok=True)
+            os.replace(pending.temp_path, disk_path)
+            mtime_ns = disk_path.stat().st_mtime_ns
+
+        return StoredScreenshot(sha256, disk_path, self.url_for(disk_path), pending.size, duplicate, mtime_ns)
+
+    def release(self, stored: StoredScreenshot):
+        """
+        Remove a file this upload created, unless another upload has found
+        it since (blocking). The file is first moved aside, so a concurrent
+        upload of the same bytes either touched it before that (and it is
+        put back) or finds it missing and stores its own copy.
+        """
+        if stored.duplicate:
+            return
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        aside = self.incoming / uuid.uuid4().hex
+        try:
+            os.replace(stored.disk_path, aside)
+        except FileNotFoundError:
+            return
+        if aside.stat().st_mtime_ns != stored.mtime_ns:
+            os.replace(aside, stored.disk_path)
+        else:
+            aside.unlink()
+
+    def discard(self, pending: PendingScreenshot):
+        """Drop an upload that will not be committed."""
+        pending.close()
+        pending.temp_path.unlink(missing_ok=True)
+
+    def save(self, fileobj: BinaryIO, filename: str, chunk_size: int = 1024 * 1024) -> StoredScreenshot:
+        """Copy a file object into the store (blocking)."""
+        pending = self.open(filename)
+        try:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                pending.write(chunk)
+        except BaseException:
+            self.discard(pending)
+            raise
+        return self.commit(pending)
+
+    def url_for(self, disk_path) -> str:
+        """Public URL path for a stored file."""
+        return f"{self.url_prefix}/{Path(disk_path).relative_to(self.root).as_posix()}"
+
+    @staticmethod
+    def sha256_of(disk_path) -> str:
+        """Recover the content hash from a stored file's name."""
+        return Path(disk_path).stem
+
@@ -0,0 +1,207 @@
+import math
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'  # Ascending, so strings sort like the cells
+GEOHASH_PRECISION = 9  # About 5 m x 5 m cells
+MAX_COVER_CELLS = 32  # Index ranges per box before falling back to coarser cells
+
+EARTH_RADIUS_M = 6371008.8  # Mean radius, for great-circle distances
+MAX_DISTANCE_M = math.pi * EARTH_RADIUS_M
+
+# (west, south, east, north) in degrees
+Box = Tuple[float, float, float, float]
+
+
+def _cell_bits(precision: int) -> Tuple[int, int]:
+    bits = precision * 5
+    return (bits + 1) // 2, bits // 2  # Longitude gets the odd bit
+
+
+def _cell_index(lat: float, lng: float, precision: int) -> Tuple[int, int]:
+    lng_bits, lat_bits = _cell_bits(precision)
+    x = int((lng + 180) / 360 * (1 << lng_bits))
+    y = int((lat + 90) / 180 * (1 << lat_bits))
+    return min(max(x, 0), (1 << lng_bits) - 1), min(max(y, 0), (1 << lat_bits) - 1)
+
+
+def _interleave(x: int, y: int, precision: int) -> int:
+    lng_bits, lat_bits = _cell_bits(precision)
+    code = 0
+    for i in range(precision * 5):
+        # Bits alternate longitude, latitude, ... from the most significant
+        if i % 2 == 0:
+            lng_bits -= 1
+            code = code << 1 | (x >> lng_bits) & 1
+        else:
+            lat_bits -= 1
+            code = code << 1 | (y >> lat_bits) & 1
+    return code
+
+
+def _to_string(code: int, precision: int) -> str:
+    return ''.join(_BASE32[(code >> (5 * i)) & 31] for i in range(precision - 1, -1, -1))
+
+
+def encode_geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash of a point."""
+    x, y = _cell_index(float(lat), float(lng), precision)
+    return _to_string(_interleave(x, y, precision), precision)
+
+
+def _box_cells(box: Box, precision: int) -> Tuple[int, int, int, int]:
+    west, south, east, north = box
+    x0, y0 = _cell_index(south, west, precision)
+    x1, y1 = _cell_index(north, east, precision)
+    return x0, y0, x1, y1
+
+
+def _cover_codes(box: Box, precision: int) -> List[int]:
+    x0, y0, x1, y1 = _box_cells(box, precision)
+    return [_interleave(x, y, precision) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def cover_cells(box: Box, precision: int) -> List[str]:
+    """Geohashes of every cell at a precision that overlaps a box."""
+    return [_to_string(code, precision) for code in _cover_codes(box, precision)]
+
+
+def geohash_ranges(box: Box) -> List[Tuple[str, Optional[str]]]:
+    """
+    Half-open [low, high) geohash string ranges covering a box.
+
+    Uses the finest precision at which the box spans at most
+    MAX_COVER_CELLS cells, and merges cells that are adjacent in the
+    index. high is None for a range running to the end of the keyspace.
+    """
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        x0, y0, x1, y1 = _box_cells(box, candidate)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= MAX_COVER_CELLS:
+            precision = candidate
+            break
+
+    codes = sorted(_cover_codes(box, precision))
+    ranges = []
+    start = previous = codes[0]
+    for code in codes[1:] + [None]:
+        if code is not None and code == previous + 1:
+            previous = code
+            continue
+        end = previous + 1
+        high = _to_string(end, precision) if end < 1 << (precision * 5) else None
+        ranges.append((_to_string(start, precision), high))
+        if code is not None:
+            start = previous = code
+    return ranges
+
+
+def box_criteria(boxes: Iterable[Box]):
+    """
+    WHERE clause for locations inside any of the boxes.
+
+    The geohash ranges let the database walk idx_location_geohash; the
+    coordinate comparison then trims the cells' overhang exactly.
+    """
+    clauses = []
+    for box in boxes:
+        west, south, east, north = box
+        cover = [
+            models.Location.geohash >= low if high is None
+            else and_(models.Location.geohash >= low, models.Location.geohash < high)
+            for low, high in geohash_ranges(box)
+        ]
+        clauses.append(and_(
+            or_(*cover),
+            models.Location.latitude.between(south, north),
+            models.Location.longitude.between(west, east),
+        ))
+    return or_(*clauses)
+
+
+def split_box(west: float, south: float, east: float, north: float) -> List[Box]:
+    """A box as one or two boxes, split where it crosses the antimeridian (west > east)."""
+    if west <= east:
+        return [(west, south, east, north)]
+    return [(west, south, 180.0, north), (-180.0, south, east, north)]
+
+
+def radius_boxes(lat: float, lng: float, radius_m: float) -> List[Box]:
+    """Boxes that together contain every point within radius_m of (lat, lng)."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if south == -90.0 or north == 90.0:
+        return [(-180.0, south, 180.0, north)]  # Reaches a pole: every longitude
+
+    # Widest longitude span is at the latitude nearest the pole
+    dlng = math.degrees(radius_m / (EARTH_RADIUS_M * math.cos(math.radians(max(abs(south), abs(north))))))
+    if dlng >= 180:
+        return [(-180.0, south, 180.0, north)]
+    west, east = lng - dlng, lng + dlng
+    if west < -180:
+        return split_box(west + 360, south, east, north)
+    if east > 180:
+        return split_box(west, south, east - 360, north)
+    return [(west, south, east, north)]
+
+
+def distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle (haversine) distance in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def update_geohashes(connection, location_ids: Iterable[int]):
+    """
+    Recompute Location.geohash for the given rows.
+
+    Flushes through the ORM keep geohashes current automatically; call
+    this after writing coordinates with Core or raw SQL.
+    """
+    location_ids = sorted(set(location_ids))
+    for start in range(0, len(location_ids), 1000):
+        rows = connection.execute(
+            select(models.Location.id, models.Location.latitude, models.Location.longitude).where(
+                models.Location.id.in_(location_ids[start:start + 1000])
+            )
+        ).all()
+        if not rows:
+            continue
+        connection.execute(
+            update(models.Location).where(models.Location.id == bindparam('location_id')).values(
+                geohash=bindparam('new_geohash')
+            ),
+            [
+                {
+                    'location_id': location_id,
+                    'new_geohash': None if lat is None or lng is None else encode_geohash(lat, lng),
+                }
+                for location_id, lat, lng in rows
+            ]
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _set_geohashes(session, flush_context, instances):
+    for obj in session.new:
+        if isinstance(obj, models.Location):
+            obj.geohash = _geohash_of(obj)
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.Location):
+            continue
+        state = inspect(obj)
+        if state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes():
+            obj.geohash = _geohash_of(obj)
+
+
+def _geohash_of(location) -> Optional[str]:
+    if location.latitude is None or location.longitude is None:
+        return None
+    return encode_geohash(location.latitude, location.longitude)
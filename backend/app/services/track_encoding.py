@@ -0,0 +1,149 @@
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+# Type code on the wire = index in this tuple; anything unrecognised is 0
+LOCATION_TYPES = (
+    'unknown', 'starting_point', 'mrf', 'landfill', 'incinerator',
+    'waste_transfer_station', 'transit'
+)
+_TYPE_CODES = {name: code for code, name in enumerate(LOCATION_TYPES)}
+
+TRACK_MEDIA_TYPE = "application/vnd.cuptracker.track"
+
+# Binary layout (little-endian, every section 4-byte aligned so a browser
+# can view the arrays in place with Int32Array/Uint32Array/Uint8Array):
+#   header  magic "CTRK", version u8, 3 pad bytes, track count u32, pad u32
+#   track   tracker_id u32, point count n u32, then
+#           lat  int32[n]  microdegrees, first absolute then deltas
+#           lng  int32[n]  microdegrees, first absolute then deltas
+#           time uint32[n] epoch seconds, 0 when unknown or outside 1970-2106
+#           type uint8[n]  index into LOCATION_TYPES, zero-padded to 4 bytes
+MAGIC = b'CTRK'
+VERSION = 1
+_HEADER = struct.Struct('<4sB3xII')
+_TRACK = struct.Struct('<II')
+
+
+class Track:
+    """One tracker's path as parallel columns, in time order."""
+
+    def __init__(self, tracker_id: int):
+        self.tracker_id = tracker_id
+        self.lat: List[int] = []  # microdegrees
+        self.lng: List[int] = []
+        self.time: List[int] = []  # epoch seconds, 0 when unknown
+        self.type: List[int] = []
+
+    def __len__(self):
+        return len(self.lat)
+
+
+_UNIX_EPOCH = datetime(1970, 1, 1)
+_UNIX_EPOCH_UTC = _UNIX_EPOCH.replace(tzinfo=timezone.utc)
+_SECOND = timedelta(seconds=1)
+_MAX_EPOCH_SECONDS = 2 ** 32 - 1  # The binary format's uint32 time column
+
+
+def epoch_seconds(value: Optional[datetime]) -> int:
+    """
+    Whole seconds since 1970 (UTC), or 0 for no timestamp. Timestamps the
+    uint32 time column cannot hold (before 1970, after 2106) count as
+    unknown too, rather than failing the whole encode.
+    """
+    if value is None:
+        return 0
+    # SQLite hands back naive datetimes; they are stored in UTC
+    seconds = (value - (_UNIX_EPOCH if value.tzinfo is None else _UNIX_EPOCH_UTC)) // _SECOND
+    return seconds if 0 < seconds <= _MAX_EPOCH_SECONDS else 0
+
+
+def build_tracks(rows: Iterable) -> List[Track]:
+    """
+    Group (tracker_id, latitude, longitude, screenshot_timestamp,
+    location_type) rows, already ordered by tracker and time, into tracks.
+    Rows without coordinates are skipped.
+    """
+    tracks: Dict[int, Track] = {}
+    for tracker_id, latitude, longitude, timestamp, location_type in rows:
+        if latitude is None or longitude is None:
+            continue
+        track = tracks.get(tracker_id)
+        if track is None:
+            track = tracks[tracker_id] = Track(tracker_id)
+        track.lat.append(round(float(latitude) * 1_000_000))
+        track.lng.append(round(float(longitude) * 1_000_000))
+        track.time.append(epoch_seconds(timestamp))
+        track.type.append(_TYPE_CODES.get(location_type, 0))
+    return list(tracks.values())
+
+
+def _deltas(values: List[int]) -> List[int]:
+    return [values[0]] + [b - a for a, b in zip(values, values[1:])] if values else []
+
+
+def _le_bytes(typecode: str, values: List[int]) -> bytes:
+    packed = array(typecode, values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def encode_binary(tracks: List[Track]) -> bytes:
+    """Encode tracks in the CTRK binary format described above."""
+    parts = [_HEADER.pack(MAGIC, VERSION, len(tracks), 0)]
+    for track in tracks:
+        n = len(track)
+        parts.append(_TRACK.pack(track.tracker_id, n))
+        parts.append(_le_bytes('i', _deltas(track.lat)))
+        parts.append(_le_bytes('i', _deltas(track.lng)))
+        parts.append(_le_bytes('I', track.time))
+        parts.append(bytes(track.type) + b'\0' * (-n % 4))
+    return b''.join(parts)
+
+
+def _polyline_value(value: int, out: List[str]):
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode_polyline(lat: List[int], lng: List[int], precision: int = 5) -> str:
+    """
+    Google encoded-polyline string for microdegree coordinates.
+
+    precision=5 is the Google Maps format; 6 keeps full microdegree
+    resolution (the "polyline6" variant many decoders accept).
+    """
+    scale = 10 ** (6 - precision)
+    out: List[str] = []
+    previous_lat = previous_lng = 0
+    for y, x in zip(lat, lng):
+        y = round(y / scale)
+        x = round(x / scale)
+        _polyline_value(y - previous_lat, out)
+        _polyline_value(x - previous_lng, out)
+        previous_lat, previous_lng = y, x
+    return ''.join(out)
+
+
+def encode_polyline_json(tracks: List[Track], precision: int = 5) -> Dict:
+    """JSON fallback: one encoded polyline per track plus per-point times and types."""
+    return {
+        "precision": precision,
+        "location_types": list(LOCATION_TYPES),
+        "tracks": [
+            {
+                "tracker_id": track.tracker_id,
+                "points": len(track),
+                "polyline": encode_polyline(track.lat, track.lng, precision),
+                "timestamps": track.time,
+                "types": track.type,
+            }
+            for track in tracks
+        ]
+    }
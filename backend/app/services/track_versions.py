@@ -0,0 +1,65 @@
+from typing import Iterable
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Location attributes that change a tracker's drawn path
+_TRACK_ATTRIBUTES = ('tracker_id', 'latitude', 'longitude', 'screenshot_timestamp', 'location_type')
+
+
+def bump_track_versions(connection, tracker_ids: Iterable[int]):
+    """
+    Mark trackers' paths as changed, so caches keyed by location_version
+    (simplified tracks, map tiles) stop serving the old geometry.
+
+    Flushes through the ORM call this automatically; call it directly after
+    writing locations with Core or raw SQL.
+    """
+    tracker_ids = sorted(set(tracker_ids) - {None})
+    if tracker_ids:
+        connection.execute(
+            update(models.Tracker).where(
+                models.Tracker.id.in_(tracker_ids)
+            ).values(location_version=models.Tracker.location_version + 1)
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_tracks(session, flush_context, instances):
+    tracker_ids = session.info.setdefault('track_version_trackers', set())
+
+    for obj in session.deleted:
+        if isinstance(obj, models.Location):
+            tracker_ids.add(obj.tracker_id)
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.Location):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in _TRACK_ATTRIBUTES):
+            tracker_ids.add(obj.tracker_id)
+            tracker_ids.update(state.attrs.tracker_id.history.deleted or ())
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_tracks(session, flush_context):
+    tracker_ids = session.info.pop('track_version_trackers', set())
+    tracker_ids.update(obj.tracker_id for obj in session.new if isinstance(obj, models.Location))
+    tracker_ids.discard(None)
+    if not tracker_ids:
+        return
+
+    bump_track_versions(session.connection(), tracker_ids)
+    session.info['track_version_bumped'] = tracker_ids
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_bumped_versions(session, flush_context):
+    tracker_ids = session.info.pop('track_version_bumped', None)
+    if not tracker_ids:
+        return
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, models.Tracker) and inspect(obj).dict.get('id') in tracker_ids:
+            session.expire(obj, ['location_version'])
@@ -0,0 +1,245 @@
+import heapq
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.track_encoding import Track
+
+EARTH_RADIUS = 6378137.0  # Web Mercator sphere, meters
+METERS_PER_PIXEL_Z0 = 2 * math.pi * EARTH_RADIUS / 256  # 256px tiles at zoom 0
+MAX_ZOOM = 22
+
+SIMPLIFY_METHODS = ('dp', 'vw')
+
+
+def zoom_tolerance(zoom: int, pixels: float = 1.0) -> float:
+    """Web Mercator meters covered by `pixels` screen pixels at a zoom level."""
+    return METERS_PER_PIXEL_Z0 / (2 ** zoom) * pixels
+
+
+def _project(track: Track) -> Tuple[List[float], List[float]]:
+    # Microdegrees to Web Mercator meters, so one tolerance works at any latitude
+    xs = [EARTH_RADIUS * math.radians(lng / 1_000_000) for lng in track.lng]
+    ys = []
+    for lat in track.lat:
+        lat = max(min(lat / 1_000_000, 85.05112878), -85.05112878)
+        ys.append(EARTH_RADIUS * math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)))
+    return xs, ys
+
+
+def _segment_distance(px, py, ax, ay, bx, by) -> float:
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    if length == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def douglas_peucker_significance(xs: List[float], ys: List[float]) -> List[float]:
+    """
+    Largest Douglas-Peucker tolerance at which each point survives.
+
+    Simplifying at tolerance t keeps exactly the points whose value is > t,
+    so one pass serves every zoom level. A point can only survive if the
+    split that exposed it did, hence the min() with the parent's value.
+    """
+    n = len(xs)
+    significance = [0.0] * n
+    if n == 0:
+        return significance
+    significance[0] = significance[-1] = math.inf
+
+    stack = [(0, n - 1, math.inf)]
+    while stack:
+        first, last, parent = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay, bx, by = xs[first], ys[first], xs[last], ys[last]
+        index, farthest = first + 1, -1.0
+        for i in range(first + 1, last):
+            distance = _segment_distance(xs[i], ys[i], ax, ay, bx, by)
+            if distance > farthest:
+                index, farthest = i, distance
+        value = min(farthest, parent)
+        significance[index] = value
+        stack.append((first, index, value))
+        stack.append((index, last, value))
+    return significance
+
+
+def _triangle_area(xs, ys, a, b, c) -> float:
+    return abs((xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])) / 2
+
+
+def visvalingam_significance(xs: List[float], ys: List[float]) -> List[float]:
+    """
+    Effective area (m^2) at which Visvalingam-Whyatt removes each point.
+
+    Areas are made non-decreasing in removal order, so simplifying at a
+    minimum area A keeps exactly the points whose value is > A.
+    """
+    n = len(xs)
+    significance = [math.inf] * n
+    if n < 3:
+        return significance
+
+    previous = list(range(-1, n - 1))
+    following = list(range(1, n + 1))
+    areas = [math.inf] * n
+    heap = []
+    for i in range(1, n - 1):
+        areas[i] = _triangle_area(xs, ys, i - 1, i, i + 1)
+        heap.append((areas[i], i))
+    heapq.heapify(heap)
+
+    removed = [False] * n
+    floor = 0.0
+    while heap:
+        area, i = heapq.heappop(heap)
+        if removed[i] or area != areas[i]:
+            continue  # Stale heap entry
+        floor = max(floor, area)
+        significance[i] = floor
+        removed[i] = True
+
+        before, after = previous[i], following[i]
+        following[before] = after
+        previous[after] = before
+        for j in (before, after):
+            if 0 < j < n - 1:
+                areas[j] = _triangle_area(xs, ys, previous[j], j, following[j])
+                heapq.heappush(heap, (areas[j], j))
+    return significance
+
+
+class SimplifiedTrack:
+    """
+    A full track plus per-point significance for one simplification method.
+
+    Simplified copies are kept per tolerance (up to one per zoom level), so
+    the tiles of a zoom level share them instead of each rebuilding them.
+    """
+
+    def __init__(self, track: Track, method: str):
+        self.track = track
+        self.method = method
+        xs, ys = _project(track)
+        if method == 'vw':
+            self.significance = visvalingam_significance(xs, ys)
+        else:
+            self.significance = douglas_peucker_significance(xs, ys)
+        # (west, south, east, north) in microdegrees; None for an empty track
+        self.bounds = (min(track.lng), min(track.lat), max(track.lng), max(track.lat)) if len(track) else None
+        self._levels: Dict[float, Track] = {}
+
+    def crosses(self, box: Tuple[float, float, float, float]) -> bool:
+        """Whether the track's bounding box meets a (west, south, east, north) box in degrees."""
+        if self.bounds is None:
+            return False
+        west, south, east, north = self.bounds
+        return not (east < box[0] * 1e6 or west > box[2] * 1e6 or north < box[1] * 1e6 or south > box[3] * 1e6)
+
+    def at(self, tolerance: float) -> Track:
+        """The track simplified to a tolerance in meters."""
+        simplified = self._levels.get(tolerance)
+        if simplified is None:
+            simplified = self._simplify(tolerance)
+            if len(self._levels) <= MAX_ZOOM:
+                self._levels[tolerance] = simplified
+        return simplified
+
+    def _simplify(self, tolerance: float) -> Track:
+        # Visvalingam compares areas; a triangle this size deviates about
+        # `tolerance` from its base at typical point spacing
+        threshold = tolerance * tolerance / 2 if self.method == 'vw' else tolerance
+        kept = [i for i, value in enumerate(self.significance) if value > threshold]
+
+        source = self.track
+        simplified = Track(source.tracker_id)
+        simplified.lat = [source.lat[i] for i in kept]
+        simplified.lng = [source.lng[i] for i in kept]
+        simplified.time = [source.time[i] for i in kept]
+        simplified.type = [source.type[i] for i in kept]
+        return simplified
+
+
+class TrackCache:
+    """
+    In-process LRU of SimplifiedTrack objects.
+
+    Keys include the tracker's location_version, so a changed track is
+    simply missed and recomputed; old versions age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, SimplifiedTrack]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[SimplifiedTrack]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: SimplifiedTrack):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@lru_cache()
+def get_track_cache() -> TrackCache:
+    """Get the process-wide simplified track cache."""
+    return TrackCache(get_settings().track_cache_size)
+
+
+def simplify_tracks(
+    versions: Dict[int, int],
+    load_tracks,
+    method: str,
+    tolerance: float,
+    scope: Hashable = None,
+    bounds: Optional[Tuple[float, float, float, float]] = None
+) -> List[Track]:
+    """
+    Simplify tracks, reusing cached significance where the version matches.
+
+    versions maps tracker_id -> location_version for the tracks wanted.
+    load_tracks(tracker_ids) returns full Track objects for cache misses.
+    scope separates cache entries built from different row filters (e.g.
+    a contributor who only sees their own uploads). With bounds (west,
+    south, east, north in degrees) only tracks reaching that box are
+    returned.
+    """
+    cache = get_track_cache()
+    simplified: Dict[int, SimplifiedTrack] = {}
+    missing = []
+    for tracker_id, version in versions.items():
+        entry = cache.get((tracker_id, version, method, scope))
+        if entry is None:
+            missing.append(tracker_id)
+        else:
+            simplified[tracker_id] = entry
+
+    if missing:
+        loaded = {track.tracker_id: track for track in load_tracks(missing)}
+        for tracker_id in missing:
+            track = loaded.get(tracker_id) or Track(tracker_id)
+            entry = SimplifiedTrack(track, method)
+            cache.put((tracker_id, versions[tracker_id], method, scope), entry)
+            simplified[tracker_id] = entry
+
+    return [
+        simplified[tracker_id].at(tolerance)
+        for tracker_id in sorted(versions)
+        if len(simplified[tracker_id].track)
+        and (bounds is None or simplified[tracker_id].crosses(bounds))
+    ]
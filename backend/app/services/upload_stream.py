@@ -0,0 +1,155 @@
+import time
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from multipart.multipart import MultipartParser, parse_options_header
+
+from app.services.screenshot_store import ScreenshotStore, PendingScreenshot, StoredScreenshot
+
+
+class StreamedFile:
+    """A file part that has been fully written to the screenshot store."""
+
+    def __init__(self, position: int, filename: str, content_type: str):
+        self.position = position
+        self.filename = filename
+        self.content_type = content_type
+        self.stored: Optional[StoredScreenshot] = None
+        self.file_size = 0
+        self.receive_seconds = 0.0
+        self._started = time.perf_counter()
+        self._pending: Optional[PendingScreenshot] = None
+
+    @property
+    def is_image(self) -> bool:
+        return self.content_type.startswith('image/')
+
+
+class _BatchParser:
+    """
+    Callback target for python-multipart; writes file parts as they arrive.
+    The callbacks do file I/O, so the parser is fed from a worker thread.
+    """
+
+    def __init__(self, field_name: str, store: ScreenshotStore, max_files: int):
+        self.field_name = field_name
+        self.store = store
+        self.max_files = max_files
+        self.completed: List[StreamedFile] = []
+        self.stored: List[StoredScreenshot] = []  # Everything this request committed
+        self.count = 0
+        self._current: Optional[StreamedFile] = None
+        self._headers = {}
+        self._header_field = b''
+        self._header_value = b''
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._current = None
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b''
+        self._header_value = b''
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b'content-disposition', b''))
+        if options.get(b'name', b'').decode('latin-1') != self.field_name or b'filename' not in options:
+            return
+
+        self.count += 1
+        if self.count > self.max_files:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Maximum {self.max_files} files allowed per batch upload"
+            )
+
+        content_type = self._headers.get(b'content-type', b'application/octet-stream').decode('latin-1')
+        part = StreamedFile(self.count - 1, options[b'filename'].decode('utf-8', 'replace'), content_type)
+        if part.is_image:
+            part._pending = self.store.open(part.filename)
+        self._current = part
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        part = self._current
+        if part is None:
+            return
+        part.file_size += end - start
+        if part._pending is not None:
+            # Chunks are small (one network read), so write and hash inline
+            part._pending.write(data[start:end])
+
+    def on_part_end(self):
+        part = self._current
+        if part is None:
+            return
+        if part._pending is not None:
+            part.stored = self.store.commit(part._pending)
+            part._pending = None
+            self.stored.append(part.stored)
+        part.receive_seconds = time.perf_counter() - part._started
+        self.completed.append(part)
+        self._current = None
+
+    def abort(self, release_stored: bool):
+        """Delete a partially written file and, on error, the files this request stored (blocking)."""
+        part = self._current
+        if part is not None and part._pending is not None:
+            self.store.discard(part._pending)
+            part._pending = None
+        if release_stored:
+            for stored in self.stored:
+                self.store.release(stored)
+
+
+async def stream_files_to_disk(
+    request: Request,
+    field_name: str,
+    store: ScreenshotStore,
+    max_files: int
+) -> AsyncIterator[StreamedFile]:
+    """
+    Parse a multipart request body incrementally, yielding each file as soon
+    as its last byte has been written to the store.
+
+    Unlike UploadFile, nothing is spooled first, so callers can start
+    processing the first file while later ones are still being received.
+    Non-image parts are yielded without being stored (stored is None).
+    If the upload fails part way (too many files, a malformed body, a
+    disconnect), the files it stored are released again.
+    """
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    if content_type != b'multipart/form-data' or b'boundary' not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    target = _BatchParser(field_name, store, max_files)
+    parser = MultipartParser(params[b'boundary'], {
+        "on_part_begin": target.on_part_begin,
+        "on_part_data": target.on_part_data,
+        "on_part_end": target.on_part_end,
+        "on_header_field": target.on_header_field,
+        "on_header_value": target.on_header_value,
+        "on_header_end": target.on_header_end,
+        "on_headers_finished": target.on_headers_finished,
+    })
+
+    finished = False
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(parser.write, chunk)
+            while target.completed:
+                yield target.completed.pop(0)
+        await run_in_threadpool(parser.finalize)
+        finished = True
+        while target.completed:
+            yield target.completed.pop(0)
+    finally:
+        await run_in_threadpool(target.abort, not finished)
@@ -0,0 +1,323 @@
+import hashlib
+import math
+import os
+import shutil
+import struct
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.track_encoding import Track
+
+TILE_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+EXTENT = 4096  # Tile coordinate units per side
+BUFFER = 64  # Units drawn past each edge so lines and symbols join across tiles
+TILE_PIXELS = 256
+
+# Bump when the tile contents change shape, to orphan cached tiles
+TILE_FORMAT_VERSION = 1
+
+_MAX_LATITUDE = 85.05112878
+
+# Mapbox Vector Tile protobuf (vector_tile.proto v2.1) field numbers
+_TILE_LAYERS = 3
+_LAYER_NAME, _LAYER_FEATURES, _LAYER_KEYS, _LAYER_VALUES, _LAYER_EXTENT, _LAYER_VERSION = 1, 2, 3, 4, 5, 15
+_FEATURE_ID, _FEATURE_TAGS, _FEATURE_TYPE, _FEATURE_GEOMETRY = 1, 2, 3, 4
+_VALUE_STRING, _VALUE_DOUBLE, _VALUE_UINT, _VALUE_SINT, _VALUE_BOOL = 1, 3, 5, 6, 7
+POINT, LINESTRING = 1, 2
+_MOVE_TO, _LINE_TO = 1, 2
+_DOUBLE = struct.Struct('<d')
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of a tile in degrees."""
+    n = 2 ** z
+
+    def latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360 - 180, latitude(y + 1), (x + 1) / n * 360 - 180, latitude(y)
+
+
+def buffered_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """tile_bounds() grown by BUFFER; in degrees, so generous at high latitudes."""
+    west, south, east, north = tile_bounds(z, x, y)
+    pad = (east - west) * BUFFER / EXTENT
+    return west - pad, south - pad, east + pad, north + pad
+
+
+class TileProjection:
+    """Degrees to integer tile coordinates (0..EXTENT, y down) for one tile."""
+
+    def __init__(self, z: int, x: int, y: int):
+        self.scale = EXTENT * 2 ** z
+        self.x0 = x * EXTENT
+        self.y0 = y * EXTENT
+
+    def __call__(self, lat: float, lng: float) -> Tuple[int, int]:
+        lat = max(min(lat, _MAX_LATITUDE), -_MAX_LATITUDE)
+        sin = math.sin(math.radians(lat))
+        wx = (lng + 180) / 360 * self.scale
+        wy = (0.5 - math.log((1 + sin) / (1 - sin)) / (4 * math.pi)) * self.scale
+        return round(wx - self.x0), round(wy - self.y0)
+
+
+def _varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _field_bytes(field: int, payload: bytes, out: bytearray):
+    _varint(field << 3 | 2, out)
+    _varint(len(payload), out)
+    out += payload
+
+
+def _field_varint(field: int, value: int, out: bytearray):
+    _varint(field << 3, out)
+    _varint(value, out)
+
+
+def _packed(field: int, values: Iterable[int], out: bytearray):
+    payload = bytearray()
+    for value in values:
+        _varint(value, payload)
+    _field_bytes(field, payload, out)
+
+
+def _encode_value(value) -> bytes:
+    out = bytearray()
+    if isinstance(value, bool):
+        _field_varint(_VALUE_BOOL, int(value), out)
+    elif isinstance(value, int):
+        if value >= 0:
+            _field_varint(_VALUE_UINT, value, out)
+        else:
+            _field_varint(_VALUE_SINT, _zigzag(value), out)
+    elif isinstance(value, float):
+        _varint(_VALUE_DOUBLE << 3 | 1, out)
+        out += _DOUBLE.pack(value)
+    else:
+        _field_bytes(_VALUE_STRING, str(value).encode(), out)
+    return bytes(out)
+
+
+class Layer:
+    """One MVT layer being built; keys and values are shared between its features."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._features: List[bytes] = []
+        self._keys: Dict[str, int] = {}
+        self._values: Dict[bytes, int] = {}
+
+    def __len__(self):
+        return len(self._features)
+
+    def _tags(self, properties: Dict) -> List[int]:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            encoded = _encode_value(value)
+            tags.append(self._keys.setdefault(key, len(self._keys)))
+            tags.append(self._values.setdefault(encoded, len(self._values)))
+        return tags
+
+    def _add(self, geometry_type: int, geometry: List[int], properties: Dict, feature_id: Optional[int]):
+        out = bytearray()
+        if feature_id is not None:
+            _field_varint(_FEATURE_ID, feature_id, out)
+        tags = self._tags(properties)
+        if tags:
+            _packed(_FEATURE_TAGS, tags, out)
+        _field_varint(_FEATURE_TYPE, geometry_type, out)
+        _packed(_FEATURE_GEOMETRY, geometry, out)
+        self._features.append(bytes(out))
+
+    def add_point(self, x: int, y: int, properties: Dict, feature_id: Optional[int] = None):
+        self._add(POINT, [_MOVE_TO | 1 << 3, _zigzag(x), _zigzag(y)], properties, feature_id)
+
+    def add_line(self, points: List[Tuple[int, int]], properties: Dict, feature_id: Optional[int] = None):
+        """Add a linestring of at least two distinct tile-coordinate points."""
+        x, y = points[0]
+        geometry = [_MOVE_TO | 1 << 3, _zigzag(x), _zigzag(y), _LINE_TO | (len(points) - 1) << 3]
+        for px, py in points[1:]:
+            geometry.append(_zigzag(px - x))
+            geometry.append(_zigzag(py - y))
+            x, y = px, py
+        self._add(LINESTRING, geometry, properties, feature_id)
+
+    def encode(self) -> bytes:
+        out = bytearray()
+        _field_varint(_LAYER_VERSION, 2, out)
+        _field_bytes(_LAYER_NAME, self.name.encode(), out)
+        for feature in self._features:
+            _field_bytes(_LAYER_FEATURES, feature, out)
+        for key in self._keys:
+            _field_bytes(_LAYER_KEYS, key.encode(), out)
+        for value in self._values:
+            _field_bytes(_LAYER_VALUES, value, out)
+        _field_varint(_LAYER_EXTENT, EXTENT, out)
+        return bytes(out)
+
+
+def encode_tile(layers: Iterable[Layer]) -> bytes:
+    """Serialize layers into a tile, leaving out empty ones."""
+    out = bytearray()
+    for layer in layers:
+        if len(layer):
+            _field_bytes(_TILE_LAYERS, layer.encode(), out)
+    return bytes(out)
+
+
+def add_points(layer: Layer, points: Iterable[Tuple[int, int, int, Dict]], cluster_pixels: int = 0):
+    """
+    Add (x, y, feature id, properties) points that fall inside the tile.
+
+    With cluster_pixels, points are grouped on a grid of that many screen
+    pixels; a cell holding several points becomes one feature at their
+    centroid with cluster=true, point_count and tracker_count.
+    """
+    if not cluster_pixels:
+        for x, y, feature_id, properties in points:
+            if 0 <= x < EXTENT and 0 <= y < EXTENT:
+                layer.add_point(x, y, properties, feature_id)
+        return
+
+    cell = EXTENT * cluster_pixels // TILE_PIXELS
+    cells: Dict[Tuple[int, int], list] = {}
+    for point in points:
+        x, y = point[0], point[1]
+        # Only points inside the tile itself, so neighbours don't count them twice
+        if 0 <= x < EXTENT and 0 <= y < EXTENT:
+            cells.setdefault((x // cell, y // cell), []).append(point)
+
+    for members in cells.values():
+        if len(members) == 1:
+            x, y, feature_id, properties = members[0]
+            layer.add_point(x, y, properties, feature_id)
+            continue
+        layer.add_point(
+            round(sum(m[0] for m in members) / len(members)),
+            round(sum(m[1] for m in members) / len(members)),
+            {
+                "cluster": True,
+                "point_count": len(members),
+                "tracker_count": len({m[3].get("tracker_id") for m in members}),
+            }
+        )
+
+
+def add_tracks(layer: Layer, tracks: List[Track], z: int, x: int, y: int):
+    """
+    Add each track's parts that cross the tile (plus buffer) as linestrings.
+
+    Tracks should already be simplified for the zoom; segments are kept
+    when their bounding box touches the buffered tile, and consecutive kept
+    segments are joined into one line.
+    """
+    west, south, east, north = buffered_bounds(z, x, y)
+    project = TileProjection(z, x, y)
+    lo, hi = -BUFFER, EXTENT + BUFFER
+
+    for track in tracks:
+        if len(track) < 2:
+            continue
+        # Cheap reject before projecting every point (coordinates are microdegrees)
+        if (max(track.lat) < south * 1e6 or min(track.lat) > north * 1e6
+                or max(track.lng) < west * 1e6 or min(track.lng) > east * 1e6):
+            continue
+
+        points = [project(lat / 1e6, lng / 1e6) for lat, lng in zip(track.lat, track.lng)]
+        run: List[Tuple[int, int]] = []
+        for a, b in zip(points, points[1:]):
+            touches = not (max(a[0], b[0]) < lo or min(a[0], b[0]) > hi
+                           or max(a[1], b[1]) < lo or min(a[1], b[1]) > hi)
+            if not touches:
+                _flush_run(layer, run, track.tracker_id)
+                run = []
+                continue
+            if not run:
+                run.append(a)
+            if b != run[-1]:
+                run.append(b)
+        _flush_run(layer, run, track.tracker_id)
+
+
+def _flush_run(layer: Layer, run: List[Tuple[int, int]], tracker_id: int):
+    if len(run) >= 2:
+        layer.add_line(run, {"tracker_id": tracker_id}, tracker_id)
+
+
+def data_version(versions: Dict[int, int], *settings) -> str:
+    """
+    Short hash of tracker_id -> location_version for an investigation.
+
+    It changes when any tracker's locations change and when trackers are
+    added or removed; extra settings that shape the tiles are mixed in.
+    """
+    digest = hashlib.sha1(repr((TILE_FORMAT_VERSION, settings, sorted(versions.items()))).encode())
+    return digest.hexdigest()[:16]
+
+
+class TileCache:
+    """
+    Encoded tiles on disk as <root>/<investigation>/<scope>/<version>/<z>/<x>/<y>.mvt.
+
+    A tile is rendered once per data version. When a new version is first
+    written, older version directories of the same investigation and scope
+    are removed.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _directory(self, investigation_id: int, scope: str, version: str) -> Path:
+        return self.root / str(investigation_id) / scope / version
+
+    def get(self, investigation_id: int, scope: str, version: str, z: int, x: int, y: int) -> Optional[bytes]:
+        path = self._directory(investigation_id, scope, version) / str(z) / str(x) / f"{y}.mvt"
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, investigation_id: int, scope: str, version: str, z: int, x: int, y: int, tile: bytes):
+        directory = self._directory(investigation_id, scope, version)
+        if not directory.exists():
+            self._prune(directory)
+        path = directory / str(z) / str(x) / f"{y}.mvt"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f".{uuid.uuid4().hex}")
+            temp_path.write_bytes(tile)
+            os.replace(temp_path, path)
+        except OSError:
+            pass  # A cache write failing (or racing a prune) only costs a re-render
+
+    def _prune(self, current: Path):
+        if not current.parent.exists():
+            return
+        for stale in current.parent.iterdir():
+            if stale != current:
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def clear(self, investigation_id: int):
+        """Drop every cached tile of an investigation."""
+        shutil.rmtree(self.root / str(investigation_id), ignore_errors=True)
+
+
+@lru_cache()
+def get_tile_cache() -> TileCache:
+    """Get the tile cache under the configured directory (backend/tile_cache by default)."""
+    root = get_settings().tile_cache_dir or Path(__file__).parent.parent.parent / "tile_cache"
+    return TileCache(Path(root))
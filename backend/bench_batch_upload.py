@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch screenshot uploads against a running API server.
+
+Compares uploading a batch one file at a time (the old serial path) with a
+single request to the concurrent /api/upload/screenshots endpoint.
+
+Usage:
+    python bench_batch_upload.py --email rich@example.com --password password123 \
+        [--url http://localhost:8000] [--files 100]
+"""
+
+import argparse
+import statistics
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+import requests
+
+
+def load_screenshots(count):
+    """Return `count` (filename, bytes, content_type) tuples, cycling the samples."""
+    screenshots_dir = Path(__file__).parent.parent / "assets" / "screenshots"
+    samples = [
+        path for path in sorted(screenshots_dir.iterdir())
+        if path.suffix.lower() in ('.png', '.jpg', '.jpeg')
+    ]
+    content_types = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg'}
+    return [
+        (f"{i:03d}_{path.name}", path.read_bytes(), content_types[path.suffix.lower()])
+        for i, path in enumerate(islice(cycle(samples), count))
+    ]
+
+
+def bench_serial(session, url, screenshots):
+    """Upload each file in its own request, one after another."""
+    start = time.perf_counter()
+    for filename, data, content_type in screenshots:
+        response = session.post(
+            f"{url}/api/upload/screenshot",
+            files={"file": (filename, data, content_type)}
+        )
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def bench_batch(session, url, screenshots):
+    """Upload all files in one request to the concurrent batch endpoint."""
+    start = time.perf_counter()
+    response = session.post(
+        f"{url}/api/upload/screenshots",
+        files=[("files", screenshot) for screenshot in screenshots]
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start, response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--files", type=int, default=100)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    login = session.post(f"{args.url}/auth/login", json={"email": args.email, "password": args.password})
+    login.raise_for_status()
+    session.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+    screenshots = load_screenshots(args.files)
+    print(f"Uploading {len(screenshots)} screenshots to {args.url}\n")
+
+    serial_seconds = bench_serial(session, args.url, screenshots)
+    batch_seconds, batch = bench_batch(session, args.url, screenshots)
+
+    ocr_ms = [r["timings"]["ocr_ms"] for r in batch["results"] if r["status"] == "success"]
+    errors = sum(1 for r in batch["results"] if r["status"] != "success")
+
+    print("=" * 60)
+    print(f"{'Serial (one request per file)':<36} {serial_seconds:>8.2f} s")
+    print(f"{'Concurrent batch (one request)':<36} {batch_seconds:>8.2f} s")
+    print(f"{'Speedup':<36} {serial_seconds / batch_seconds:>8.2f}x")
+    print("-" * 60)
+    if ocr_ms:
+        print(f"Per-file OCR: median {statistics.median(ocr_ms):.0f} ms, max {max(ocr_ms):.0f} ms")
+    print(f"Batch errors: {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the streaming exports (CSV, Arrow IPC, Parquet).
+Builds a synthetic investigation (1M locations by default), streams the
+export through the same generator the endpoint uses and fails if resident
+memory grows by more than the allowed amount while it runs.
+"""
+
+from app.database import Base
+from app.services.export import gzip_chunks, iter_arrow, iter_csv, iter_parquet
+from bench_summary import build_fixture
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+# format -> (generator, default rows per chunk)
+FORMATS = {
+    'csv': (iter_csv, 2000),
+    'arrow': (iter_arrow, 65536),
+    'parquet': (iter_parquet, 65536),
+}
+
+
+def rss_mb():
+    """Current (not peak) resident set size in MB."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trackers", type=int, default=10_000)
+    parser.add_argument("--locations", type=int, default=100, help="locations per tracker")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--batch-size", type=int, help="rows per chunk (default: the format's setting)")
+    parser.add_argument("--gzip", action="store_true", help="compress the stream as the endpoint would")
+    parser.add_argument("--max-growth-mb", type=float, default=32.0)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(temp_dir.name, 'bench_export.db')}"
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    total = args.trackers * args.locations
+    print(f"Building {args.trackers} trackers x {args.locations} locations ({total:,} rows)...")
+    session = Session()
+    investigation_id, _ = build_fixture(session, args.trackers, args.locations)
+    session.close()
+
+    iter_format, default_batch_size = FORMATS[args.format]
+    chunks = iter_format(investigation_id, args.batch_size or default_batch_size, session_factory=Session)
+    if args.gzip:
+        chunks = gzip_chunks(chunks)
+
+    samples = []
+    sent = 0
+    first_byte = None
+    start = time.perf_counter()
+    for n, chunk in enumerate(chunks):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        sent += len(chunk)
+        # Baseline after the first batch, once the cursor and buffers exist
+        if n >= 2:
+            samples.append(rss_mb())
+    elapsed = time.perf_counter() - start
+
+    baseline = samples[0]
+    peak = max(samples)
+    print(f"{args.format}: streamed {sent / (1024 * 1024):.1f} MB in {elapsed:.1f} s "
+          f"(first byte after {first_byte * 1000:.1f} ms)")
+    for fraction in (0.0, 0.25, 0.5, 0.75, 1.0):
+        index = min(int(fraction * (len(samples) - 1)), len(samples) - 1)
+        print(f"  RSS at {fraction:>4.0%}: {samples[index]:8.1f} MB")
+    growth = peak - baseline
+    print(f"  growth: {growth:.1f} MB (limit {args.max_growth_mb:.0f} MB)")
+
+    engine.dispose()
+    if temp_dir:
+        temp_dir.cleanup()
+
+    failed = growth > args.max_growth_mb
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark for bulk location ingest.
+Saves the same kind of OCR results one at a time through the /from-ocr
+endpoint function and in bulk through the ingest service, checks that
+the bulk path wrote every row, and fails if it stays below the target
+rows per second.
+"""
+
+from app.auth import Principal
+from app.database import Base, _async_url
+from app import models, schemas
+from app.routers.locations import save_location_from_ocr
+from app.services import bulk_ingest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def ocr_rows(investigation_id, count, trackers, seed=1):
+    """Random OCR results spread over the given number of trackers; a third come with coordinates."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for n in range(count):
+        row = {
+            "investigation_id": investigation_id,
+            "tracker_name": f"Tracker {n % trackers}",
+            "platform": "apple",
+            "address": f"{n} Bench Rd",
+            "city": "Springfield",
+            "state": "IL",
+            "screenshot_timestamp": start + timedelta(minutes=n),
+            "screenshot_path": f"uploads/bench_{n}.png",
+            "ocr_raw_text": "Last seen 5 min ago",
+        }
+        if n % 3 == 0:
+            row["latitude"] = round(rng.uniform(32.0, 49.0), 6)
+            row["longitude"] = round(rng.uniform(-124.0, -70.0), 6)
+        rows.append(schemas.BulkLocationFromOCR(**row))
+    return rows
+
+
+async def save_one_at_a_time(database_url, rows, principal):
+    """Save rows through the /from-ocr endpoint function, one request each; returns rows/s."""
+    async_engine = create_async_engine(_async_url(database_url))
+    Session = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    try:
+        start = time.perf_counter()
+        for row in rows:
+            data = schemas.SaveLocationFromOCR(**row.model_dump(exclude={"latitude", "longitude", "location_type"}))
+            async with Session() as session:
+                await save_location_from_ocr(data=data, db=session, current_user=principal)
+        return len(rows) / (time.perf_counter() - start)
+    finally:
+        await async_engine.dispose()
+
+
+def stored_locations(session, investigation_id):
+    return session.query(models.Location).join(models.Tracker).filter(
+        models.Tracker.investigation_id == investigation_id
+    ).count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000, help="rows for the bulk run")
+    parser.add_argument("--single-rows", type=int, default=500, help="rows for the one-at-a-time run")
+    parser.add_argument("--trackers", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--target", type=float, default=2000.0, help="minimum bulk rows per second")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(temp_dir.name, 'bench_ingest.db')}"
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    session = Session()
+    user = models.User(email="bench@example.com", password_hash="-", full_name="Bench", role="admin")
+    single = models.Investigation(name="Ingest benchmark (single)", brand="Bench")
+    bulk = models.Investigation(name="Ingest benchmark (bulk)", brand="Bench")
+    session.add_all([user, single, bulk])
+    session.commit()
+    user_id, single_id, bulk_id = user.id, single.id, bulk.id
+    session.close()
+
+    session = Session()
+    principal = Principal.from_user(session.get(models.User, user_id))
+    session.close()
+    rows = ocr_rows(single_id, args.single_rows, args.trackers)
+    single_rate = asyncio.run(save_one_at_a_time(database_url, rows, principal))
+
+    session = Session()
+    rows = ocr_rows(bulk_id, args.rows, args.trackers)
+    result = bulk_ingest.BulkIngestResult()
+    start = time.perf_counter()
+    for offset in range(0, len(rows), args.batch_size):
+        bulk_ingest.ingest_batch(session.connection(), rows[offset:offset + args.batch_size], user_id, result)
+    bulk_ingest.finish(session.connection(), result)
+    session.commit()
+    bulk_rate = len(rows) / (time.perf_counter() - start)
+
+    stored = stored_locations(session, bulk_id)
+    stored_single = stored_locations(session, single_id)
+    session.close()
+
+    print(f"one at a time  {single_rate:10.0f} rows/s  ({args.single_rows:,} rows)")
+    print(f"bulk           {bulk_rate:10.0f} rows/s  ({args.rows:,} rows, {result.trackers_created} trackers created)")
+    print(f"speedup        {bulk_rate / single_rate:10.1f}x")
+
+    failed = bulk_rate < args.target
+    if stored_single != args.single_rows:
+        print(f"expected {args.single_rows} single-saved locations, stored {stored_single}")
+        failed = True
+    if stored != args.rows or len(result.rows) != args.rows:
+        print(f"expected {args.rows} locations, stored {stored}, returned {len(result.rows)}")
+        failed = True
+
+    engine.dispose()
+    if temp_dir:
+        temp_dir.cleanup()
+
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
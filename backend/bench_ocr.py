@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Timing harness for the OCR processor.
+Compares the multi-pass and single-pass pipelines on the sample screenshots.
+"""
+
+from app.services.ocr_processor import CrossPlatformOCRProcessor
+from pathlib import Path
+import statistics
+import sys
+import time
+
+
+def time_pipeline(processor, screenshot_files, rounds):
+    """Return per-screenshot timings (seconds) and the last results."""
+    timings = []
+    results = {}
+    for _ in range(rounds):
+        for screenshot in screenshot_files:
+            start = time.perf_counter()
+            results[screenshot.name] = processor.process_screenshot(str(screenshot))
+            timings.append(time.perf_counter() - start)
+    return timings, results
+
+
+def bench_ocr(rounds=3):
+    """Benchmark both OCR modes over assets/screenshots."""
+    screenshots_dir = Path(__file__).parent.parent / "assets" / "screenshots"
+
+    screenshot_files = list(screenshots_dir.glob("*.png")) + list(screenshots_dir.glob("*.PNG")) + \
+                      list(screenshots_dir.glob("*.jpg")) + list(screenshots_dir.glob("*.JPG"))
+
+    print(f"Found {len(screenshot_files)} screenshots, {rounds} rounds each\n")
+
+    before, before_results = time_pipeline(
+        CrossPlatformOCRProcessor(single_pass=False), screenshot_files, rounds
+    )
+    after, after_results = time_pipeline(
+        CrossPlatformOCRProcessor(single_pass=True), screenshot_files, rounds
+    )
+
+    print("=" * 80)
+    print(f"{'Screenshot':<40} {'Field':<14} {'Multi-pass':<24} Single-pass")
+    print("-" * 80)
+    for name in sorted(before_results):
+        for field in ('platform', 'tracker_name', 'address', 'last_seen', 'confidence'):
+            old = str(before_results[name].get(field))[:22]
+            new = str(after_results[name].get(field))[:22]
+            print(f"{name[:38]:<40} {field:<14} {old:<24} {new}")
+
+    print("=" * 80)
+    print(f"{'Mode':<14} {'mean (s)':>10} {'median (s)':>12} {'max (s)':>10}")
+    for label, timings in (('multi-pass', before), ('single-pass', after)):
+        print(f"{label:<14} {statistics.mean(timings):>10.3f} "
+              f"{statistics.median(timings):>12.3f} {max(timings):>10.3f}")
+
+    speedup = statistics.mean(before) / statistics.mean(after)
+    print(f"\nSpeedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    bench_ocr(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the spatial location queries (bbox, radius, k-nearest).
+Builds a synthetic investigation (2k trackers x 250 locations by default)
+spread over the western US, runs random queries through the endpoint
+functions, checks every answer against a brute-force scan and fails if
+the median query time exceeds the budget.
+"""
+
+from app.database import Base
+from app import models
+from app.routers.spatial import get_locations_in_box, get_locations_near, get_nearest_locations
+from app.services.spatial import distance_m, encode_geohash
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+REGION = (-124.0, 32.0, -104.0, 49.0)  # west, south, east, north
+
+
+def build_fixture(session, trackers, locations_per_tracker, seed=1):
+    """Insert one investigation of random walks; return its id and (id, lat, lng) of every location."""
+    rng = random.Random(seed)
+    investigation = models.Investigation(name="Spatial benchmark", brand="Bench")
+    session.add(investigation)
+    session.flush()
+
+    session.execute(insert(models.Tracker), [
+        {"investigation_id": investigation.id, "name": f"Tracker {i}", "platform": "apple"}
+        for i in range(trackers)
+    ])
+    tracker_ids = [t.id for t in session.query(models.Tracker.id).filter(
+        models.Tracker.investigation_id == investigation.id
+    )]
+
+    west, south, east, north = REGION
+    start = datetime(2024, 1, 1)
+    batch = []
+    for tracker_id in tracker_ids:
+        lat, lng = rng.uniform(south, north), rng.uniform(west, east)
+        for n in range(locations_per_tracker):
+            lat = min(max(lat + rng.gauss(0, 0.01), south), north)
+            lng = min(max(lng + rng.gauss(0, 0.01), west), east)
+            batch.append({
+                "tracker_id": tracker_id,
+                "address": f"{n} Bench Rd",
+                "latitude": round(lat, 6),
+                "longitude": round(lng, 6),
+                # Core inserts skip the flush hook that fills this in
+                "geohash": encode_geohash(round(lat, 6), round(lng, 6)),
+                "screenshot_timestamp": start + timedelta(hours=n),
+            })
+        if len(batch) >= 10_000:
+            session.execute(insert(models.Location), batch)
+            batch = []
+    if batch:
+        session.execute(insert(models.Location), batch)
+    session.commit()
+
+    points = session.query(models.Location.id, models.Location.latitude, models.Location.longitude).all()
+    return investigation.id, [(id_, float(lat), float(lng)) for id_, lat, lng in points]
+
+
+def timed(function, **kwargs):
+    start = time.perf_counter()
+    result = function(**kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trackers", type=int, default=2000)
+    parser.add_argument("--locations", type=int, default=250, help="locations per tracker")
+    parser.add_argument("--queries", type=int, default=20, help="random queries of each kind")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="maximum median time per query")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(temp_dir.name, 'bench_spatial.db')}"
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    total = args.trackers * args.locations
+    print(f"Building {args.trackers} trackers x {args.locations} locations ({total:,} rows)...")
+    session = Session()
+    investigation_id, points = build_fixture(session, args.trackers, args.locations)
+    session.close()
+
+    admin = models.User(id=0, role="admin")
+    rng = random.Random(2)
+    west, south, east, north = REGION
+    times = {"within": [], "near": [], "nearest": []}
+    wrong = 0
+
+    session = Session()
+    for _ in range(args.queries):
+        lat, lng = rng.uniform(south, north), rng.uniform(west, east)
+
+        box = (lng - 0.1, lat - 0.1, lng + 0.1, lat + 0.1)
+        rows, elapsed = timed(
+            get_locations_in_box, investigation_id=investigation_id, west=box[0], south=box[1], east=box[2],
+            north=box[3], final_only=False, location_type=None, limit=10_000, db=session, current_user=admin
+        )
+        times["within"].append(elapsed)
+        expected = {i for i, y, x in points if box[1] <= y <= box[3] and box[0] <= x <= box[2]}
+        wrong += {row["id"] for row in rows} != expected
+
+        rows, elapsed = timed(
+            get_locations_near, investigation_id=investigation_id, lat=lat, lng=lng, radius_m=5000,
+            final_only=False, location_type=None, limit=10_000, db=session, current_user=admin
+        )
+        times["near"].append(elapsed)
+        expected = {i for i, y, x in points if distance_m(lat, lng, y, x) <= 5000}
+        wrong += {row["id"] for row in rows} != expected
+
+        rows, elapsed = timed(
+            get_nearest_locations, investigation_id=investigation_id, lat=lat, lng=lng, k=10,
+            final_only=False, location_type=None, db=session, current_user=admin
+        )
+        times["nearest"].append(elapsed)
+        expected = sorted(distance_m(lat, lng, y, x) for i, y, x in points)[:10]
+        wrong += [round(d, 1) for d in expected] != [row["distance_m"] for row in rows]
+    session.close()
+
+    failed = wrong > 0
+    for kind, samples in times.items():
+        median = statistics.median(samples)
+        print(f"{kind:<8} median {median:8.1f} ms  max {max(samples):8.1f} ms")
+        failed = failed or median > args.budget_ms
+    if wrong:
+        print(f"{wrong} queries disagreed with the brute-force scan")
+
+    engine.dispose()
+    if temp_dir:
+        temp_dir.cleanup()
+
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
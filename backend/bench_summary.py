@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Query-count benchmark for the investigation summary.
+Builds a synthetic investigation (1k trackers x 50 locations by default),
+runs the summary endpoint against it and fails if it writes anything or
+issues more SQL statements than the budget allows.
+"""
+
+from app.database import Base, ReadOnlySession, _async_url
+from app import models
+from app.routers.reports import get_investigation_summary
+from app.services.final_destinations import mark_final_destinations
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+STATES = ['CA', 'OR', 'WA', 'NV', 'AZ', 'TX', 'IL', 'NY', 'GA', 'FL']
+LOCATION_TYPES = ['mrf', 'landfill', 'incinerator', 'waste_transfer_station', 'transit', None]
+STATEMENT_BUDGET = 5  # SQL statements per summary, whatever the investigation's size
+
+
+def build_fixture(session, trackers, locations_per_tracker, seed=1):
+    """Insert one investigation; return its id and each tracker's expected latest address."""
+    rng = random.Random(seed)
+    investigation = models.Investigation(name="Benchmark", brand="Bench")
+    session.add(investigation)
+    session.flush()
+
+    tracker_rows = [
+        {"investigation_id": investigation.id, "name": f"Tracker {i}", "platform": "apple"}
+        for i in range(trackers)
+    ]
+    session.execute(insert(models.Tracker), tracker_rows)
+    tracker_ids = [t.id for t in session.query(models.Tracker.id).filter(
+        models.Tracker.investigation_id == investigation.id
+    ).order_by(models.Tracker.id)]
+
+    start = datetime(2024, 1, 1)
+    expected = {}
+    batch = []
+    for tracker_id in tracker_ids:
+        # Shuffled timestamps so insertion order is not the answer
+        offsets = rng.sample(range(locations_per_tracker * 10), locations_per_tracker)
+        for n, offset in enumerate(offsets):
+            address = f"{n} Bench St, Tracker {tracker_id}"
+            batch.append({
+                "tracker_id": tracker_id,
+                "address": address,
+                "state": rng.choice(STATES),
+                "location_type": rng.choice(LOCATION_TYPES),
+                "screenshot_timestamp": start + timedelta(hours=offset),
+                "is_final_destination": False,
+            })
+        expected[tracker_id] = f"{offsets.index(max(offsets))} Bench St, Tracker {tracker_id}"
+        if len(batch) >= 10_000:
+            session.execute(insert(models.Location), batch)
+            batch = []
+    if batch:
+        session.execute(insert(models.Location), batch)
+    # Core inserts skip the ORM flush hooks, so flag final destinations in bulk
+    mark_final_destinations(session, investigation.id)
+    session.commit()
+    return investigation.id, expected
+
+
+def is_write(statement):
+    return statement.lstrip().split()[0].upper() in ('INSERT', 'UPDATE', 'DELETE')
+
+
+def count_statements(async_engine):
+    """A list that collects every SQL statement the engine sends."""
+    statements = []
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+async def run_summaries(database_url, investigation_id, runs=2):
+    """
+    Call the summary endpoint `runs` times on read-only async sessions, as
+    requests would. Returns (summary, elapsed seconds, statements) per run.
+    """
+    async_engine = create_async_engine(_async_url(database_url))
+    statements = count_statements(async_engine)
+    Session = async_sessionmaker(async_engine, expire_on_commit=False, sync_session_class=ReadOnlySession)
+    results = []
+    try:
+        for _ in range(runs):
+            statements.clear()
+            start = time.perf_counter()
+            async with Session() as session:
+                summary = await get_investigation_summary(investigation_id, db=session, current_user=None)
+            results.append((summary, time.perf_counter() - start, list(statements)))
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trackers", type=int, default=1000)
+    parser.add_argument("--locations", type=int, default=50, help="locations per tracker")
+    parser.add_argument("--budget", type=int, default=STATEMENT_BUDGET, help="maximum SQL statements per summary")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(temp_dir.name, 'bench_summary.db')}"
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    print(f"Building {args.trackers} trackers x {args.locations} locations...")
+    session = Session()
+    investigation_id, expected = build_fixture(session, args.trackers, args.locations)
+    session.close()
+
+    failed = False
+    results = asyncio.run(run_summaries(database_url, investigation_id))
+    for label, (summary, elapsed, statements) in zip(("first run", "second run"), results):
+        count = len(statements)
+        writes = [s for s in statements if is_write(s)]
+        print(f"{label:<12} {elapsed * 1000:>9.1f} ms  {count} statements, {len(writes)} writes")
+        if writes:
+            failed = True
+        if count > args.budget:
+            failed = True
+            print(f"  over budget ({args.budget}):")
+            for statement in statements:
+                print("   ", " ".join(statement.split())[:100])
+
+    wrong = [
+        t["id"] for t in summary["trackers"]
+        if (t["final_destination"] or {}).get("address") != expected[t["id"]]
+    ]
+    print(f"total_trackers={summary['total_trackers']} total_locations={summary['total_locations']}")
+    if wrong or summary["total_locations"] != args.trackers * args.locations:
+        failed = True
+        print(f"Wrong final destinations for {len(wrong)} trackers")
+
+    engine.dispose()
+    if temp_dir:
+        temp_dir.cleanup()
+
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
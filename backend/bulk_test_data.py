@@ -6,14 +6,14 @@ Creates multiple trackers with location histories across different states.
 
 from app.database import SessionLocal
 from app.models import Investigation, Tracker, Location
-from app.services.geocoder import Geocoder
+from app.services.geocoder import get_geocoder
 from datetime import datetime, timedelta
 import random
 
 def create_bulk_data():
     """Create realistic test data with multiple trackers and locations."""
     db = SessionLocal()
-    geocoder = Geocoder()
+    geocoder = get_geocoder()
     
     try:
         # Get or create investigation
@@ -113,7 +113,7 @@ def create_bulk_data():
                 latitude = None
                 longitude = None
                 if coordinates:
-                    latitude, longitude = coordinates
+                    latitude, longitude = coordinates[:2]
                 
                 # Determine location type based on position in journey
                 if i == 0:
@@ -173,6 +173,7 @@ def create_bulk_data():
 
 if __name__ == "__main__":
     print("Generating bulk test data...")
-    print("This will take ~30 seconds due to geocoding rate limits.\n")
+    print("With the default geocoder chain this takes ~30 seconds due to Nominatim rate limits.")
+    print("Set GEOCODER_CHAIN=local,cache,remote and GAZETTEER_PATH to geocode offline.\n")
     create_bulk_data()
     print("\nDone!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Load test for the API's hot read and upload endpoints.
+Logs in, then runs many concurrent clients (200 by default) against a
+running server for a fixed time, each looping over the investigation,
+tracker, location and summary endpoints (plus /from-ocr saves with
+--writes). Prints throughput and latency percentiles per endpoint and
+fails if overall throughput is below --min-rps or any request failed.
+
+Run it against two builds on the same database to compare them, e.g.
+    uvicorn app.main:app --port 8000 --workers 1
+    python load_test.py --email admin@example.com --password ...
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def discover(client, investigation_id):
+    """Pick an investigation and its trackers to aim at."""
+    if investigation_id is None:
+        investigations = (await client.get("/api/investigations")).json()
+        if not investigations:
+            sys.exit("No investigations to test against; seed some data first")
+        investigation_id = investigations[0]["id"]
+    trackers = (await client.get(f"/api/trackers/investigation/{investigation_id}")).json()
+    return investigation_id, [tracker["id"] for tracker in trackers]
+
+
+def request_mix(investigation_id, tracker_ids, writes):
+    """(name, method, url, json) tuples one client loops over."""
+    mix = [
+        ("investigations", "GET", "/api/investigations", None),
+        ("investigation", "GET", f"/api/investigations/{investigation_id}", None),
+        ("trackers", "GET", f"/api/trackers/investigation/{investigation_id}", None),
+        ("summary", "GET", f"/api/investigations/{investigation_id}/summary", None),
+        ("geocode-status", "GET", f"/api/locations/geocode-status?investigation_id={investigation_id}", None),
+    ]
+    for tracker_id in tracker_ids[:20]:
+        mix.append(("tracker", "GET", f"/api/trackers/{tracker_id}", None))
+        mix.append(("locations", "GET", f"/api/locations/tracker/{tracker_id}?limit=50", None))
+    if writes:
+        mix += [
+            ("from-ocr", "POST", "/api/locations/from-ocr", {
+                "investigation_id": investigation_id,
+                "tracker_name": "Load test",
+                "platform": "apple",
+                "address": "1 Load Test Way",
+                "last_seen_text": "Now",
+            })
+        ] * writes
+    return mix
+
+
+async def client_loop(args, headers, mix, deadline, latencies, errors, failures, seed):
+    # One keep-alive connection per simulated client, like separate browsers;
+    # a single shared pool of hundreds of connections costs the load
+    # generator more CPU per request than the server spends on it
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits,
+                                 timeout=args.timeout) as client:
+        while time.perf_counter() < deadline:
+            name, method, url, body = rng.choice(mix)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                failure = response.status_code if response.status_code >= 400 else None
+            except httpx.HTTPError as e:
+                failure = e.__class__.__name__
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            if failure is not None:
+                errors[name] += 1
+                failures[failure] += 1
+
+
+async def run(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        login = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        if login.status_code != 200:
+            sys.exit(f"Login failed: {login.status_code} {login.text}")
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        client.headers.update(headers)
+        investigation_id, tracker_ids = await discover(client, args.investigation_id)
+
+    mix = request_mix(investigation_id, tracker_ids, args.writes)
+    print(f"{args.concurrency} clients for {args.duration:.0f}s against investigation {investigation_id} "
+          f"({len(tracker_ids)} trackers)...")
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    failures = Counter()  # status code or exception name
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*[
+        client_loop(args, headers, mix, deadline, latencies, errors, failures, seed)
+        for seed in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(samples) for samples in latencies.values())
+    failed = sum(errors.values())
+    print(f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in sorted(latencies):
+        samples = latencies[name]
+        print(f"{name:<16}{len(samples):>10}{errors[name]:>8}{statistics.median(samples):>10.1f}"
+              f"{percentile(samples, 0.95):>10.1f}{percentile(samples, 0.99):>10.1f}")
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    rps = total / elapsed
+    print(f"total {total} requests, {failed} errors, {rps:.0f} req/s, "
+          f"p50 {statistics.median(all_samples):.1f} ms, p99 {percentile(all_samples, 0.99):.1f} ms")
+    if failures:
+        print("failures: " + ", ".join(f"{failure} x{count}" for failure, count in failures.most_common()))
+    return rps, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--investigation-id", type=int, help="defaults to the first one listed")
+    parser.add_argument("--concurrency", type=int, default=200, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--writes", type=int, default=0, help="weight of /from-ocr saves in the request mix")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--min-rps", type=float, default=0.0, help="fail below this throughput")
+    args = parser.parse_args()
+
+    rps, failed = asyncio.run(run(args))
+    ok = failed == 0 and rps >= args.min_rps
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# The app binds its engines at import; point them at a throwaway SQLite
+# file (never a real database), which stays unmigrated unless a test migrates it
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="cuptracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DB_DIR, 'app.db')}"
+os.environ["READ_DATABASE_URL"] = ""
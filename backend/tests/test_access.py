@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.services import access
+from app.services.access import AccessCache, access_for
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(access, "_cache", AccessCache(ttl_seconds=3600))
+    engine = create_engine(f"sqlite:///{tmp_path / 'access.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([models.User(id=user_id, email=f"u{user_id}@example.com", password_hash="x")
+                     for user_id in (1, 2)])
+    session.add_all([models.Investigation(id=investigation_id, name=f"I{investigation_id}", brand="Test")
+                     for investigation_id in (10, 20)])
+    session.add(models.Tracker(id=100, investigation_id=10, name="T100", platform="apple"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_cached_scopes_are_dropped_when_a_commit_changes_them(db):
+    assert access_for(db, 1, "contributor").investigation_ids == frozenset()
+    other = access_for(db, 2, "contributor")
+    db.rollback()
+
+    # Nothing changes until the commit; a rollback leaves the cache alone
+    db.add(models.InvestigationUser(investigation_id=10, user_id=1))
+    db.flush()
+    assert access_for(db, 1, "contributor").investigation_ids == frozenset()
+    db.rollback()
+    assert access_for(db, 1, "contributor").investigation_ids == frozenset()
+
+    db.add(models.InvestigationUser(investigation_id=10, user_id=1))
+    db.commit()
+    scope = access_for(db, 1, "contributor")
+    assert scope.can_view_investigation(10) and not scope.can_view_investigation(20)
+    assert not scope.can_view_tracker(100)
+    # Other users' entries are kept
+    assert access.get_access_cache().get(2) is other
+
+    db.add(models.Location(tracker_id=100, address="1 Main St", uploaded_by=1))
+    db.commit()
+    assert access_for(db, 1, "contributor").can_view_tracker(100)
+
+    db.delete(db.query(models.InvestigationUser).filter_by(user_id=1).one())
+    db.commit()
+    assert not access_for(db, 1, "contributor").can_view_investigation(10)
+
+    assert access_for(db, 2, "admin").can_view_investigation(20)
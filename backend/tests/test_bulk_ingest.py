@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app import models
+from app.auth import Principal
+from app.config import get_settings
+from app.database import Base
+from app.routers.locations import bulk_save_locations_from_ocr
+
+USER = Principal(id=1, email="contributor@example.com", role="contributor")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # Several batches per request, so writing batches as rows arrive would show
+    monkeypatch.setattr(get_settings(), "bulk_ingest_batch_size", 2)
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([models.User(id=1, email=USER.email, password_hash="x", role="contributor"),
+                     models.Investigation(id=1, name="Bulk", brand="Test")])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def ndjson_request(rows, db, transactions_seen):
+    """An NDJSON request streamed one row per chunk, noting whether db had a transaction open."""
+    chunks = [json.dumps(row).encode() + b"\n" for row in rows]
+
+    async def receive():
+        transactions_seen.append(db.in_transaction())
+        body = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": body, "more_body": bool(chunks)}
+
+    scope = {"type": "http", "method": "POST", "path": "/api/locations/bulk",
+             "headers": [(b"content-type", b"application/x-ndjson")]}
+    return Request(scope, receive)
+
+
+def row(n, **extra):
+    return {"investigation_id": 1, "tracker_name": f"T{n % 3}", "platform": "apple",
+            "address": f"{n} Main St", "latitude": 41.0, "longitude": -87.0, **extra}
+
+
+def test_body_is_read_before_the_transaction_opens(db):
+    seen = []
+    db.close()  # As handed over by get_db: no transaction yet
+    response = asyncio.run(bulk_save_locations_from_ocr(
+        ndjson_request([row(n) for n in range(5)], db, seen), db=db, current_user=USER
+    ))
+    assert response["inserted"] == 5 and response["trackers_created"] == 3
+    assert seen and not any(seen)
+    assert db.query(func.count(models.Location.id)).scalar() == 5
+
+
+def test_invalid_row_writes_nothing(db):
+    seen = []
+    db.close()
+    rows = [row(n) for n in range(4)] + [row(4, location_type="moon")]
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(bulk_save_locations_from_ocr(ndjson_request(rows, db, seen), db=db, current_user=USER))
+    assert raised.value.status_code == 422
+    assert not any(seen)
+    assert db.query(func.count(models.Location.id)).scalar() == 0
+    assert db.query(func.count(models.Tracker.id)).scalar() == 0
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, event, insert, select
+
+from app import models
+from app.database import Base
+from app.services import classification
+from app.services.classification import apply_classifications
+
+# The UPDATE ... FROM (VALUES ...) path only runs on Postgres; point
+# TEST_POSTGRES_URL at a scratch database to cover it. Everything happens
+# in one transaction that is rolled back.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def connection(request, tmp_path):
+    if request.param == "sqlite":
+        engine = create_engine(f"sqlite:///{tmp_path / 'classify.db'}")
+    elif POSTGRES_URL:
+        engine = create_engine(POSTGRES_URL)
+    else:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        Base.metadata.create_all(bind=connection)
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+def add_locations(connection, trackers, per_tracker):
+    investigation_id = connection.execute(
+        insert(models.Investigation).values(name="Classify", brand="Test")
+    ).inserted_primary_key[0]
+    location_ids = {}
+    for n in range(trackers):
+        tracker_id = connection.execute(insert(models.Tracker).values(
+            investigation_id=investigation_id, name=f"Tracker {n}", platform="apple"
+        )).inserted_primary_key[0]
+        location_ids[tracker_id] = [
+            connection.execute(insert(models.Location).values(
+                tracker_id=tracker_id, address=f"{i} Classify St"
+            )).inserted_primary_key[0]
+            for i in range(per_tracker)
+        ]
+    return location_ids
+
+
+def test_apply_classifications(connection, monkeypatch):
+    # Small batches so the VALUES path has to split the work
+    monkeypatch.setattr(classification, "VALUES_BATCH_SIZE", 2)
+    location_ids = add_locations(connection, trackers=3, per_tracker=3)
+    untouched_tracker, *classified_trackers = location_ids
+    wanted = {}
+    for tracker_id in classified_trackers:
+        for location_id, location_type in zip(location_ids[tracker_id], ("store", "landfill", "recycling")):
+            wanted[location_id] = location_type
+
+    updates = []
+
+    @event.listens_for(connection, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE LOCATIONS"):
+            updates.append(statement)
+
+    # An id that does not exist is ignored, not counted
+    assert apply_classifications(connection, {**wanted, -1: "store"}, confidence="bulk") == len(wanted)
+    if connection.dialect.name == "postgresql":
+        assert len(updates) == 4  # seven rows, two per VALUES list
+        assert all("VALUES" in statement for statement in updates)
+    else:
+        assert len(updates) == 1
+
+    rows = connection.execute(
+        select(models.Location.id, models.Location.location_type, models.Location.location_type_confidence)
+        .where(models.Location.tracker_id.in_(location_ids))
+    ).all()
+    assert len(rows) == 9
+    for location_id, location_type, confidence in rows:
+        if location_id in wanted:
+            assert (location_type, confidence) == (wanted[location_id], "bulk")
+        else:
+            assert confidence != "bulk"
+
+    versions = dict(connection.execute(
+        select(models.Tracker.id, models.Tracker.location_version).where(models.Tracker.id.in_(location_ids))
+    ).all())
+    assert versions == {untouched_tracker: 0, **{tracker_id: 1 for tracker_id in classified_trackers}}
+
+    assert apply_classifications(connection, {}) == 0
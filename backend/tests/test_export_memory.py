@@ -0,0 +1,44 @@
+import tracemalloc
+
+import pyarrow as pa
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.services.export import iter_arrow, iter_csv, iter_parquet
+from bench_summary import build_fixture
+
+BATCH_SIZE = 500
+# Allowance for per-batch bookkeeping (e.g. Parquet row-group metadata)
+SLACK_BYTES = 512 * 1024
+
+
+def _peak_bytes(iter_format, trackers):
+    """Peak Python plus Arrow allocations while streaming one fixture's export."""
+    engine = create_engine("sqlite://")  # In memory; one connection, shared
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    session = Session()
+    investigation_id, _ = build_fixture(session, trackers, 20, seed=1)
+    session.close()
+
+    tracemalloc.start()
+    try:
+        arrow_peak = pa.total_allocated_bytes()
+        for chunk in iter_format(investigation_id, BATCH_SIZE, session_factory=Session):
+            arrow_peak = max(arrow_peak, pa.total_allocated_bytes())
+        _, python_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        engine.dispose()
+    return python_peak + arrow_peak
+
+
+@pytest.mark.parametrize("iter_format", [iter_csv, iter_arrow, iter_parquet], ids=["csv", "arrow", "parquet"])
+def test_export_memory_does_not_grow_with_row_count(iter_format):
+    # bench_export.py checks RSS on a million rows; here 4x the rows must
+    # stream in about the same memory
+    small = _peak_bytes(iter_format, 100)
+    large = _peak_bytes(iter_format, 400)
+    assert large <= small * 1.25 + SLACK_BYTES, (small, large)
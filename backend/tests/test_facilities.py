@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.config import get_settings
+from app.database import Base
+from app.services import facilities
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(facilities, "_index", None)
+    monkeypatch.setattr(facilities, "_index_version", None)
+    monkeypatch.setattr(facilities, "_index_checked_at", -float("inf"))
+    engine = create_engine(f"sqlite:///{tmp_path / 'facilities.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(models.Investigation(id=1, name="Facilities", brand="Test"))
+    session.add(models.Tracker(id=1, investigation_id=1, name="T1", platform="apple"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _facility(name, lat, lng, facility_type="landfill"):
+    return models.FacilityClassification(facility_name=name, facility_type=facility_type,
+                                         latitude=lat, longitude=lng, radius_m=500)
+
+
+def _matched_type(db, lat, lng):
+    facility = facilities.get_facility_index(db.connection()).match(lat, lng)
+    return facility.facility_type if facility else None
+
+
+def test_replacing_the_newest_facility_rebuilds_the_index(db):
+    db.add_all([_facility("A", 40.0, -75.0), _facility("B", 41.0, -76.0)])
+    db.commit()
+    assert _matched_type(db, 41.0, -76.0) == "landfill"
+
+    # Delete the highest id and insert another: same count, same max id on SQLite
+    db.delete(db.query(models.FacilityClassification).filter_by(facility_name="B").one())
+    db.commit()
+    db.add(_facility("C", 41.0, -76.0, "incinerator"))
+    db.commit()
+    assert _matched_type(db, 41.0, -76.0) == "incinerator"
+    assert facilities.registry_version(db.connection()) == 3
+
+
+def test_location_flushes_reuse_the_checked_index(db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "facility_index_check_seconds", 60.0)
+    db.add(_facility("A", 40.0, -75.0))
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    for n in range(3):
+        db.add(models.Location(tracker_id=1, address=f"{n} Main St", latitude=40.0, longitude=-75.0))
+        db.flush()
+    db.commit()
+
+    assert sum("facility_registry_version" in statement for statement in statements) == 1
+    assert {location.location_type for location in db.query(models.Location)} == {"landfill"}
+
+
+def test_concurrent_async_flushes_share_the_index(db, tmp_path, monkeypatch):
+    # Re-checking on every flush makes each coroutine query the registry
+    # from inside the flush hook while the others do the same
+    monkeypatch.setattr(get_settings(), "facility_index_check_seconds", 0.0)
+    db.add(_facility("A", 40.0, -75.0))
+    db.commit()
+
+    async def create_locations():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'facilities.db'}")
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def create(n):
+            async with Session() as session:
+                session.add(models.Location(tracker_id=1, address=f"{n} Main St", latitude=40.0, longitude=-75.0))
+                await session.commit()
+
+        try:
+            await asyncio.gather(*(create(n) for n in range(5)))
+        finally:
+            await engine.dispose()
+
+    # A deadlocked event loop never returns, so run it where it can be abandoned
+    runner = threading.Thread(target=asyncio.run, args=(create_locations(),), daemon=True)
+    runner.start()
+    runner.join(20)
+    assert not runner.is_alive(), "flushes deadlocked on the facility index"
+    assert [location.location_type for location in db.query(models.Location)] == ["landfill"] * 5
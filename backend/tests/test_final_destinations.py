@@ -0,0 +1,106 @@
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.database import Base
+from app.services.final_destinations import tracker_final_locations
+
+# Set to a scratch Postgres database to also run the NULL ordering test
+# there (SQLite already sorts NULLs last in a descending order)
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'final.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(models.Investigation(id=1, name="Final", brand="Test"))
+    session.add_all([models.Tracker(id=tracker_id, investigation_id=1, name=f"T{tracker_id}", platform="apple")
+                     for tracker_id in (1, 2)])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _location(tracker_id, hour):
+    return models.Location(tracker_id=tracker_id, address=f"{tracker_id}-{hour}",
+                           screenshot_timestamp=datetime(2024, 1, 1, hour))
+
+
+def test_flush_moves_the_flag_to_the_newest_location(db):
+    first = _location(1, 1)
+    other = _location(2, 1)
+    db.add_all([first, other])
+    db.flush()
+    assert first.is_final_destination and other.is_final_destination
+
+    newer = _location(1, 2)
+    db.add(newer)
+    db.flush()
+
+    # Only the rows whose flag changed are reloaded; the other tracker's stays loaded
+    assert "is_final_destination" not in inspect(first).dict
+    assert "is_final_destination" in inspect(other).dict
+    assert (first.is_final_destination, newer.is_final_destination) == (False, True)
+
+    db.delete(newer)
+    db.flush()
+    assert first.is_final_destination
+
+
+def test_older_location_expires_nothing(db):
+    loaded = [_location(1, 1), _location(1, 2)]
+    db.add_all(loaded)
+    db.flush()
+    assert [location.is_final_destination for location in loaded] == [False, True]
+
+    db.add(_location(1, 0))  # Older than the latest, so no flag changes
+    db.flush()
+    assert all("is_final_destination" in inspect(location).dict for location in loaded)
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def rolled_back_db(request, tmp_path):
+    if request.param == "sqlite":
+        engine = create_engine(f"sqlite:///{tmp_path / 'nulls.db'}")
+    elif POSTGRES_URL:
+        engine = create_engine(POSTGRES_URL)
+    else:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        Base.metadata.create_all(bind=connection)
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
+    engine.dispose()
+
+
+def test_undated_locations_are_never_the_latest(rolled_back_db):
+    db = rolled_back_db
+    investigation = models.Investigation(name="Nulls", brand="Test")
+    dated, undated = (models.Tracker(investigation=investigation, name=name, platform="apple")
+                      for name in ("Dated", "Undated"))
+    db.add_all([dated, undated])
+    db.flush()
+
+    latest = models.Location(tracker_id=dated.id, address="dated", screenshot_timestamp=datetime(2024, 1, 1))
+    unknown = models.Location(tracker_id=dated.id, address="undated")
+    only = models.Location(tracker_id=undated.id, address="only undated")
+    db.add_all([latest, unknown, only])
+    db.flush()
+
+    assert (latest.is_final_destination, unknown.is_final_destination) == (True, False)
+    # A tracker with no dated locations still gets a final destination
+    assert only.is_final_destination
+    assert [row.address for _, row in tracker_final_locations(db, investigation.id)] == ["dated", "only undated"]
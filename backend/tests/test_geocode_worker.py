@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.services import geocode_worker
+from app.services.geocode_worker import GeocodeEnrichmentWorker
+
+
+class StubGeocoder:
+    """Resolves every address except the ones listed as failing."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.lookups = []
+
+    def geocode(self, address, raise_errors=False):
+        self.lookups.append(address)
+        if address in self.failing:
+            raise RuntimeError("400 Bad Request")
+        return (Decimal("41.0"), Decimal("-87.0"), "Chicago", "IL", "60601")
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'geocode.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    monkeypatch.setattr(geocode_worker, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def add_pending(factory, addresses):
+    db = factory()
+    investigation = models.Investigation(name="Geocode", brand="Test")
+    tracker = models.Tracker(investigation=investigation, name="T1", platform="apple")
+    db.add_all([investigation, tracker])
+    db.add_all(models.Location(tracker=tracker, address=address, geocode_status='pending') for address in addresses)
+    db.commit()
+    db.close()
+
+
+def statuses(factory):
+    db = factory()
+    rows = {
+        location.address: (location.geocode_status, location.geocode_attempts, location.geocode_retry_at)
+        for location in db.query(models.Location)
+    }
+    db.close()
+    return rows
+
+
+def test_failing_address_does_not_stall_the_queue(session_factory):
+    add_pending(session_factory, ["1 Bad Rd", "2 Good St", "3 Good St"])
+    worker = GeocodeEnrichmentWorker(StubGeocoder(failing={"1 Bad Rd"}), max_attempts=3, retry_seconds=60)
+
+    assert worker.run_once() == 3
+    rows = statuses(session_factory)
+    assert rows["2 Good St"][0] == rows["3 Good St"][0] == 'complete'
+    status, attempts, retry_at = rows["1 Bad Rd"]
+    assert (status, attempts) == ('pending', 1)
+    assert retry_at > datetime.utcnow() + timedelta(seconds=50)
+
+    # In backoff: not picked up again yet
+    assert worker.run_once() == 0
+
+
+def test_address_is_marked_error_after_max_attempts(session_factory):
+    add_pending(session_factory, ["1 Bad Rd"])
+    geocoder = StubGeocoder(failing={"1 Bad Rd"})
+    worker = GeocodeEnrichmentWorker(geocoder, max_attempts=3, retry_seconds=0)
+
+    for _ in range(5):
+        worker.run_once()
+    assert statuses(session_factory)["1 Bad Rd"][:2] == ('error', 3)
+    assert len(geocoder.lookups) == 3
+
+
+def test_claimed_rows_are_not_handed_to_another_worker(session_factory):
+    add_pending(session_factory, [f"{n} Main St" for n in range(4)])
+    first = GeocodeEnrichmentWorker(StubGeocoder(), batch_size=2)
+    second = GeocodeEnrichmentWorker(StubGeocoder(), batch_size=10)
+
+    claimed = first._claim()
+    assert len(claimed) == 2
+    assert not set(second._claim()) & set(claimed)
+
+    # A claim nobody finishes is taken over once it is stale
+    second.claim_timeout = 0
+    assert set(claimed) <= set(second._claim())
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.services import geocoder as geocoder_module
+from app.services.geocoder import GeocodeCache, Geocoder, parse_chain
+
+
+MARKET_ST = (Decimal('37.7936'), Decimal('-122.3950'), 'San Francisco', 'CA', '94105')
+
+
+class StubProvider:
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def geocode(self, address):
+        self.calls.append(address)
+        answer = self.answers.get(address)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Lets a test move the geocoder module's notion of now."""
+    class Clock(datetime):
+        current = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.current
+
+    monkeypatch.setattr(geocoder_module, "datetime", Clock)
+    return Clock
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'geocode.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_cached_answers_expire_after_their_ttl(clock, session_factory):
+    provider = StubProvider({'1 Market Street, San Francisco': MARKET_ST, 'Nowhere 1': None})
+    cache = GeocodeCache(ttl=timedelta(days=90), negative_ttl=timedelta(hours=24),
+                         session_factory=session_factory)
+    geocoder = Geocoder(provider=provider, cache=cache)
+
+    assert geocoder.geocode('1 Market Street, San Francisco') == MARKET_ST
+    assert geocoder.geocode('Nowhere 1') is None
+    # Same key after normalization, and the miss is cached too
+    assert geocoder.geocode('1 market st san francisco') == MARKET_ST
+    assert geocoder.geocode('Nowhere 1') is None
+    assert len(provider.calls) == 2
+
+    # A new process starts with an empty LRU but shares the table
+    clock.current += timedelta(hours=23)
+    fresh = Geocoder(provider=provider, cache=GeocodeCache(session_factory=session_factory))
+    assert fresh.geocode('1 Market Street, San Francisco') == MARKET_ST
+    assert fresh.geocode('Nowhere 1') is None
+    assert len(provider.calls) == 2
+
+    # Misses are retried once the negative TTL is up; found answers are not
+    clock.current += timedelta(hours=2)
+    assert geocoder.geocode('Nowhere 1') is None
+    assert geocoder.geocode('1 Market Street, San Francisco') == MARKET_ST
+    assert fresh.geocode('Nowhere 1') is None
+    assert provider.calls == ['1 Market Street, San Francisco', 'Nowhere 1', 'Nowhere 1']
+
+    clock.current += timedelta(days=90)
+    assert fresh.geocode('1 Market Street, San Francisco') == MARKET_ST
+    assert provider.calls[-1] == '1 Market Street, San Francisco'
+
+
+def test_provider_errors_are_not_cached(clock):
+    provider = StubProvider({'1 Market Street': ConnectionError('down')})
+    geocoder = Geocoder(provider=provider, cache=GeocodeCache(session_factory=None))
+
+    assert geocoder.geocode('1 Market Street') is None
+    provider.answers['1 Market Street'] = MARKET_ST
+    assert geocoder.geocode('1 Market Street') == MARKET_ST
+    assert len(provider.calls) == 2
+
+
+def test_chain_lists_stages_in_the_order_they_run():
+    assert parse_chain("cache,remote") == ["cache", "remote"]
+    assert parse_chain(" local, cache ,remote") == ["local", "cache", "remote"]
+    for setting in ("remote,cache", "cache,local", "cache,cache", "cache,nominatim"):
+        with pytest.raises(ValueError):
+            parse_chain(setting)
@@ -0,0 +1,73 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+from app.services.geocoder import Geocoder
+from app.services.local_geocoder import LocalGeocoder, build_index
+
+GAZETTEER = """address,lat,lon,city,state,zip
+"1 Market Street, San Francisco, CA 94105",37.7936,-122.3950,San Francisco,CA,94105
+"101 Spear Street, San Francisco, CA 94105",37.7916,-122.3930,San Francisco,CA,94105-1234
+"500 Broadway, Oakland, CA 94607",37.8000,-122.2750,Oakland,CA,94607
+"Bad Row, Oakland, CA 94607",not-a-number,-122.0,Oakland,CA,94607
+"""
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = tmp_path / "gazetteer.csv"
+    path.write_text(GAZETTEER, encoding="utf-8")
+    return path
+
+
+def test_exact_and_zip_lookups(gazetteer):
+    local = LocalGeocoder(gazetteer)
+    assert local.address_count == 3
+    assert local.zip_count == 2
+
+    # Spelling variants normalize to the same key
+    assert local.geocode("1 market st san francisco ca 94105 USA") == (
+        Decimal('37.7936000'), Decimal('-122.3950000'), 'San Francisco', 'CA', '94105'
+    )
+    assert local.geocode("2 Market Street, San Francisco, CA 94105") is None
+
+    # ZIP centroid is the mean of the ZIP's points; ZIP+4 counts toward its ZIP
+    assert local.geocode_postal_code("2 Market Street, San Francisco, CA 94105-0001") == (
+        Decimal('37.7926000'), Decimal('-122.3940000'), 'San Francisco', 'CA', '94105'
+    )
+    # The unparseable row is skipped rather than pulling the centroid
+    assert local.geocode_postal_code("Somewhere, CA 94607")[:2] == (Decimal('37.8000000'), Decimal('-122.2750000'))
+    assert local.geocode_postal_code("Somewhere, CA 10001") is None
+    assert local.geocode_postal_code("No ZIP here") is None
+
+
+def test_geocoder_falls_back_to_the_zip_centroid(gazetteer):
+    geocoder = Geocoder(provider=None, cache=None, local=LocalGeocoder(gazetteer))
+    assert geocoder.geocode("500 Broadway, Oakland, CA 94607")[2] == 'Oakland'
+    assert geocoder.geocode("9 Unknown Way, San Francisco, CA 94105")[:2] == (
+        Decimal('37.7926000'), Decimal('-122.3940000')
+    )
+
+    strict = Geocoder(provider=None, cache=None, local=LocalGeocoder(gazetteer), zip_fallback=False)
+    assert strict.geocode("9 Unknown Way, San Francisco, CA 94105") is None
+
+
+def test_index_is_rebuilt_when_the_gazetteer_changes(gazetteer):
+    assert LocalGeocoder(gazetteer).geocode("12 Pine Street, Oakland, CA 94607") is None
+
+    with open(gazetteer, "a", encoding="utf-8") as f:
+        f.write('"12 Pine Street, Oakland, CA 94607",37.8100,-122.2800,Oakland,CA,94607\n')
+    index_mtime = os.stat(f"{gazetteer}.idx").st_mtime
+    os.utime(gazetteer, (index_mtime + 10, index_mtime + 10))
+
+    assert LocalGeocoder(gazetteer).geocode("12 Pine St, Oakland, CA 94607")[:2] == (
+        Decimal('37.8100000'), Decimal('-122.2800000')
+    )
+
+
+def test_gazetteer_without_coordinates_is_rejected(tmp_path):
+    path = tmp_path / "gazetteer.csv"
+    path.write_text("address,city\n1 Main St,Springfield\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="latitude, longitude"):
+        build_index(path, tmp_path / "gazetteer.idx")
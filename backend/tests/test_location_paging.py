@@ -0,0 +1,74 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth import Principal
+from app.database import Base
+from app.routers.locations import get_locations_by_tracker
+
+ADMIN = Principal(id=1, email="admin@example.com", role="admin")
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A tracker whose locations share timestamps and include undated ones."""
+    path = tmp_path / "paging.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with Session(engine) as db:
+        investigation = models.Investigation(name="Paging", brand="Test")
+        tracker = models.Tracker(investigation=investigation, name="T1", platform="apple")
+        db.add_all([investigation, tracker])
+        for n in range(23):
+            timestamp = None if n % 5 == 0 else start + timedelta(hours=n // 3)
+            db.add(models.Location(tracker=tracker, address=f"{n} Main St", screenshot_timestamp=timestamp))
+        db.commit()
+        tracker_id = tracker.id
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{path}", tracker_id
+
+
+def fetch(database_url, tracker_id, **params):
+    """Every page of the listing with the given parameters, and the pages' sizes."""
+    async def run():
+        engine = create_async_engine(database_url)
+        pages = []
+        try:
+            async with async_sessionmaker(engine)() as db:
+                while True:
+                    response = Response()
+                    rows = await get_locations_by_tracker(
+                        tracker_id, response, db=db, current_user=ADMIN,
+                        **{"limit": None, "cursor": None, "fields": None, "include_screenshots": None, **params}
+                    )
+                    if isinstance(rows, Response):  # fields= answers with a JSONResponse
+                        response, rows = rows, json.loads(rows.body)
+                    pages.append([row["id"] if isinstance(row, dict) else row.id for row in rows])
+                    params["cursor"] = response.headers.get("x-next-cursor")
+                    if params["cursor"] is None:
+                        return pages
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+def test_pages_follow_the_unpaged_order(database):
+    database_url, tracker_id = database
+    [everything] = fetch(database_url, tracker_id)
+    assert len(everything) == 23
+
+    for limit in (1, 4, 5, 22, 23, 100):
+        pages = fetch(database_url, tracker_id, limit=limit)
+        assert [location_id for page in pages for location_id in page] == everything
+        assert all(len(page) == limit for page in pages[:-1])
+
+    pages = fetch(database_url, tracker_id, limit=3, fields="latitude")
+    assert [location_id for page in pages for location_id in page] == everything
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.services import ocr_cache as ocr_cache_module
+from app.services.ocr_cache import OCRResultCache
+
+RESULT = {'platform': 'apple', 'tracker_name': 'T1', 'address': '1 Main St', 'last_seen': None,
+          'confidence': 0.9, 'raw_text': 'T1 1 Main St'}
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(ocr_cache_module, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def hit_count(factory, sha256):
+    db = factory()
+    try:
+        return db.get(models.OCRCacheEntry, sha256).hit_count
+    finally:
+        db.close()
+
+
+def test_hits_are_written_in_batches(session_factory):
+    cache = OCRResultCache(flush_every=3, flush_interval=3600)
+    cache.put("a" * 64, RESULT)
+    assert cache.get("b" * 64) is None
+
+    assert cache.get("a" * 64)['address'] == '1 Main St'
+    cache.get("a" * 64)
+    assert hit_count(session_factory, "a" * 64) == 0
+
+    cache.get("a" * 64)  # Third hit fills the batch
+    assert hit_count(session_factory, "a" * 64) == 3
+
+    cache.get("a" * 64)
+    cache.flush()
+    assert hit_count(session_factory, "a" * 64) == 4
+    assert cache.stats()['hits'] == 4
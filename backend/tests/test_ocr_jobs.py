@@ -0,0 +1,235 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from starlette.requests import Request
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.auth import Principal
+from app.config import get_settings
+from app.database import Base
+from app.routers import upload
+from app.services import ocr_jobs, ocr_pool
+from app.services.ocr_pool import OCRWorkerPool
+from app.services.screenshot_store import ScreenshotStore
+
+USER = Principal(id=1, email="user@example.com", role="contributor")
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(ocr_jobs, "SessionLocal", factory)
+    monkeypatch.setattr(upload, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def add_job(factory, files=2):
+    db = factory()
+    db.add(models.User(id=USER.id, email=USER.email, password_hash="x", role=USER.role))
+    db.commit()
+    job_id = upload._create_job(db, USER.id, [
+        {"disk_path": f"/tmp/{n}.png", "filename": f"{n}.png", "file_size": 1} for n in range(files)
+    ])
+    db.close()
+    return job_id
+
+
+def test_only_stale_claims_are_taken_over(session_factory):
+    job_id = add_job(session_factory)
+    first = ocr_jobs._claim_items(2, claim_timeout=300)
+    assert len(first) == 2
+
+    # Another worker starting up (or polling) leaves fresh claims alone
+    assert ocr_jobs._claim_items(2, claim_timeout=300) == []
+
+    db = session_factory()
+    db.query(models.OCRJobItem).filter(models.OCRJobItem.id == first[0][0]).update(
+        {"claimed_at": datetime.utcnow() - timedelta(seconds=600)}
+    )
+    db.commit()
+    db.close()
+    [(item_id, _, claim)] = ocr_jobs._claim_items(2, claim_timeout=300)
+    assert item_id == first[0][0] and claim == first[0][2] + 1
+
+    # The superseded claim's late result is dropped; the new one counts once
+    ocr_jobs._finish_item(item_id, first[0][2], {"address": "stale"}, None)
+    ocr_jobs._finish_item(item_id, claim, {"address": "fresh"}, None)
+    ocr_jobs._finish_item(first[1][0], first[1][2], None, "failed")
+
+    db = session_factory()
+    job = db.get(models.OCRJob, job_id)
+    # One of the two files failed
+    assert (job.status, job.completed_files) == ("partial", 2)
+    assert '"fresh"' in db.get(models.OCRJobItem, item_id).ocr_result
+    db.close()
+
+
+def test_events_end_with_an_error_when_the_job_is_deleted(session_factory, monkeypatch):
+    job_id = add_job(session_factory, files=1)
+    monkeypatch.setattr(upload, "get_ocr_job_runner", lambda: None)
+
+    async def stream():
+        db = session_factory()
+        response = await upload.stream_ocr_job(job_id, db=db, current_user=USER)
+        deleting = session_factory()
+        deleting.delete(deleting.get(models.OCRJob, job_id))
+        deleting.commit()
+        deleting.close()
+        events = [chunk async for chunk in response.body_iterator]
+        db.close()
+        return events
+
+    events = asyncio.run(stream())
+    assert events == [f'event: error\ndata: {{"job_id": "{job_id}", "detail": "Job not found"}}\n\n']
+
+
+def multipart_request(files):
+    boundary = "jobboundary"
+    body = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="{name}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'.encode() + data + b"\r\n"
+        for name, content_type, data in files
+    ) + f"--{boundary}--\r\n".encode()
+    chunks = [body[i:i + 64] for i in range(0, len(body), 64)]
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {"type": "http", "method": "POST", "path": "/api/upload/jobs",
+             "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())]}
+    return Request(scope, receive)
+
+
+def test_job_uploads_are_capped_and_released_on_rejection(session_factory, tmp_path, monkeypatch):
+    store = ScreenshotStore(tmp_path / "uploads")
+    monkeypatch.setattr(upload, "screenshot_store", store)
+    monkeypatch.setattr(upload, "get_ocr_job_runner", lambda: None)
+    monkeypatch.setattr(get_settings(), "upload_max_batch_files", 2)
+    add_job(session_factory, files=0)  # For the user row
+
+    def create(files):
+        db = session_factory()
+        try:
+            return asyncio.run(upload.create_ocr_job(multipart_request(files), db=db, current_user=USER))
+        finally:
+            db.close()
+
+    def stored():
+        return [p for p in store.root.rglob("*.png")]
+
+    too_many = [(f"{n}.png", "image/png", f"image {n}".encode()) for n in range(3)]
+    with pytest.raises(HTTPException) as raised:
+        create(too_many)
+    assert raised.value.status_code == 400 and stored() == []
+
+    not_an_image = [("a.png", "image/png", b"image a"), ("notes.txt", "text/plain", b"hello")]
+    with pytest.raises(HTTPException) as raised:
+        create(not_an_image)
+    assert raised.value.status_code == 400 and stored() == []
+
+    queued = create(too_many[:2])
+    assert queued["total_files"] == 2 and len(stored()) == 2
+
+
+def test_events_send_each_result_once_including_late_commits(session_factory, monkeypatch):
+    job_id = add_job(session_factory, files=3)
+    claimed = ocr_jobs._claim_items(3, claim_timeout=300)
+    ocr_jobs._finish_item(claimed[0][0], claimed[0][2], {"address": "first"}, None)
+
+    def finish_late(item_id, claim, stamped):
+        # Stamped before an item that was already streamed, committed after it
+        ocr_jobs._finish_item(item_id, claim, {"address": f"item {item_id}"}, None)
+        db = session_factory()
+        db.query(models.OCRJobItem).filter(models.OCRJobItem.id == item_id).update({"finished_at": stamped})
+        db.commit()
+        db.close()
+
+    unfinished = claimed[1:]
+
+    class Runner:
+        async def wait_for_progress(self, timeout):
+            if unfinished:
+                item_id, _, claim = unfinished.pop(0)
+                finish_late(item_id, claim, datetime.utcnow() - timedelta(seconds=1))
+
+    monkeypatch.setattr(upload, "get_ocr_job_runner", lambda: Runner())
+    monkeypatch.setattr(upload.screenshot_store, "url_for", str)
+    polls = []
+    load = upload._load_finished_items
+    monkeypatch.setattr(upload, "_load_finished_items", lambda job, since: polls.append(since) or load(job, since))
+
+    async def stream():
+        db = session_factory()
+        response = await upload.stream_ocr_job(job_id, db=db, current_user=USER)
+        events = [chunk async for chunk in response.body_iterator]
+        db.close()
+        return events
+
+    events = asyncio.run(stream())
+    results = [event for event in events if event.startswith("event: result")]
+    assert len(results) == 3 and len(set(results)) == 3
+    assert events[-1].startswith("event: done")
+    # The cursor moves forward instead of listing every id sent so far
+    assert polls[0] is None and all(since is not None for since in polls[1:])
+
+
+def test_runner_waits_for_pool_capacity_and_reports_failures(session_factory, monkeypatch):
+    job_id = add_job(session_factory, files=2)
+    pool = OCRWorkerPool(workers=1, max_queue=0, job_timeout=5)
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def run_ocr(image_path, tesseract_timeout):
+        calls.append(image_path)
+        if image_path == "busy.png":
+            release.wait(5)
+            return {"address": "interactive"}
+        raise RuntimeError("unreadable")
+
+    monkeypatch.setattr(ocr_pool, "_run_ocr", run_ocr)
+    attempts = []
+
+    async def process_without_cache(pool, path):
+        attempts.append(path)
+        return await pool.process(path), False
+
+    monkeypatch.setattr(ocr_jobs, "process_with_cache", process_without_cache)
+    runner = ocr_jobs.OCRJobRunner(pool, poll_interval=0.05)
+    runner.concurrency = 2
+
+    async def run():
+        # An interactive upload holds the only slot
+        busy = asyncio.create_task(pool.process("busy.png"))
+        await asyncio.sleep(0.05)
+        await runner.start()
+        await asyncio.sleep(0.3)
+        attempts_while_busy = len(attempts)
+        release.set()
+        await busy
+        for _ in range(100):
+            job = session_factory().get(models.OCRJob, job_id)
+            if job.finished_at is not None:
+                break
+            await asyncio.sleep(0.05)
+        await runner.stop()
+        return attempts_while_busy, job
+
+    try:
+        attempts_while_busy, job = asyncio.run(run())
+    finally:
+        pool._executor.shutdown(wait=True)
+    # Nothing was claimed or retried while the pool was full, and every item ran once
+    assert attempts_while_busy == 0
+    assert sorted(calls) == ["/tmp/0.png", "/tmp/1.png", "busy.png"]
+    assert (job.status, job.completed_files) == ("failed", 2)
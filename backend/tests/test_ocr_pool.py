@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services import ocr_pool
+from app.services.ocr_pool import OCRJobTimeout, OCRWorkerPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A pool whose jobs run on threads, blocking until `release` is set."""
+    release = threading.Event()
+
+    def run_ocr(image_path, tesseract_timeout):
+        release.wait(5)
+        return {"address": image_path}
+
+    monkeypatch.setattr(ocr_pool, "_run_ocr", run_ocr)
+    pool = OCRWorkerPool(workers=1, max_queue=1, job_timeout=0.1)
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+    pool.release = release
+    yield pool
+    release.set()
+    pool._executor.shutdown(wait=True)
+
+
+def test_timed_out_job_stays_pending_until_it_finishes(pool):
+    async def run():
+        with pytest.raises(OCRJobTimeout):
+            await pool.process("a.png")
+        assert pool.pending == 1  # Still occupying the worker
+        pool.release.set()
+        for _ in range(50):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.pending == 0
+        assert await pool.process("b.png") == {"address": "b.png"}
+
+    asyncio.run(run())
+
+
+class BrokenExecutor:
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+def test_broken_pool_is_replaced_once(pool, monkeypatch):
+    starts = []
+
+    def start():
+        starts.append(1)
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        pool._generation += 1
+
+    monkeypatch.setattr(pool, "start", start)
+    pool.release.set()
+    pool._executor.shutdown()
+    pool._executor = BrokenExecutor()
+
+    async def run():
+        results = await asyncio.gather(pool.process("a.png"), pool.process("b.png"), return_exceptions=True)
+        assert all(isinstance(result, BrokenProcessPool) for result in results)
+
+    asyncio.run(run())
+    assert len(starts) == 1
+    assert pool.pending == 0
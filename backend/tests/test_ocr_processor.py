@@ -0,0 +1,79 @@
+import time
+
+import pytesseract
+import pytest
+from PIL import Image
+
+from app.services.ocr_processor import CrossPlatformOCRProcessor
+
+
+def words(*lines):
+    """image_to_data output with one word box per line of text, 100px apart."""
+    data = {key: [] for key in ('text', 'block_num', 'par_num', 'line_num', 'top', 'conf')}
+    for n, line in enumerate(lines):
+        data['text'].append(line)
+        data['block_num'].append(1)
+        data['par_num'].append(1)
+        data['line_num'].append(n)
+        data['top'].append(400 + n * 100)
+        data['conf'].append('90')
+    return data
+
+
+@pytest.fixture
+def screenshot(tmp_path):
+    path = tmp_path / "screenshot.png"
+    Image.new('RGB', (400, 800), 'white').save(path)
+    return str(path)
+
+
+@pytest.fixture
+def tesseract(monkeypatch):
+    """Fake Tesseract: the panel pass and the whole-screenshot pass return the given text."""
+    calls = {'panel': None, 'whole': None, 'whole_calls': 0}
+
+    def image_to_string(img, **kwargs):
+        calls['whole_calls'] += 1
+        return calls['whole']
+
+    monkeypatch.setattr(pytesseract, "image_to_data", lambda img, **kwargs: calls['panel'])
+    monkeypatch.setattr(pytesseract, "image_to_string", image_to_string)
+    return calls
+
+
+def test_panel_labels_decide_without_a_second_pass(screenshot, tesseract):
+    tesseract['panel'] = words("Sephora NYC 2", "7 minutes ago", "Play Sound", "Directions")
+    result = CrossPlatformOCRProcessor().process_screenshot(screenshot)
+    assert result['platform'] == 'apple'
+    assert tesseract['whole_calls'] == 0
+
+
+def test_google_header_above_the_panel_is_found(screenshot, tesseract):
+    # Nothing platform-specific in the panel; the header is higher up
+    tesseract['panel'] = words("Tracker 4", "123 Main St, Springfield, IL 62701")
+    tesseract['whole'] = "Find My Device\nTracker 4\n123 Main St"
+    result = CrossPlatformOCRProcessor().process_screenshot(screenshot)
+    assert result['platform'] == 'google'
+    assert tesseract['whole_calls'] == 1
+
+
+def test_second_pass_gets_what_is_left_of_the_time_budget(screenshot, monkeypatch):
+    timeouts = []
+
+    def image_to_data(img, timeout=0, **kwargs):
+        timeouts.append(timeout)
+        time.sleep(0.3)
+        return words("Tracker 4", "123 Main St, Springfield, IL 62701")
+
+    def image_to_string(img, timeout=0, **kwargs):
+        timeouts.append(timeout)
+        return "Find My Device"
+
+    monkeypatch.setattr(pytesseract, "image_to_data", image_to_data)
+    monkeypatch.setattr(pytesseract, "image_to_string", image_to_string)
+    result = CrossPlatformOCRProcessor(tesseract_timeout=1.0).process_screenshot(screenshot)
+
+    assert result['platform'] == 'google'
+    panel, whole = timeouts
+    assert panel == pytest.approx(1.0, abs=0.05)
+    assert whole <= 0.75
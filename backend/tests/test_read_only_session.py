@@ -0,0 +1,84 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base, ReadOnlySession
+
+# Set to a scratch Postgres database to also check the READ ONLY transaction
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "read_only.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(models.Investigation).values(id=1, name="Existing", brand="Test"))
+    engine.dispose()
+    return path
+
+
+def investigation_count(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(models.Investigation)).scalar_one()
+
+
+def test_read_only_session_refuses_to_flush(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine, class_=ReadOnlySession)()
+    try:
+        assert db.get(models.Investigation, 1).name == "Existing"
+
+        db.add(models.Investigation(name="New", brand="Test"))
+        with pytest.raises(RuntimeError, match="Read-only session"):
+            db.flush()
+        with pytest.raises(RuntimeError, match="Read-only session"):
+            db.commit()
+        db.rollback()
+
+        db.get(models.Investigation, 1).name = "Renamed"
+        with pytest.raises(RuntimeError, match="Read-only session"):
+            db.commit()
+    finally:
+        db.close()
+
+    assert investigation_count(engine) == 1
+    engine.dispose()
+
+
+def test_async_read_only_session_refuses_to_flush(db_path):
+    async def write():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        Session = async_sessionmaker(engine, sync_session_class=ReadOnlySession)
+        try:
+            async with Session() as db:
+                assert (await db.get(models.Investigation, 1)).name == "Existing"
+                db.add(models.Investigation(name="New", brand="Test"))
+                with pytest.raises(RuntimeError, match="Read-only session"):
+                    await db.commit()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(write())
+    engine = create_engine(f"sqlite:///{db_path}")
+    assert investigation_count(engine) == 1
+    engine.dispose()
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_postgres_refuses_writes_that_skip_the_flush():
+    engine = create_engine(POSTGRES_URL)
+    db = sessionmaker(bind=engine, class_=ReadOnlySession)()
+    try:
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            db.execute(insert(models.Investigation).values(name="Core write", brand="Test"))
+    finally:
+        db.close()
+        engine.dispose()
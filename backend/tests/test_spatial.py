@@ -0,0 +1,80 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth import Principal
+from app.database import Base
+from app.routers.spatial import _spatial_query, get_locations_in_box
+from app.services import spatial
+
+BOX = (-88.0, 41.0, -87.0, 42.0)
+TYPES = ('mrf', 'landfill', 'transit')
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Two investigations of scattered locations, a few of them inside BOX, analyzed."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'spatial.db'}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    with Session(engine) as db:
+        for name in ("A", "B"):
+            investigation = models.Investigation(name=name, brand="Test")
+            for t in range(10):
+                tracker = models.Tracker(investigation=investigation, name=f"T{t}", platform="apple")
+                for n in range(100):
+                    in_box = n % 10 == 0
+                    db.add(models.Location(
+                        tracker=tracker,
+                        address=f"{n} Main St",
+                        latitude=rng.uniform(41.0, 42.0) if in_box else rng.uniform(25.0, 40.0),
+                        longitude=rng.uniform(-88.0, -87.0) if in_box else rng.uniform(-124.0, -90.0),
+                        location_type=rng.choice(TYPES),
+                        uploaded_by=rng.choice((1, 2, 3)),
+                    ))
+        db.commit()
+        db.execute(text("ANALYZE"))
+        yield db
+    engine.dispose()
+
+
+def expected_ids(db, investigation_id, location_type=None, uploaded_by=None):
+    west, south, east, north = BOX
+    return sorted(
+        location.id for location in db.query(models.Location).join(models.Tracker)
+        if location.tracker.investigation_id == investigation_id
+        and south <= location.latitude <= north and west <= location.longitude <= east
+        and location_type in (None, location.location_type)
+        and uploaded_by in (None, location.uploaded_by)
+    )
+
+
+@pytest.mark.parametrize("role, location_type", [("admin", None), ("admin", "mrf"), ("contributor", "landfill")])
+def test_box_filters_and_limit_run_in_sql(db, role, location_type):
+    user = Principal(id=2, email="user@example.com", role=role)
+    uploaded_by = 2 if role == "contributor" else None
+    investigation_id = db.query(models.Investigation.id).filter_by(name="B").scalar()
+    expected = expected_ids(db, investigation_id, location_type, uploaded_by)
+    assert len(expected) > 3
+
+    west, south, east, north = BOX
+    found = get_locations_in_box(
+        investigation_id, west=west, south=south, east=east, north=north, final_only=False,
+        location_type=location_type, limit=3, db=db, current_user=user
+    )
+    assert [location["id"] for location in found] == expected[:3]
+
+
+def test_sqlite_starts_from_the_geohash_ranges(db):
+    user = Principal(id=2, email="user@example.com", role="contributor")
+    query = _spatial_query(db, 1, [BOX], False, user, "mrf").order_by(models.Location.id).limit(3)
+    sql = str(query.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    plan = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    assert any("idx_location_geohash" in step for step in plan)
+    # The rest of the query is driven by the candidates, not another index of locations
+    assert not any(index in step for step in plan for index in (
+        "idx_uploaded_by", "idx_location_type", "idx_tracker_time_id"
+    )), plan
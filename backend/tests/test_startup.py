@@ -0,0 +1,79 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Import time is measured relative to importing just the frameworks
+# (FastAPI, SQLAlchemy, pydantic) in the same environment, so the budget
+# holds on slow and fast machines alike. Measured at 1.4-1.6x; going over
+# means app code started doing real work, or pulling in heavy modules, on import.
+FRAMEWORK_IMPORTS = "fastapi, fastapi.staticfiles, sqlalchemy.orm, pydantic"
+IMPORT_BUDGET_RATIO = 1.75
+IMPORT_RUNS = 3
+
+# Loaded lazily by the services that need them, never by importing the app
+LAZY_MODULES = ("pytesseract", "PIL", "requests", "pyarrow")
+
+
+def _import_times(statement):
+    """[(name, self_us, cumulative_us)] for one cold run of an import statement."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():  # skips the column header
+            times.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+def _best_import(statement):
+    """(total ms, times) of the fastest of IMPORT_RUNS runs."""
+    runs = []
+    for _ in range(IMPORT_RUNS):
+        times = _import_times(statement)
+        # Top-level imports (one space of indent) add up to the whole run
+        total_ms = sum(cumulative for name, _, cumulative in times if not name.startswith("  ")) / 1000
+        runs.append((total_ms, times))
+    return min(runs, key=lambda run: run[0])
+
+
+def test_import_time_budget():
+    framework_ms, _ = _best_import(f"import {FRAMEWORK_IMPORTS}")
+    app_ms, times = _best_import("import app.main")
+
+    slowest = sorted(times, key=lambda t: t[1], reverse=True)[:10]
+    report = "\n".join(f"  {name.strip():<48}{self_us / 1000:8.1f} ms" for name, self_us, _ in slowest)
+    assert app_ms <= framework_ms * IMPORT_BUDGET_RATIO, (
+        f"import app.main took {app_ms:.0f} ms, {app_ms / framework_ms:.2f}x the frameworks' "
+        f"{framework_ms:.0f} ms (budget {IMPORT_BUDGET_RATIO}x); slowest modules:\n{report}"
+    )
+
+    imported = {name.strip().split(".")[0] for name, _, _ in times}
+    assert not imported & set(LAZY_MODULES), f"imported at startup: {sorted(imported & set(LAZY_MODULES))}"
+
+
+def test_startup_with_unmigrated_database():
+    from app.main import app
+
+    # Lifespan must finish without tables; readiness then says why it isn't ready
+    with TestClient(app) as client:
+        assert client.get("/health").json() == {"status": "healthy"}
+
+        response = client.get("/ready")
+        assert response.status_code == 503
+        checks = response.json()["checks"]
+        assert checks["startup"] == "ok"
+        assert checks["database"] == "ok"
+        assert checks["schema"] != "ok"
@@ -0,0 +1,26 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from bench_summary import STATEMENT_BUDGET, build_fixture, is_write, run_summaries
+
+
+def test_summary_stays_within_statement_budget(tmp_path):
+    # The same statements at any size; bench_summary.py runs it at scale
+    database_url = f"sqlite:///{tmp_path / 'summary.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    investigation_id, expected = build_fixture(session, trackers=20, locations_per_tracker=5, seed=1)
+    session.close()
+    engine.dispose()
+
+    results = asyncio.run(run_summaries(database_url, investigation_id, runs=2))
+    for summary, elapsed, statements in results:
+        assert len(statements) <= STATEMENT_BUDGET, statements
+        assert not [statement for statement in statements if is_write(statement)]
+
+    assert summary["total_locations"] == 20 * 5
+    assert {t["id"]: (t["final_destination"] or {}).get("address") for t in summary["trackers"]} == expected
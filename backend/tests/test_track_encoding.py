@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from app.services.track_encoding import build_tracks, encode_binary, epoch_seconds
+
+
+def test_epoch_seconds_outside_uint32_are_unknown():
+    assert epoch_seconds(None) == 0
+    assert epoch_seconds(datetime(2024, 1, 1)) == 1704067200
+    assert epoch_seconds(datetime(2024, 1, 1, tzinfo=timezone.utc)) == 1704067200
+    assert epoch_seconds(datetime(1969, 12, 31)) == 0
+    assert epoch_seconds(datetime(2107, 1, 1)) == 0
+
+
+def test_encode_binary_accepts_out_of_range_timestamps():
+    rows = [
+        (1, 51.5, -0.12, datetime(1900, 1, 1), "mrf"),
+        (1, 51.6, -0.11, datetime(2200, 1, 1), "landfill"),
+        (1, 51.7, -0.10, datetime(2024, 1, 1), None),
+    ]
+    [track] = build_tracks(rows)
+    assert track.time == [0, 0, 1704067200]
+    assert encode_binary([track]).startswith(b"CTRK")
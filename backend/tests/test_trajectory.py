@@ -0,0 +1,44 @@
+from app.services import trajectory, vector_tiles
+from app.services.track_encoding import Track
+
+
+def _track(tracker_id, points):
+    track = Track(tracker_id)
+    for lat, lng in points:
+        track.lat.append(round(lat * 1_000_000))
+        track.lng.append(round(lng * 1_000_000))
+        track.time.append(0)
+        track.type.append(0)
+    return track
+
+
+def test_simplify_tracks_skips_tracks_outside_the_bounds(monkeypatch):
+    cache = trajectory.TrackCache()
+    monkeypatch.setattr(trajectory, "get_track_cache", lambda: cache)
+    tracks = {
+        1: _track(1, [(51.50, -0.12), (51.51, -0.10), (51.52, -0.08)]),  # London
+        2: _track(2, [(40.71, -74.00), (40.72, -73.99)]),  # New York
+        # Crosses the tile without a point inside it
+        3: _track(3, [(51.40, -0.30), (51.60, 0.10)]),
+    }
+    loads = []
+
+    def load_tracks(tracker_ids):
+        loads.append(sorted(tracker_ids))
+        return [tracks[tracker_id] for tracker_id in tracker_ids]
+
+    z, x, y = 12, 2046, 1362  # Central London
+    tolerance = trajectory.zoom_tolerance(z)
+    bounds = vector_tiles.buffered_bounds(z, x, y)
+    versions = {1: 1, 2: 1, 3: 1}
+
+    first = trajectory.simplify_tracks(versions, load_tracks, "dp", tolerance, bounds=bounds)
+    assert [track.tracker_id for track in first] == [1, 3]
+
+    # Another tile of the same zoom reuses both the significance and the simplified copies
+    second = trajectory.simplify_tracks(versions, load_tracks, "dp", tolerance, bounds=bounds)
+    assert loads == [[1, 2, 3]]
+    assert [a is b for a, b in zip(first, second)] == [True, True]
+
+    everything = trajectory.simplify_tracks(versions, load_tracks, "dp", tolerance)
+    assert [track.tracker_id for track in everything] == [1, 2, 3]
@@ -0,0 +1,63 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.services.screenshot_store import ScreenshotStore
+from app.services.upload_stream import stream_files_to_disk
+
+BOUNDARY = "testboundary"
+
+
+def multipart_request(files, chunk_size=64):
+    body = b"".join(
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="files"; filename="{name}"\r\n'
+        f'Content-Type: image/png\r\n\r\n'.encode() + data + b"\r\n"
+        for name, data in files
+    ) + f"--{BOUNDARY}--\r\n".encode()
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {"type": "http", "method": "POST", "path": "/api/upload/screenshots",
+             "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]}
+    return Request(scope, receive)
+
+
+def stored_files(store):
+    return sorted(p.name for p in store.root.rglob("*") if p.is_file() and store.incoming not in p.parents)
+
+
+def test_files_of_a_rejected_batch_are_removed(tmp_path):
+    store = ScreenshotStore(tmp_path)
+    earlier = store.save(io.BytesIO(b"already stored"), "earlier.png")
+    files = [("a.png", b"first" * 100), ("b.png", b"already stored"), ("c.png", b"third" * 100)]
+
+    async def upload():
+        async for part in stream_files_to_disk(multipart_request(files), "files", store, max_files=2):
+            assert part.stored.disk_path.exists()
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(upload())
+    assert raised.value.status_code == 400
+    # Only what was stored before this request is left, temp files included
+    assert stored_files(store) == [earlier.disk_path.name]
+    assert list(store.incoming.iterdir()) == []
+
+
+def test_release_keeps_a_file_another_upload_found(tmp_path):
+    store = ScreenshotStore(tmp_path)
+    ours = store.save(io.BytesIO(b"same bytes"), "ours.png")
+    theirs = store.save(io.BytesIO(b"same bytes"), "theirs.png")
+    assert theirs.duplicate
+
+    store.release(ours)
+    assert ours.disk_path.exists()
+
+    alone = store.save(io.BytesIO(b"other bytes"), "alone.png")
+    store.release(alone)
+    assert not alone.disk_path.exists()